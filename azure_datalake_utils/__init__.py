@@ -3,10 +3,50 @@
 Modulos exportados por este paquete.
 
 - `Datalake`: Clase principal para interactuar con el datalake.
+- `AsyncDatalake`: Version asincrona de `Datalake`.
+- `PartitionManifestCache`: Cache de los listados usados para descubrir particiones.
+- `BlobDiskCache`: Cache en disco local de los archivos leidos.
+- `IOMetrics`: Metricas de I/O por operación.
 """
 
 __author__ = """centraal.studio"""
 __email__ = 'equipo@centraal.studio'
 __version__ = '0.5.10'
 
-from azure_datalake_utils.azure_datalake_utils import Datalake
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from azure_datalake_utils.async_datalake import AsyncDatalake
+    from azure_datalake_utils.azure_datalake_utils import Datalake
+    from azure_datalake_utils.disk_cache import BlobDiskCache
+    from azure_datalake_utils.manifest import PartitionManifestCache
+    from azure_datalake_utils.metrics import IOMetrics
+    from azure_datalake_utils.resilience import RetryPolicy
+
+# Las clases se importan en el primer acceso, así `import azure_datalake_utils` no carga
+# adlfs, pandas ni el SDK de Azure.
+_EXPORTS = {
+    'Datalake': 'azure_datalake_utils.azure_datalake_utils',
+    'AsyncDatalake': 'azure_datalake_utils.async_datalake',
+    'PartitionManifestCache': 'azure_datalake_utils.manifest',
+    'BlobDiskCache': 'azure_datalake_utils.disk_cache',
+    'IOMetrics': 'azure_datalake_utils.metrics',
+    'RetryPolicy': 'azure_datalake_utils.resilience',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Importar las clases exportadas en el primer acceso."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """Atributos del modulo, incluyendo las clases exportadas."""
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,76 @@
+"""Importación diferida de dependencias pesadas."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, List
+
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """Referencia a un modulo que solo se importa en el primer acceso a uno de sus atributos.
+
+    Se usa en lugar de `import pandas as pd` para que `import azure_datalake_utils` no cargue
+    pandas, numpy o pyarrow. Asignar o eliminar atributos modifica el modulo real, de esta manera
+    `unittest.mock.patch("modulo.pd.read_csv")` sigue funcionando.
+
+    Args:
+        name: nombre completo del modulo, por ejemplo `pyarrow.dataset`.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Constructor."""
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self) -> ModuleType:
+        """Importar el modulo si todavia no se ha importado."""
+        module = object.__getattribute__(self, "_module")
+        if module is None:
+            with _lock:
+                module = object.__getattribute__(self, "_module")
+                if module is None:
+                    module = importlib.import_module(object.__getattribute__(self, "_name"))
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        """Obtener el atributo del modulo real."""
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        """Asignar el atributo en el modulo real."""
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        """Eliminar el atributo del modulo real."""
+        delattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        """Atributos del modulo real."""
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        """Representación."""
+        return f"<LazyModule {object.__getattribute__(self, '_name')}>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Retornar una referencia al modulo `name` que se importa en el primer uso."""
+    return LazyModule(name)
@@ -0,0 +1,299 @@
+"""Cliente asincrono para interactuar con el datalake."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import asyncio
+import io
+import weakref
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+
+from azure_datalake_utils._lazy import lazy_import
+from azure_datalake_utils.azure_datalake_utils import Datalake
+from azure_datalake_utils.compression import abrir_comprimido, comprimir
+from azure_datalake_utils.exepctions import ERRORES_NO_ENCONTRADO, ArchivoNoEncontrado
+from azure_datalake_utils.manifest import PartitionManifestCache
+from azure_datalake_utils.partitions import HivePartitiion
+from azure_datalake_utils.resilience import RetryPolicy
+
+if TYPE_CHECKING:
+    from adlfs import AzureBlobFileSystem
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+T = TypeVar("T")
+
+
+class AsyncDatalake(object):
+    """Clase para representar operaciones asincronas de Datalake.
+
+    Todas las operaciones de lectura y escritura son `awaitable` y usan las corutinas
+    del filesystem de `adlfs` (`_cat_file`, `_pipe_file`). Las corutinas se ejecutan en el
+    event loop de I/O del filesystem (el mismo que usa `adlfs` en modo sincrono), de esta manera
+    se pueden ejecutar cientos de operaciones con `asyncio.gather` sin usar un hilo por operación
+    y sin atar los clientes de Azure al event loop de la aplicación. El número de operaciones
+    simultaneas contra la cuenta es acotado por `max_concurrency`.
+
+    **NOTA**: el parseo de los archivos (por ejemplo `pd.read_csv`) se hace en el event loop,
+    solo la transferencia de los blobs es asincrona.
+    """
+
+    def __init__(
+        self,
+        datalake_name: str,
+        tenant_id: str,
+        account_key: Optional[str] = None,
+        fsspec_cache: bool = True,
+        max_concurrency: int = 32,
+        manifest_cache: Optional[PartitionManifestCache] = None,
+        filesystem_options: Optional[Dict[str, Any]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        """Clase para interactuar con Azure Dalake de manera asincrona.
+
+        Args:
+            datalake_name: nombre de la cuenta de Azure Datalake Gen2.
+            tenant_id: Identificador del tenant, ver `Datalake`.
+            account_key: key de la cuenta. Por defecto es None y es ignorado.
+            fsspec_cache: ver `Datalake`.
+            max_concurrency: número máximo de operaciones simultaneas contra la cuenta.
+            manifest_cache: ver `Datalake`.
+            filesystem_options: ver `Datalake`.
+            retry_policy: reintentos y solicitudes duplicadas de las descargas, ver `RetryPolicy`.
+        """
+        self.datalake = Datalake(
+            datalake_name=datalake_name,
+            tenant_id=tenant_id,
+            account_key=account_key,
+            fsspec_cache=fsspec_cache,
+            manifest_cache=manifest_cache,
+            filesystem_options=filesystem_options,
+            retry_policy=retry_policy,
+        )
+        self.datalake_name = datalake_name
+        self.storage_options = dict(self.datalake.storage_options)
+        self.max_concurrency = max_concurrency
+        # un semaforo por event loop, el cliente se puede usar en varios `asyncio.run`.
+        self._semaforos: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_account_key(
+        cls,
+        datalake_name: str,
+        account_key: str,
+        fsspec_cache: bool = True,
+        max_concurrency: int = 32,
+        manifest_cache: Optional[PartitionManifestCache] = None,
+        filesystem_options: Optional[Dict[str, Any]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """Opcion de inicializar con account key."""
+        return cls(
+            datalake_name=datalake_name,
+            account_key=account_key,
+            tenant_id=None,
+            fsspec_cache=fsspec_cache,
+            max_concurrency=max_concurrency,
+            manifest_cache=manifest_cache,
+            filesystem_options=filesystem_options,
+            retry_policy=retry_policy,
+        )
+
+    @property
+    def fs(self) -> AzureBlobFileSystem:
+        """Filesystem de `adlfs`, es el mismo filesystem compartido de `Datalake`."""
+        return self.datalake.fs
+
+    @fs.setter
+    def fs(self, fs: AzureBlobFileSystem) -> None:
+        """Usar un filesystem propio en lugar del compartido."""
+        self.datalake.fs = fs
+
+    async def close(self) -> None:
+        """Libera el filesystem compartido."""
+        self.datalake.close()
+
+    async def __aenter__(self) -> "AsyncDatalake":
+        """Soporte para `async with`."""
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """Cierra las conexiones al salir de `async with`."""
+        await self.close()
+
+    async def read_csv(self, ruta: Union[str, List[str]], **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Version asincrona de `Datalake.read_csv`.
+
+        Args:
+            ruta: Ruta o lista de rutas a leer, ver `Datalake.read_csv`. Cuando es una lista,
+                los archivos se descargan de manera concurrente y el resultado conserva el orden.
+            **kwargs: argumentos a pasar a pd.read_csv.
+
+        Returns:
+            Dataframe con la informacion del la ruta.
+        """
+        kwargs.pop('storage_options', None)
+        if isinstance(ruta, str):
+            self.datalake._verificar_extension(ruta, '.csv', '.txt', '.tsv', comprimido=True)
+            return await self._leer(ruta, pd.read_csv, **kwargs)
+
+        [self.datalake._verificar_extension(r, '.csv', '.txt', '.tsv', comprimido=True) for r in ruta]
+        dfs = await self._gather(self._leer(r, pd.read_csv, **kwargs) for r in ruta)
+        return pd.concat(dfs, ignore_index=True)
+
+    async def read_excel(self, ruta: str, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Version asincrona de `Datalake.read_excel`."""
+        kwargs.pop('storage_options', None)
+        kwargs.pop('engine', None)
+        self.datalake._verificar_extension(ruta, '.xlsx', '.xls')
+        return await self._leer(ruta, pd.read_excel, engine='openpyxl', **kwargs)
+
+    async def read_json(self, ruta: str, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Version asincrona de `Datalake.read_json`."""
+        kwargs.pop('storage_options', None)
+        self.datalake._verificar_extension(ruta, '.json', comprimido=True)
+        return await self._leer(ruta, pd.read_json, **kwargs)
+
+    async def read_parquet(self, ruta: str, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Version asincrona de `Datalake.read_parquet`."""
+        kwargs.pop('storage_options', None)
+        return await self._leer(ruta, pd.read_parquet, **kwargs)
+
+    async def read_csv_with_partition(
+        self,
+        ruta: str,
+        partition_cols: Dict[str, List[str]] = None,
+        partition_exclusion: Dict[str, List[str]] = None,
+        partition_inclusion: Dict[str, List[str]] = None,
+        last_modified_last_level: bool = True,
+        categorical_partitions: bool = True,
+        partition_types: Optional[Dict[str, Any]] = None,
+        **kwargs: Optional[Any],
+    ) -> pd.DataFrame:
+        """Version asincrona de `Datalake.read_csv_with_partition`.
+
+        El descubrimiento de particiones se ejecuta en un hilo con la interfaz sincrona del
+        filesystem, la descarga de todas las particiones se hace de manera concurrente. A diferencia
+        de `Datalake.read_csv_with_partition`, por defecto las columnas de las particiones son `pd.Categorical`.
+        """
+        if not ruta.endswith("/"):
+            raise ValueError("ruta debe finalizar en /")
+
+        loop = asyncio.get_running_loop()
+        particiones = await loop.run_in_executor(
+            None,
+            lambda: HivePartitiion(
+                ruta=ruta,
+                partition_cols=partition_cols,
+                partition_exclusion=partition_exclusion,
+                partition_inclusion=partition_inclusion,
+                last_modified_last_level=last_modified_last_level,
+                fs=self.fs,
+                manifest_cache=self.datalake.manifest_cache,
+            ),
+        )
+
+        if categorical_partitions:
+            list_of_dfs = await self._gather(
+                self.read_csv(path_, **kwargs) for path_ in particiones.get_partition_list()
+            )
+            df = pd.concat(list_of_dfs, ignore_index=True)
+            filas = np.repeat(np.arange(len(list_of_dfs)), [len(df_) for df_ in list_of_dfs])
+            return Datalake._asignar_categorias(df, particiones.get_partition_categories(partition_types), filas)
+
+        async def leer_particion(path_: str, particiones_cols: Dict[str, str]) -> pd.DataFrame:
+            df = await self.read_csv(path_, **kwargs)
+            return df.assign(**particiones_cols)
+
+        list_of_dfs = await self._gather(
+            leer_particion(path_, particion[1])
+            for path_, particion in zip(particiones.get_partition_list(), particiones.get_partition_files())
+        )
+        return Datalake._tipar_particiones(pd.concat(list_of_dfs, ignore_index=True), partition_types)
+
+    async def write_csv(self, df: pd.DataFrame, ruta: str, **kwargs: Optional[Any]) -> None:
+        """Version asincrona de `Datalake.write_csv`."""
+        self.datalake._verificar_extension(ruta, '.csv', '.txt', '.tsv', comprimido=True)
+        sep = kwargs.get('sep', ',')
+        df_to_write = self.datalake._limpiar_df_cols_str(df, sep)
+        kwargs.pop('storage_options', None)
+        await self._escribir(ruta, df_to_write.to_csv(**kwargs).encode(kwargs.get('encoding', 'utf-8')))
+
+    async def write_excel(self, df: pd.DataFrame, ruta: str, **kwargs: Optional[Any]) -> None:
+        """Version asincrona de `Datalake.write_excel`."""
+        self.datalake._verificar_extension(ruta, '.xlsx', '.xls')
+        kwargs.pop('storage_options', None)
+        buffer = io.BytesIO()
+        df.to_excel(buffer, **kwargs)
+        await self._escribir(ruta, buffer.getvalue())
+
+    async def write_json(self, df: pd.DataFrame, ruta: str, **kwargs: Optional[Any]) -> None:
+        """Version asincrona de `Datalake.write_json`."""
+        self.datalake._verificar_extension(ruta, '.json', comprimido=True)
+        kwargs.pop('storage_options', None)
+        await self._escribir(ruta, df.to_json(**kwargs).encode('utf-8'))
+
+    async def write_parquet(self, df: pd.DataFrame, ruta: str, **kwargs: Optional[Any]) -> None:
+        """Version asincrona de `Datalake.write_parquet`."""
+        kwargs.pop('storage_options', None)
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, **kwargs)
+        await self._escribir(ruta, buffer.getvalue())
+
+    async def _leer(self, ruta: str, parser, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Descarga el blob con `_cat_file` y lo parsea desde memoria."""
+
+        async def descargar() -> bytes:
+            async with self._obtener_semaforo():
+                return await self._en_loop_fs(self.fs._cat_file(ruta))
+
+        try:
+            data = await self._reintentar(descargar)
+        except ERRORES_NO_ENCONTRADO:
+            raise ArchivoNoEncontrado(ruta)
+        with abrir_comprimido(io.BytesIO(data), ruta) as f:
+            return parser(f, **kwargs)
+
+    async def _reintentar(self, corutina: Callable[[], Awaitable[T]]) -> T:
+        """Ejecuta la descarga con `retry_policy`, si esta configurada."""
+        retry_policy = self.datalake.retry_policy
+        if retry_policy is None:
+            return await corutina()
+        return await retry_policy.call_async(corutina, self.datalake.metrics)
+
+    async def _escribir(self, ruta: str, data: bytes) -> None:
+        """Sube el contenido con `_pipe_file`, comprimido si `ruta` tiene sufijo de compresión."""
+        data = comprimir(data, ruta)
+        async with self._obtener_semaforo():
+            await self._en_loop_fs(self.fs._pipe_file(ruta, data))
+
+    async def _en_loop_fs(self, corutina: Awaitable[T]) -> T:
+        """Ejecuta la corutina en el event loop de I/O del filesystem y espera el resultado."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(corutina, self.fs.loop))
+
+    async def _gather(self, corutinas: Iterable[Awaitable[T]]) -> List[T]:
+        """Ejecuta las corutinas de manera concurrente conservando el orden."""
+        return list(await asyncio.gather(*corutinas))
+
+    def _obtener_semaforo(self) -> asyncio.Semaphore:
+        """Semaforo del event loop actual para acotar las operaciones simultaneas."""
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaforo
@@ -1,26 +1,74 @@
 """Main module."""
-
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import datetime
+import glob
+import io
+import json
+import logging
 import platform
 import re
-from typing import Any, Dict, List, Optional, Union
-
-import numpy as np
-import pandas as pd
-from adlfs import AzureBlobFileSystem
-from azure.identity import InteractiveBrowserCredential
-from typing_extensions import Literal
+import threading
+import time
+from queue import Queue
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar, Union
 
 import azure_datalake_utils.experimental as exp
-from azure_datalake_utils.exepctions import ExtensionIncorrecta, raiseArchivoNoEncontrado
-from azure_datalake_utils.partitions import HivePartitiion
-from azure_datalake_utils.storage_account_utils import create_url_sas_token
+from azure_datalake_utils._lazy import lazy_import
+from azure_datalake_utils.compression import abrir_comprimido, descomprimir_inicio, inferir_compresion, sin_compresion
+from azure_datalake_utils.concurrency import map_ordenado
+from azure_datalake_utils.disk_cache import BlobDiskCache
+from azure_datalake_utils.exepctions import (
+    ERRORES_NO_ENCONTRADO,
+    ArchivoNoEncontrado,
+    ExtensionIncorrecta,
+    raiseArchivoNoEncontrado,
+)
+from azure_datalake_utils.filesystem import (
+    DEFAULT_FILESYSTEM_OPTIONS,
+    DEFAULT_READ_STRATEGIES,
+    acquire_filesystem,
+    release_filesystem,
+)
+from azure_datalake_utils.manifest import PartitionManifestCache
+from azure_datalake_utils.metrics import NULL_METRICS, NullMetrics, medir_operacion
+from azure_datalake_utils.partitions import HIVE_DEFAULT_PARTITION, HivePartitiion, typed_categories
+from azure_datalake_utils.resilience import RetryPolicy
+from azure_datalake_utils.storage_account_utils import create_url_sas_token, create_urls_sas_token
+
+if TYPE_CHECKING:
+    from adlfs import AzureBlobFileSystem
+    from typing_extensions import Literal
+
+# pandas, numpy y pyarrow se importan en el primer uso, ver `azure_datalake_utils._lazy`.
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pacsv = lazy_import("pyarrow.csv")
+ds = lazy_import("pyarrow.dataset")
+pq = lazy_import("pyarrow.parquet")
+fsspec_parquet = lazy_import("fsspec.parquet")
+
+T = TypeVar("T")
 
 
 class Datalake(object):
     """Clase para representar operaciones de Datalake."""
 
     def __init__(
-        self, datalake_name: str, tenant_id: str, account_key: Optional[str] = None, fsspec_cache: bool = True
+        self,
+        datalake_name: str,
+        tenant_id: str,
+        account_key: Optional[str] = None,
+        fsspec_cache: bool = True,
+        manifest_cache: Optional[PartitionManifestCache] = None,
+        disk_cache: Optional[BlobDiskCache] = None,
+        filesystem_options: Optional[Dict[str, Any]] = None,
+        metrics: Optional[NullMetrics] = None,
+        read_strategies: Optional[Dict[str, Dict[str, Any]]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ) -> None:
         """Clase para interactuar con Azure Dalake.
 
@@ -39,10 +87,49 @@ class Datalake(object):
                 Para ver los efectos, ver los siguientes issues:
                 - https://github.com/fsspec/adlfs/issues/391
                 - https://github.com/Azure/azure-sdk-for-python/issues/28312
+
+                El cache de bloques de cada archivo abierto se define por formato con `read_strategies`.
+            manifest_cache: cache opcional de los listados de particiones, se usa en las lecturas con
+                particiones para no volver a listar toda la tabla en cada llamado.
+                Ver `PartitionManifestCache`.
+            disk_cache: cache opcional en disco local de los archivos leidos con `read_csv`, `read_excel`,
+                `read_json` y `read_parquet`. Los archivos que no han cambiado no se vuelven a descargar.
+                Ver `BlobDiskCache`.
+            filesystem_options: argumentos adicionales de `AzureBlobFileSystem` para ajustar el cliente,
+                por ejemplo `max_concurrency`, `connection_timeout` o `read_timeout`. Se combinan con
+                `DEFAULT_FILESYSTEM_OPTIONS`, que deshabilita el cache de listados (`use_listings_cache`).
+            metrics: metricas de I/O por operación (llamados de listado, archivos y bytes transferidos y
+                latencia por etapa). Por defecto estan deshabilitadas, ver `IOMetrics`.
+            read_strategies: estrategias de lectura por formato (`csv`, `json`, `head` y `parquet`), se combinan
+                con `DEFAULT_READ_STRATEGIES`. Para `csv`, `json` y `head` (lecturas parciales, por ejemplo con
+                `nrows`) son argumentos de `fs.open` como `block_size` y `cache_type`, un diccionario vacio usa
+                los valores por defecto del filesystem. Para `parquet`, `footer_sample_size` es el número de bytes
+                del final del archivo que se leen en la primera solicitud.
+            retry_policy: reintentos con espera exponencial, tiempo maximo por intento y solicitudes duplicadas
+                para las lecturas de archivos (`read_*`, `peek_csv` y las lecturas con particiones de CSV y
+                parquet). Por defecto los errores no se reintentan, ver `RetryPolicy`.
+
+        El filesystem (`fs`) se crea en el primer uso y se comparte entre todas las instancias con la
+        misma cuenta y credencial, de esta manera se reusan las conexiones HTTP. Usar `close()` o
+        `with Datalake(...) as dl:` para liberarlo.
         """
         self.datalake_name = datalake_name
+        self.manifest_cache = manifest_cache
+        self.disk_cache = disk_cache
+        self.metrics = metrics or NULL_METRICS
+        desconocidos = set(read_strategies or {}) - set(DEFAULT_READ_STRATEGIES)
+        if desconocidos:
+            raise ValueError(f"formatos sin estrategia de lectura: {sorted(desconocidos)}")
+        self.read_strategies = {**DEFAULT_READ_STRATEGIES, **(read_strategies or {})}
+        self.retry_policy = retry_policy
+        self._fs: Optional[AzureBlobFileSystem] = None
+        self._fs_compartido = False
+        # el primer acceso a `fs` puede ser simultaneo desde los hilos de `map_ordenado`.
+        self._fs_lock = threading.Lock()
 
         if account_key is None:
+            from azure.identity import InteractiveBrowserCredential
+
             self.tenant_id = tenant_id
             credential = exp.AioCredentialWrapper(InteractiveBrowserCredential(tenant_id=self.tenant_id))
             # TODO: verificar https://github.com/fsspec/adlfs/issues/270
@@ -58,7 +145,6 @@ class Datalake(object):
 
         else:
             storage_options = {'account_name': self.datalake_name, 'account_key': account_key}
-            self.fs = AzureBlobFileSystem(account_name=self.datalake_name, account_key=account_key)
 
         if not fsspec_cache:
             storage_options["default_cache_type"] = None
@@ -66,14 +152,72 @@ class Datalake(object):
             storage_options["skip_instance_cache"] = True
 
         self.storage_options = storage_options
+        self.filesystem_options = {**DEFAULT_FILESYSTEM_OPTIONS, **(filesystem_options or {})}
+
+    @property
+    def fs(self) -> AzureBlobFileSystem:
+        """Filesystem del datalake, se obtiene del pool compartido en el primer uso."""
+        if self._fs is None:
+            with self._fs_lock:
+                if self._fs is None:
+                    fs = acquire_filesystem({**self.storage_options, **self.filesystem_options})
+                    self._fs_compartido = True
+                    self._fs = fs
+        return self._fs
+
+    @fs.setter
+    def fs(self, fs: AzureBlobFileSystem) -> None:
+        """Usar un filesystem propio en lugar del compartido."""
+        self.close()
+        self._fs = fs
+
+    def close(self) -> None:
+        """Liberar el filesystem compartido, si ninguna otra instancia lo usa se cierran sus conexiones."""
+        if self._fs is not None and self._fs_compartido:
+            release_filesystem(self._fs)
+        self._fs = None
+        self._fs_compartido = False
+
+    def __enter__(self) -> "Datalake":
+        """Soporte para `with`."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Liberar el filesystem al salir de `with`."""
+        self.close()
 
     @classmethod
-    def from_account_key(cls, datalake_name: str, account_key: str, fsspec_cache: bool = True):
+    def from_account_key(
+        cls,
+        datalake_name: str,
+        account_key: str,
+        fsspec_cache: bool = True,
+        manifest_cache: Optional[PartitionManifestCache] = None,
+        disk_cache: Optional[BlobDiskCache] = None,
+        filesystem_options: Optional[Dict[str, Any]] = None,
+        metrics: Optional[NullMetrics] = None,
+        read_strategies: Optional[Dict[str, Dict[str, Any]]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         """Opcion de inicializar con account key."""
-        return cls(datalake_name=datalake_name, account_key=account_key, tenant_id=None, fsspec_cache=fsspec_cache)
+        return cls(
+            datalake_name=datalake_name,
+            account_key=account_key,
+            tenant_id=None,
+            fsspec_cache=fsspec_cache,
+            manifest_cache=manifest_cache,
+            disk_cache=disk_cache,
+            filesystem_options=filesystem_options,
+            metrics=metrics,
+            read_strategies=read_strategies,
+            retry_policy=retry_policy,
+        )
 
+    @medir_operacion("read_csv")
     @raiseArchivoNoEncontrado
-    def read_csv(self, ruta: Union[str, List[str]], **kwargs: Optional[Any]) -> pd.DataFrame:
+    def read_csv(
+        self, ruta: Union[str, List[str]], max_workers: Optional[int] = None, **kwargs: Optional[Any]
+    ) -> pd.DataFrame:
         """Leer un archivo CSV desde la cuenta de datalake.
 
         Esta función hace una envoltura de [pd.read_csv].
@@ -85,13 +229,19 @@ class Datalake(object):
 
             ruta: Ruta a leeder el archivo, debe contener una referencia a un archivo
                 `.csv` o `.txt`. Recordar que la ruta debe contener esta estructura:
-                `{NOMBRE_CONTENEDOR}/{RUTA}/{nombre o patron}.csv`.
+                `{NOMBRE_CONTENEDOR}/{RUTA}/{nombre o patron}.csv`. Con un patrón (por ejemplo
+                `datos_*.csv`) se lee el primer archivo en orden alfabetico que lo cumple.
                 NUEVO en version 0.5:
                 Tambien acepta una lista de archivos terminados en csv. ejemplo:
                 ```
                 [{NOMBRE_CONTENEDOR}/{RUTA}/{nombre o patron}.csv,
                 {NOMBRE_CONTENEDOR}/{RUTA2}/{nombre o patron}.csv]
                 ```
+                Los archivos comprimidos (`.csv.gz`, `.csv.bz2`, `.csv.xz`, `.csv.zst`) se
+                descomprimen por bloques durante la lectura.
+            max_workers: Solo aplica cuando `ruta` es una lista. Número máximo de archivos
+                que se descargan y leen de manera simultanea. Por defecto es `None` y la lectura es
+                secuencial. El orden del resultado siempre es el mismo orden de la lista.
 
             **kwargs: argumentos a pasar a pd.read_csv. El unico argumento que es ignorado
                 es storage_options.
@@ -103,15 +253,179 @@ class Datalake(object):
             kwargs.pop('storage_options')
 
         if type(ruta) == str:
-            self._verificar_extension(ruta, '.csv', '.txt', '.tsv')
-            df = pd.read_csv(f"az://{ruta}", storage_options=self.storage_options, **kwargs)
+            self._verificar_extension(ruta, '.csv', '.txt', '.tsv', comprimido=True)
+            df = self._leer_archivo_csv(ruta, **kwargs)
         else:
-            [self._verificar_extension(r, '.csv', '.txt', '.tsv') for r in ruta]
-            rutas = [pd.read_csv(f"az://{r}", storage_options=self.storage_options, **kwargs) for r in ruta]
-            df = pd.concat(rutas, ignore_index=True)
+            [self._verificar_extension(r, '.csv', '.txt', '.tsv', comprimido=True) for r in ruta]
+            rutas = map_ordenado(lambda r: self._leer_archivo_csv(r, **kwargs), ruta, max_workers)
+            with self.metrics.timer("concat"):
+                df = pd.concat(rutas, ignore_index=True)
 
         return df
 
+    def _leer(self, parser, ruta: str, formato: Optional[str] = None, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Lee `ruta` con `parser`, usando el cache local en disco si esta habilitado.
+
+        `formato` es la estrategia de lectura de `read_strategies` con la que se abre el archivo. Cada
+        intento de `retry_policy` vuelve a abrir y leer el archivo completo.
+        """
+
+        def leer() -> pd.DataFrame:
+            ruta_archivo = self._expandir_patron(ruta)
+            if self.disk_cache is None:
+                archivo = self._abrir(ruta_archivo, formato=formato)
+            else:
+                archivo = self.disk_cache.open(self.fs, ruta_archivo)
+                archivo = abrir_comprimido(self.metrics.wrap(archivo), ruta_archivo)
+            return self._procesar(archivo, lambda f: parser(f, **kwargs), "parse")
+
+        return self._reintentar(leer)
+
+    def _expandir_patron(self, ruta: str) -> str:
+        """Primer archivo, en orden alfabetico, que cumple el patrón `ruta` (por ejemplo `datos_*.csv`).
+
+        Conserva el comportamiento de `fsspec.open`. Si `ruta` no es un patrón se retorna sin cambios.
+        """
+        if not glob.has_magic(ruta):
+            return ruta
+        rutas = sorted(self.fs.glob(ruta))
+        if len(rutas) == 0:
+            raise FileNotFoundError(ruta)
+        return rutas[0]
+
+    def _reintentar(self, func: Callable[[], T]) -> T:
+        """Ejecuta la lectura `func` con `retry_policy`, si esta configurada."""
+        if self.retry_policy is None:
+            return func()
+        return self.retry_policy.call(func, self.metrics)
+
+    def _abrir(self, ruta: str, mode: str = 'rb', formato: Optional[str] = None):
+        """Abre `ruta` en el filesystem del datalake, medido si las metricas estan habilitadas.
+
+        Si `ruta` termina en un sufijo de compresión (`.gz`, `.bz2`, `.xz`, `.zst`) el archivo se
+        descomprime o comprime por bloques, las metricas registran los bytes comprimidos. En lectura,
+        `formato` define los argumentos de `fs.open` según `read_strategies`.
+        """
+        opciones = self.read_strategies.get(formato) or {}
+        return abrir_comprimido(self.metrics.wrap(self.fs.open(ruta, mode, **opciones), mode), ruta, mode)
+
+    @staticmethod
+    def _formato_lectura(formato: str, kwargs: Dict[str, Any]) -> str:
+        """Estrategia de lectura de `formato`, `head` si solo se leen las primeras filas (`nrows`)."""
+        return 'head' if kwargs.get('nrows') is not None else formato
+
+    def _procesar(self, archivo, func, etapa: str) -> Any:
+        """Ejecuta `func` con el archivo abierto y registra en `etapa` su tiempo sin incluir la transferencia."""
+        with archivo as f:
+            if not self.metrics.enabled:
+                return func(f)
+            inicio = time.perf_counter()
+            resultado = func(f)
+            self.metrics.observe(etapa, time.perf_counter() - inicio - f.segundos)
+            return resultado
+
+    def _leer_csv_arrow(self, ruta: str, **kwargs: Optional[Any]) -> pa.Table:
+        """Lee un solo archivo CSV con `pyarrow.csv.read_csv`, si no existe levanta `ArchivoNoEncontrado`."""
+        try:
+            return self._leer(pacsv.read_csv, ruta, formato='csv', **kwargs)
+        except ERRORES_NO_ENCONTRADO:
+            raise ArchivoNoEncontrado(ruta)
+
+    @staticmethod
+    def _opciones_csv_arrow(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Traducir los argumentos de `pd.read_csv` soportados a opciones de `pyarrow.csv.read_csv`."""
+        kwargs = {k: v for k, v in kwargs.items() if k != 'storage_options'}
+        opciones = {k: kwargs.pop(k) for k in ('read_options', 'parse_options', 'convert_options') if k in kwargs}
+        sep, encoding, usecols = kwargs.pop('sep', None), kwargs.pop('encoding', None), kwargs.pop('usecols', None)
+        if kwargs:
+            raise ValueError(f"argumentos no soportados con csv_engine='pyarrow': {sorted(kwargs)}")
+        if sep is not None:
+            opciones.setdefault('parse_options', pacsv.ParseOptions(delimiter=sep))
+        if encoding is not None:
+            opciones.setdefault('read_options', pacsv.ReadOptions(encoding=encoding))
+        if usecols is not None:
+            opciones.setdefault('convert_options', pacsv.ConvertOptions(include_columns=list(usecols)))
+        return opciones
+
+    def _leer_archivo_csv(self, ruta: str, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Lee un solo archivo CSV, si no existe levanta `ArchivoNoEncontrado` con la ruta."""
+        try:
+            return self._leer(pd.read_csv, ruta, formato=self._formato_lectura('csv', kwargs), **kwargs)
+        except ERRORES_NO_ENCONTRADO:
+            raise ArchivoNoEncontrado(ruta)
+
+    def iter_csv(
+        self, ruta: Union[str, List[str]], chunksize: int = 100_000, **kwargs: Optional[Any]
+    ) -> Iterator[pd.DataFrame]:
+        """Leer archivos CSV desde la cuenta de datalake por bloques de filas.
+
+        A diferencia de `read_csv`, no construye un solo DataFrame: retorna un generador que lee
+        el archivo de manera incremental desde el blob, de esta manera el consumo de memoria depende
+        del tamaño del bloque y no del tamaño del archivo.
+
+        Args:
+            ruta: Ruta o lista de rutas a leer, ver `read_csv`. Las listas se leen en orden.
+            chunksize: número máximo de filas de cada DataFrame.
+            **kwargs: argumentos a pasar a pd.read_csv. Los argumentos storage_options e
+                iterator son ignorados.
+
+        Yields:
+            Dataframes con máximo `chunksize` filas.
+        """
+        kwargs.pop('storage_options', None)
+        kwargs.pop('iterator', None)
+        rutas = [ruta] if isinstance(ruta, str) else ruta
+        [self._verificar_extension(r, '.csv', '.txt', '.tsv', comprimido=True) for r in rutas]
+        for r in rutas:
+            yield from self._iter_archivo_csv(r, chunksize, **kwargs)
+
+    def _iter_archivo_csv(self, ruta: str, chunksize: int, **kwargs: Optional[Any]) -> Iterator[pd.DataFrame]:
+        """Lee un solo archivo CSV por bloques, si no existe levanta `ArchivoNoEncontrado` con la ruta."""
+        with contextlib.ExitStack() as stack:
+            try:
+                archivo = self._abrir(self._expandir_patron(ruta), formato=self._formato_lectura('csv', kwargs))
+                archivo = stack.enter_context(archivo)
+                chunks = stack.enter_context(pd.read_csv(archivo, chunksize=chunksize, **kwargs))
+            except ERRORES_NO_ENCONTRADO:
+                raise ArchivoNoEncontrado(ruta)
+            yield from chunks
+
+    @medir_operacion("peek_csv")
+    @raiseArchivoNoEncontrado
+    def peek_csv(self, ruta: str, nbytes: int = 2**16, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Vista previa de un archivo CSV descargando solo sus primeros `nbytes`.
+
+        Hace una sola solicitud por rango (`fs.cat_file(ruta, start=0, end=nbytes)`), sin importar el tamaño
+        del archivo, y descarta la ultima linea si quedo incompleta. Sirve para revisar el esquema o las primeras
+        filas de archivos grandes. Los archivos comprimidos se descomprimen hasta donde alcancen los bytes leidos,
+        en `.bz2` y `.zst` `nbytes` debe incluir al menos un bloque comprimido completo (del orden de cientos de KiB
+        en `.bz2`).
+
+        Args:
+            ruta: ruta del archivo, ver `read_csv`.
+            nbytes: número de bytes a descargar, debe alcanzar al menos para el encabezado.
+            **kwargs: argumentos a pasar a pd.read_csv, por ejemplo `nrows` o `dtype`.
+
+        Returns:
+            Dataframe con las filas completas contenidas en los primeros `nbytes`.
+        """
+        kwargs.pop('storage_options', None)
+        self._verificar_extension(ruta, '.csv', '.txt', '.tsv', comprimido=True)
+
+        with self.metrics.timer("download"):
+            data = self._reintentar(lambda: self.fs.cat_file(ruta, start=0, end=nbytes))
+        self.metrics.increment("blobs_read")
+        self.metrics.increment("bytes_read", len(data))
+
+        completo = len(data) < nbytes
+        if inferir_compresion(ruta) is not None:
+            data = descomprimir_inicio(data, ruta)
+        if not completo:
+            data = data[: data.rfind(b"\n") + 1]
+        with self.metrics.timer("parse"):
+            return pd.read_csv(io.BytesIO(data), **kwargs)
+
+    @medir_operacion("read_excel")
     @raiseArchivoNoEncontrado
     def read_excel(self, ruta: str, experimental: bool = False, **kwargs: Optional[Any]) -> pd.DataFrame:
         """Leer un archivo Excel desde la cuenta de datalake.
@@ -124,7 +438,8 @@ class Datalake(object):
         Args:
             ruta: Ruta a leeder el archivo, debe contener una referencia a un archivo
                 `.xlsx` o `.xls`. Recordar que la ruta debe contener esta estructura:
-                `{NOMBRE_CONTENEDOR}/{RUTA}/{nombre o patron}.xlsx`.
+                `{NOMBRE_CONTENEDOR}/{RUTA}/{nombre o patron}.xlsx`. Con un patrón se lee el primer
+                archivo en orden alfabetico que lo cumple.
             force_client: Bandera para forzar el uso del cliente. Es flag todavia es experimental
                 Y en futuras versiones se va ha eliminar. Solo funciona con un solo archivo de excel.
             **kwargs: argumentos a pasar a pd.read_excel.
@@ -146,15 +461,56 @@ class Datalake(object):
         # excel y no se ha reiniciado
         # el runtime se provoca el error: `BadZipFile("File is not a zip file")`.
         # 2. Se debe analizar como integrar en windows donde se usa credenciales asociadas al Active directory.
-        if experimental:
+        if experimental and self.disk_cache is None:
             df = exp.read_excel_with_client(ruta, self.datalake_name, self.storage_options['account_key'], **kwargs)
             return df
         ###############
 
-        df = pd.read_excel(f"az://{ruta}", engine='openpyxl', storage_options=self.storage_options, **kwargs)
+        df = self._leer(pd.read_excel, ruta, engine='openpyxl', **kwargs)
 
         return df
 
+    @medir_operacion("read_excel_sheets")
+    @raiseArchivoNoEncontrado
+    def read_excel_sheets(
+        self,
+        ruta: str,
+        sheet_names: Optional[List[Union[str, int]]] = None,
+        **kwargs: Optional[Any],
+    ) -> Dict[Union[str, int], pd.DataFrame]:
+        """Leer varias hojas de un archivo Excel con una sola descarga.
+
+        El archivo se descarga una vez a memoria (o se toma del cache local si `disk_cache` esta habilitado)
+        y todas las hojas se leen con un solo llamado a `pd.read_excel`, que procesa el libro una sola vez.
+        Funciona con instancias creadas con account key o con credenciales.
+
+        Args:
+            ruta: Ruta del archivo, debe terminar en `.xlsx` o `.xls`.
+            sheet_names: nombres o posiciones de las hojas a leer. Si es `None` se leen todas.
+            **kwargs: argumentos a pasar a pd.read_excel.
+
+        Returns:
+            Diccionario con el nombre (o posición) de cada hoja y su Dataframe, en el orden de `sheet_names`.
+        """
+        kwargs.pop('storage_options', None)
+        kwargs.pop('engine', None)
+        kwargs.pop('sheet_name', None)
+        self._verificar_extension(ruta, '.xlsx', '.xls')
+
+        with self.metrics.timer("download"):
+            if self.disk_cache is not None:
+                with self.disk_cache.open(self.fs, ruta) as f:
+                    data = f.read()
+            else:
+                data = self._reintentar(lambda: self.fs.cat_file(ruta))
+        self.metrics.increment("blobs_read")
+        self.metrics.increment("bytes_read", len(data))
+
+        with self.metrics.timer("parse"):
+            sheet_name = list(sheet_names) if sheet_names is not None else None
+            return pd.read_excel(io.BytesIO(data), sheet_name=sheet_name, engine='openpyxl', **kwargs)
+
+    @medir_operacion("read_json")
     @raiseArchivoNoEncontrado
     def read_json(self, ruta: str, **kwargs: Optional[Any]) -> pd.DataFrame:
         """Leer un archivo Json desde la cuenta de datalake.
@@ -167,7 +523,9 @@ class Datalake(object):
         Args:
             ruta: Ruta a leeder el archivo, debe contener una referencia a un archivo
                 `.json` . Recordar que la ruta debe contener esta estructura:
-                `{NOMBRE_CONTENEDOR}/{RUTA}/{nombre o patron}.json`.
+                `{NOMBRE_CONTENEDOR}/{RUTA}/{nombre o patron}.json`. Con un patrón se lee el primer
+                archivo en orden alfabetico que lo cumple. También acepta archivos comprimidos, por
+                ejemplo `.json.gz` o `.json.zst`.
             **kwargs: argumentos a pasar a pd.read_json.
 
 
@@ -177,12 +535,13 @@ class Datalake(object):
         if 'storage_options' in kwargs:
             kwargs.pop('storage_options')
 
-        self._verificar_extension(ruta, '.json')
+        self._verificar_extension(ruta, '.json', comprimido=True)
 
-        df = pd.read_json(f"az://{ruta}", storage_options=self.storage_options, **kwargs)
+        df = self._leer(pd.read_json, ruta, formato=self._formato_lectura('json', kwargs), **kwargs)
 
         return df
 
+    @medir_operacion("read_parquet")
     @raiseArchivoNoEncontrado
     def read_parquet(self, ruta: str, **kwargs: Optional[Any]) -> pd.DataFrame:
         """Leer un archivo parquet desde la cuenta de datalake.
@@ -204,10 +563,35 @@ class Datalake(object):
         """
         if 'storage_options' in kwargs:
             kwargs.pop('storage_options')
-        df = pd.read_parquet(f"az://{ruta}", storage_options=self.storage_options, **kwargs)
+        if self.disk_cache is not None:
+            return self._leer(pd.read_parquet, ruta, **kwargs)
+        if ruta.endswith('.parquet'):
+            return self._leer_archivo_parquet(ruta, **kwargs)
+        # con `filesystem` pyarrow también puede leer carpetas con varios archivos parquet.
+        with self.metrics.timer("read"):
+            df = self._reintentar(lambda: pd.read_parquet(ruta, filesystem=self.fs, **kwargs))
 
         return df
 
+    def _leer_archivo_parquet(self, ruta: str, **kwargs: Optional[Any]) -> pd.DataFrame:
+        """Lee un solo archivo parquet empezando por el footer.
+
+        `fsspec.parquet.open_parquet_file` lee primero el final del archivo (`footer_sample_size` de la
+        estrategia `parquet`) y con los metadatos descarga en una sola llamada (`cat_ranges`) solo los
+        rangos de las columnas en `columns`.
+        """
+        opciones = self.read_strategies.get('parquet') or {}
+
+        def leer() -> pd.DataFrame:
+            with self.metrics.timer("download"):
+                archivo = fsspec_parquet.open_parquet_file(
+                    self._expandir_patron(ruta), fs=self.fs, columns=kwargs.get('columns'), engine='pyarrow', **opciones
+                )
+            return self._procesar(self.metrics.wrap(archivo), lambda f: pd.read_parquet(f, **kwargs), "parse")
+
+        return self._reintentar(leer)
+
+    @medir_operacion("read_csv_with_partition")
     def read_csv_with_partition(
         self,
         ruta: str,
@@ -215,20 +599,25 @@ class Datalake(object):
         partition_exclusion: Dict[str, List[str]] = None,
         partition_inclusion: Dict[str, List[str]] = None,
         last_modified_last_level: bool = True,
+        max_workers: Optional[int] = None,
+        categorical_partitions: Optional[bool] = None,
+        partition_types: Optional[Dict[str, Any]] = None,
+        csv_engine: Literal["pandas", "pyarrow"] = "pandas",
+        as_arrow: bool = False,
+        modified_after: Optional[datetime.datetime] = None,
+        checkpoint: Optional[str] = None,
         **kwargs: Optional[Any],
-    ) -> pd.DataFrame:
+    ) -> Union[pd.DataFrame, pa.Table]:
         """Leer un archivo CSV desde la cuenta de datalake con particiones Hive.
 
         Una partición tipo Hive son archivos almacenados de la forma
         /ruta/to/archivo/particion_1=1/particion2=2/archivo_con_info.extension.
 
-        **IMPORTANTE**: por el momento el funcionamiento de esta función es solo soportada
-        si el objeto fue creado mediante `from_account_key`.
-
         Esta función hace una envoltura de `read_csv` que asu vez usa [pd.read_csv].
         usar la documentación de la función para determinar parametros adicionales.
 
         [pd.read_csv]: https://pandas.pydata.org/docs/reference/api/pandas.read_csv.html
+        [pyarrow.csv]: https://arrow.apache.org/docs/python/csv.html
 
         Args:
 
@@ -249,14 +638,57 @@ class Datalake(object):
                 `partition_cols=None`.
             last_modified_last_level: Define si el ultimo nivel no se tiene en cuenta para particiones y
                 se carga el archivo que fue modificado de manera más reciente.
+            max_workers: número máximo de particiones que se leen de manera simultanea. Por defecto
+                es `None` y la lectura es secuencial. El resultado conserva el orden de las particiones.
+            categorical_partitions: agregar las columnas de las particiones como `pd.Categorical`,
+                construidas una sola vez a partir del indice de particiones, en lugar de repetir el valor
+                como string en cada fila. Reduce el consumo de memoria y acelera los `groupby` por partición.
+                Por defecto es `True` con `csv_engine="pyarrow"` y `False` con `csv_engine="pandas"`.
+            partition_types: tipo de pandas de las columnas de las particiones, por ejemplo
+                `{'year': 'int64', 'load_date': 'datetime64[ns]'}`. Por defecto son string.
+            csv_engine: `pandas` lee cada archivo con [pd.read_csv]. `pyarrow` lee cada archivo con el
+                lector multi-hilo de [pyarrow.csv] a una tabla de Arrow, agrega las particiones como
+                arreglos diccionario, une las tablas sin copiar los datos y convierte a pandas una sola vez.
+                Con `pyarrow` los unicos argumentos soportados en `kwargs` son `sep`, `encoding`, `usecols`
+                y las opciones de pyarrow `read_options`, `parse_options` y `convert_options`, que tienen
+                prioridad sobre los anteriores.
+            as_arrow: solo con `csv_engine="pyarrow"`, retornar la tabla de Arrow sin convertir a pandas.
+            modified_after: lectura incremental, solo se leen los archivos modificados despues de esta fecha
+                (`last_modified`). Si no hay archivos nuevos el resultado es vacio.
+            checkpoint: ruta en el datalake de un archivo json donde se guarda la marca de agua, por ejemplo
+                `contenedor/checkpoints/tabla.json`. Si existe y no se pasa `modified_after`, se leen solo los
+                archivos modificados despues de la marca de agua guardada. La lectura no modifica el checkpoint,
+                la nueva marca de agua se guarda con `commit_checkpoint` despues de procesar el resultado.
+                **NOTA**: `last_modified` tiene resolución de segundos, un archivo escrito en el mismo segundo
+                de la marca de agua pero despues de la lectura no se lee en la siguiente.
             **kwargs: argumentos a pasar a pd.read_csv. El unico argumento que es ignorado
                 es storage_options.
 
         Returns:
-            Dataframe con la informacion del la ruta.
+            Dataframe con la informacion del la ruta, o `pyarrow.Table` si `as_arrow=True`. La marca de agua
+            para la siguiente lectura incremental, el `last_modified` más reciente de los archivos leidos, queda
+            en `df.attrs["watermark"]` (en la tabla de Arrow, en la metadata `watermark` del esquema).
+
+        Ejemplo de una carga incremental:
+
+        ```python
+        checkpoint = "contenedor/checkpoints/tabla.json"
+        df = dl.read_csv_with_partition("contenedor/tabla/", checkpoint=checkpoint)
+        procesar(df)
+        dl.commit_checkpoint(checkpoint, df)
+        ```
         """
         if not ruta.endswith("/"):
             raise ValueError("ruta debe finalizar en /")
+        if csv_engine not in ("pandas", "pyarrow"):
+            raise ValueError(f"csv_engine debe ser 'pandas' o 'pyarrow', no {csv_engine}")
+        if as_arrow and csv_engine != "pyarrow":
+            raise ValueError("as_arrow requiere csv_engine='pyarrow'")
+        opciones_arrow = self._opciones_csv_arrow(kwargs) if csv_engine == "pyarrow" else None
+        if categorical_partitions is None:
+            categorical_partitions = csv_engine == "pyarrow"
+        if checkpoint is not None and modified_after is None:
+            modified_after = self._leer_checkpoint(checkpoint)
 
         particiones = HivePartitiion(
             ruta=ruta,
@@ -265,40 +697,550 @@ class Datalake(object):
             partition_inclusion=partition_inclusion,
             last_modified_last_level=last_modified_last_level,
             fs=self.fs,
+            manifest_cache=self.manifest_cache,
+            metrics=self.metrics,
+            modified_after=modified_after,
         )
         list_of_files = particiones.get_partition_list()
-        list_of_dfs = []
-        for path_, particion in zip(list_of_files, particiones.get_partition_files()):
+
+        if modified_after is not None and len(list_of_files) == 0:
+            logging.info(f"{ruta} no tiene archivos modificados despues de {modified_after}")
+            resultado = pa.table({}) if as_arrow else pd.DataFrame()
+        elif opciones_arrow is not None:
+            resultado = self._leer_particiones_arrow(
+                ruta, particiones, opciones_arrow, max_workers, categorical_partitions, partition_types, as_arrow
+            )
+        else:
+            resultado = self._leer_particiones_csv(
+                particiones, max_workers, categorical_partitions, partition_types, **kwargs
+            )
+        return self._con_watermark(resultado, particiones.watermark)
+
+    def _leer_particiones_arrow(
+        self,
+        ruta: str,
+        particiones: HivePartitiion,
+        opciones_arrow: Dict[str, Any],
+        max_workers: Optional[int],
+        categorical_partitions: bool,
+        partition_types: Optional[Dict[str, Any]],
+        as_arrow: bool,
+    ) -> Union[pd.DataFrame, pa.Table]:
+        """Leer las particiones con `pyarrow.csv`, ver `read_csv_with_partition`."""
+        list_of_files = particiones.get_partition_list()
+        [self._verificar_extension(r, '.csv', '.txt', '.tsv', comprimido=True) for r in list_of_files]
+        tables = map_ordenado(lambda path_: self._leer_csv_arrow(path_, **opciones_arrow), list_of_files, max_workers)
+        if len(tables) == 0:
+            raise ArchivoNoEncontrado(ruta)
+        with self.metrics.timer("concat"):
+            table = pa.concat_tables(tables, promote_options="default")
+        filas = np.repeat(np.arange(len(tables)), [table_.num_rows for table_ in tables])
+        for key, (codes, categories) in particiones.get_partition_categories(partition_types).items():
+            codes = codes[filas].astype(np.int32)
+            column = pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), pa.array(categories))
+            if not categorical_partitions:
+                column = column.dictionary_decode()
+            if key in table.column_names:
+                table = table.set_column(table.column_names.index(key), key, column)
+            else:
+                table = table.append_column(key, column)
+        if as_arrow:
+            return table
+        with self.metrics.timer("concat"):
+            return table.to_pandas()
+
+    def _leer_particiones_csv(
+        self,
+        particiones: HivePartitiion,
+        max_workers: Optional[int],
+        categorical_partitions: bool,
+        partition_types: Optional[Dict[str, Any]],
+        **kwargs: Optional[Any],
+    ) -> pd.DataFrame:
+        """Leer las particiones con `read_csv`, ver `read_csv_with_partition`."""
+        list_of_files = particiones.get_partition_list()
+        if categorical_partitions:
+            list_of_dfs = map_ordenado(lambda path_: self.read_csv(path_, **kwargs), list_of_files, max_workers)
+            with self.metrics.timer("concat"):
+                df = pd.concat(list_of_dfs, ignore_index=True)
+            filas = np.repeat(np.arange(len(list_of_dfs)), [len(df_) for df_ in list_of_dfs])
+            return self._asignar_categorias(df, particiones.get_partition_categories(partition_types), filas)
+
+        def leer_particion(path_y_particion) -> pd.DataFrame:
+            path_, particion = path_y_particion
             particiones_cols = particion[1]
-            df = self.read_csv(path_, **kwargs).assign(**particiones_cols)
-            list_of_dfs.append(df)
+            return self.read_csv(path_, **kwargs).assign(**particiones_cols)
+
+        list_of_dfs = map_ordenado(
+            leer_particion, zip(list_of_files, particiones.get_partition_files()), max_workers=max_workers
+        )
+
+        with self.metrics.timer("concat"):
+            return self._tipar_particiones(pd.concat(list_of_dfs, ignore_index=True), partition_types)
+
+    def _leer_checkpoint(self, checkpoint: str) -> Optional[datetime.datetime]:
+        """Leer la marca de agua guardada en `checkpoint`, `None` si no existe."""
+        try:
+            with self._abrir(checkpoint) as f:
+                watermark = json.load(f).get("watermark")
+        except ERRORES_NO_ENCONTRADO:
+            logging.info(f"no existe el checkpoint {checkpoint}, se leen todos los archivos")
+            return None
+        return datetime.datetime.fromisoformat(watermark) if watermark is not None else None
+
+    def commit_checkpoint(
+        self, checkpoint: str, resultado: Union[pd.DataFrame, pa.Table, datetime.datetime, None]
+    ) -> Optional[datetime.datetime]:
+        """Guardar en `checkpoint` la marca de agua de una lectura incremental.
+
+        Se llama despues de procesar el resultado de `read_csv_with_partition` o `read_parquet_with_partition`
+        con `checkpoint`. Si el procesamiento falla y no se guarda, la siguiente lectura vuelve a leer los mismos
+        archivos.
 
-        return pd.concat(list_of_dfs, ignore_index=True)
+        Args:
+            checkpoint: ruta del archivo json de la marca de agua, la misma de la lectura.
+            resultado: resultado de la lectura (`df.attrs["watermark"]` o la metadata `watermark` de la tabla
+                de Arrow) o la marca de agua. Si no tiene marca de agua no se modifica el checkpoint.
+
+        Returns:
+            la marca de agua guardada, `None` si no se guardó.
+        """
+        if isinstance(resultado, pa.Table):
+            valor = (resultado.schema.metadata or {}).get(b"watermark")
+            watermark = datetime.datetime.fromisoformat(valor.decode()) if valor is not None else None
+        elif isinstance(resultado, pd.DataFrame):
+            watermark = resultado.attrs.get("watermark")
+        else:
+            watermark = resultado
+        if watermark is None:
+            return None
+        with self._abrir(checkpoint, "wb") as f:
+            f.write(json.dumps({"watermark": watermark.isoformat()}).encode())
+        return watermark
+
+    def _con_watermark(
+        self, resultado: Union[pd.DataFrame, pa.Table], watermark: Optional[datetime.datetime]
+    ) -> Union[pd.DataFrame, pa.Table]:
+        """Agregar la marca de agua al resultado de una lectura."""
+        if isinstance(resultado, pa.Table):
+            if watermark is None:
+                return resultado
+            metadata = {**(resultado.schema.metadata or {}), b"watermark": watermark.isoformat().encode()}
+            return resultado.replace_schema_metadata(metadata)
+        resultado.attrs["watermark"] = watermark
+        return resultado
+
+    @staticmethod
+    def _asignar_categorias(df: pd.DataFrame, categorias: Dict[str, Any], filas: np.ndarray) -> pd.DataFrame:
+        """Agregar las columnas de las particiones como `pd.Categorical`.
+
+        Args:
+            df: DataFrame al que se agregan las columnas, se modifica inplace.
+            categorias: resultado de `HivePartitiion.get_partition_categories`.
+            filas: posición en `get_partition_list` de la partición de cada fila de `df`.
+        """
+        for key, (codes, categories) in categorias.items():
+            df[key] = pd.Categorical.from_codes(codes[filas], categories=categories)
+        return df
 
-    def write_csv(self, df: pd.DataFrame, ruta, **kwargs: Optional[Any]) -> None:
-        """Escribir al archivo."""
-        if not self._verificar_extension(ruta, '.csv', '.txt', '.tsv'):
+    @staticmethod
+    def _tipar_particiones(df: pd.DataFrame, partition_types: Optional[Dict[str, Any]]) -> pd.DataFrame:
+        """Convertir las columnas de las particiones a los tipos de `partition_types`, inplace."""
+        for key, dtype in (partition_types or {}).items():
+            if key in df:
+                df[key] = df[key].astype(dtype)
+        return df
+
+    def iter_csv_with_partition(
+        self,
+        ruta: str,
+        partition_cols: Dict[str, List[str]] = None,
+        partition_exclusion: Dict[str, List[str]] = None,
+        partition_inclusion: Dict[str, List[str]] = None,
+        last_modified_last_level: bool = True,
+        chunksize: int = 100_000,
+        categorical_partitions: bool = True,
+        partition_types: Optional[Dict[str, Any]] = None,
+        **kwargs: Optional[Any],
+    ) -> Iterator[pd.DataFrame]:
+        """Leer archivos CSV con particiones Hive por bloques de filas.
+
+        Version por bloques de `read_csv_with_partition`: las particiones se leen en orden
+        y cada bloque ya tiene asignadas las columnas de la partición. El consumo de memoria
+        depende del tamaño del bloque y no del tamaño de la tabla.
+
+        Args:
+            ruta: Ruta de la tabla, debe finalizar en `/`. Ver `read_csv_with_partition`.
+            partition_cols: ver `read_csv_with_partition`.
+            partition_exclusion: ver `read_csv_with_partition`.
+            partition_inclusion: ver `read_csv_with_partition`.
+            last_modified_last_level: ver `read_csv_with_partition`.
+            chunksize: número máximo de filas de cada DataFrame.
+            categorical_partitions: ver `read_csv_with_partition`. Las columnas de todos los bloques
+                tienen las mismas categorias, de esta manera `pd.concat` de los bloques las conserva.
+            partition_types: ver `read_csv_with_partition`.
+            **kwargs: argumentos a pasar a pd.read_csv.
+
+        Yields:
+            Dataframes con máximo `chunksize` filas y las columnas de la partición.
+        """
+        if not ruta.endswith("/"):
+            raise ValueError("ruta debe finalizar en /")
+
+        particiones = HivePartitiion(
+            ruta=ruta,
+            partition_cols=partition_cols,
+            partition_exclusion=partition_exclusion,
+            partition_inclusion=partition_inclusion,
+            last_modified_last_level=last_modified_last_level,
+            fs=self.fs,
+            manifest_cache=self.manifest_cache,
+            metrics=self.metrics,
+        )
+        categorias = particiones.get_partition_categories(partition_types) if categorical_partitions else None
+        list_of_files = zip(particiones.get_partition_list(), particiones.get_partition_files())
+        for i, (path_, particion) in enumerate(list_of_files):
+            for chunk in self.iter_csv(path_, chunksize=chunksize, **kwargs):
+                if categorias is None:
+                    yield self._tipar_particiones(chunk.assign(**particion[1]), partition_types)
+                else:
+                    yield self._asignar_categorias(chunk, categorias, np.full(len(chunk), i))
+
+    @medir_operacion("read_parquet_with_partition")
+    def read_parquet_with_partition(
+        self,
+        ruta: str,
+        partition_cols: Dict[str, List[str]] = None,
+        partition_exclusion: Dict[str, List[str]] = None,
+        partition_inclusion: Dict[str, List[str]] = None,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Union[ds.Expression, List[Any]]] = None,
+        categorical_partitions: bool = True,
+        partition_types: Optional[Dict[str, Any]] = None,
+        modified_after: Optional[datetime.datetime] = None,
+        checkpoint: Optional[str] = None,
+        **kwargs: Optional[Any],
+    ) -> pd.DataFrame:
+        """Leer archivos parquet desde la cuenta de datalake con particiones Hive.
+
+        Las particiones se descubren con las mismas reglas de `read_csv_with_partition`
+        (`partition_cols`, `partition_exclusion` y `partition_inclusion`), luego los archivos
+        seleccionados se leen con [pyarrow.dataset] sobre el filesystem del datalake, de esta manera
+        los filtros por fila (`filters`) y la selección de columnas (`columns`) se aplican en la lectura
+        y solo se descargan los row groups y columnas necesarios. Con `retry_policy` cada intento vuelve
+        a leer el dataset completo.
+
+        [pyarrow.dataset]: https://arrow.apache.org/docs/python/dataset.html
+
+        Args:
+            ruta: Ruta de la tabla, debe finalizar en `/`. Ver `read_csv_with_partition`.
+            partition_cols: Definir que particiones incluir. Si se pasa `None`, se activa el
+                descubrimiento automatico de las particiones. Se leen todos los archivos de cada partición,
+                excepto los que empiezan por `_` o `.`.
+            partition_exclusion: Definir que particiones excluir.
+            partition_inclusion: Definir la particiones a incluir.
+            columns: columnas a leer, pueden incluir las columnas de las particiones.
+                Por defecto se leen todas.
+            filters: filtro por fila, puede ser una expresión de `pyarrow.dataset` o una lista
+                en el formato de `filters` de [pd.read_parquet], por ejemplo `[('valor', '>', 10)]`.
+                Las columnas de las particiones son de tipo string.
+            categorical_partitions: convertir las columnas de las particiones en `pd.Categorical`, las particiones
+                nulas (`__HIVE_DEFAULT_PARTITION__`) quedan como valores nulos. Si es `False` son columnas string.
+            partition_types: tipo de pandas de las columnas de las particiones, ver `read_csv_with_partition`.
+                La conversión se aplica despues de los filtros.
+            modified_after: lectura incremental, ver `read_csv_with_partition`.
+            checkpoint: marca de agua de la lectura incremental, ver `read_csv_with_partition`.
+            **kwargs: argumentos a pasar a `pyarrow.dataset.Dataset.to_table`.
+
+        Returns:
+            Dataframe con la informacion de la ruta y las columnas de las particiones. La marca de agua
+            para la siguiente lectura incremental queda en `df.attrs["watermark"]`.
+        """
+        if not ruta.endswith("/"):
+            raise ValueError("ruta debe finalizar en /")
+
+        particiones = HivePartitiion(
+            ruta=ruta,
+            partition_cols=partition_cols,
+            partition_exclusion=partition_exclusion,
+            partition_inclusion=partition_inclusion,
+            last_modified_last_level=False,
+            fs=self.fs,
+            manifest_cache=self.manifest_cache,
+            metrics=self.metrics,
+            modified_after=modified_after,
+        )
+        list_of_files = [
+            path_ for path_ in particiones.get_partition_list() if not path_.split("/")[-1].startswith(("_", "."))
+        ]
+        if len(list_of_files) == 0 and modified_after is not None:
+            logging.info(f"{ruta} no tiene archivos modificados despues de {modified_after}")
+            return self._con_watermark(pd.DataFrame(), particiones.watermark)
+        if len(list_of_files) == 0:
+            raise ArchivoNoEncontrado(ruta)
+
+        keys = list(dict.fromkeys(k for particion in particiones.get_partition_files() for k in particion[1]))
+        partitioning = ds.partitioning(pa.schema([(k, pa.string()) for k in keys]), flavor="hive")
+        if filters is not None and not isinstance(filters, ds.Expression):
+            filters = pq.filters_to_expression(filters)
+
+        def leer() -> pa.Table:
+            dataset = ds.dataset(
+                list_of_files, filesystem=self.fs, format="parquet", partitioning=partitioning, partition_base_dir=ruta
+            )
+            return dataset.to_table(columns=columns, filter=filters, **kwargs)
+
+        with self.metrics.timer("read"):
+            table = self._reintentar(leer)
+            if categorical_partitions:
+                # un solo diccionario por columna, los diccionarios inferidos por pyarrow no se pueden unificar
+                # en `to_pandas` cuando hay particiones nulas (`__HIVE_DEFAULT_PARTITION__`).
+                for key in keys:
+                    if key in table.column_names:
+                        column = table.column(key).combine_chunks().dictionary_encode()
+                        table = table.set_column(table.column_names.index(key), key, column)
+            df = table.to_pandas()
+
+        for key, dtype in (partition_types or {}).items():
+            if key in df and isinstance(df[key].dtype, pd.CategoricalDtype):
+                codes, categories = typed_categories(df[key].cat.codes.to_numpy(), df[key].cat.categories, dtype)
+                df[key] = pd.Categorical.from_codes(codes, categories=categories)
+            elif key in df:
+                df[key] = df[key].astype(dtype)
+        return self._con_watermark(df, particiones.watermark)
+
+    @medir_operacion("write_csv")
+    def write_csv(
+        self,
+        df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        ruta,
+        limpiar_inplace: bool = False,
+        chunksize: Optional[int] = None,
+        **kwargs: Optional[Any],
+    ) -> None:
+        """Escribir al archivo.
+
+        Antes de escribir, en las columnas string se reemplaza el separador y los saltos de linea por espacios.
+
+        Si se pasa `chunksize` o `df` es un iterador de DataFrames, la escritura se hace por bloques:
+        cada bloque de filas se limpia, se serializa y se sube como un bloque del blob mientras se
+        serializa el siguiente. El blob solo se confirma al final, si hay un error no se modifica el
+        archivo existente. De esta manera el consumo de memoria depende del tamaño del bloque.
+
+        Args:
+            df: dataframe a escribir o iterador de DataFrames con las mismas columnas.
+            ruta: ruta del archivo, debe terminar en `.csv`, `.txt` o `.tsv`. Con un sufijo de
+                compresión (`.gz`, `.bz2`, `.xz`, `.zst`) el archivo se comprime por bloques al escribir.
+            limpiar_inplace: si es `True` la limpieza modifica `df` directamente, sin crear una copia.
+            chunksize: número de filas de cada bloque en la escritura por bloques.
+            **kwargs: argumentos a pasar a `df.to_csv`.
+        """
+        if not self._verificar_extension(ruta, '.csv', '.txt', '.tsv', comprimido=True):
             raise ExtensionIncorrecta(ruta)
 
         sep = kwargs.get('sep', ',')
-        df_to_write = self._limpiar_df_cols_str(df, sep)
-        df_to_write.to_csv(f"az://{ruta}", storage_options=self.storage_options, **kwargs)
-
+        if isinstance(df, pd.DataFrame) and chunksize is None:
+            df_to_write = self._limpiar_df_cols_str(df, sep, inplace=limpiar_inplace)
+            kwargs.pop('storage_options', None)
+            self._procesar(self._abrir(ruta, 'wb'), lambda f: df_to_write.to_csv(f, **kwargs), "serialize")
+            return
+
+        if isinstance(df, pd.DataFrame):
+            chunks = (df.iloc[i : i + chunksize] for i in range(0, len(df), chunksize))
+            limpiar_inplace = False
+        else:
+            chunks = df
+        self._escribir_por_bloques(ruta, self._serializar_csv(chunks, sep, limpiar_inplace, **kwargs))
+
+    def _serializar_csv(
+        self, chunks: Iterable[pd.DataFrame], sep: str, limpiar_inplace: bool, **kwargs: Optional[Any]
+    ) -> Iterator[bytes]:
+        """Limpia y serializa cada bloque a CSV, el encabezado solo se incluye en el primero."""
+        kwargs.pop('storage_options', None)
+        kwargs.pop('mode', None)
+        encoding = kwargs.pop('encoding', None) or 'utf-8'
+        header = kwargs.pop('header', True)
+        for i, chunk in enumerate(chunks):
+            with self.metrics.timer("serialize"):
+                chunk = self._limpiar_df_cols_str(chunk, sep, inplace=limpiar_inplace)
+                parte = chunk.to_csv(header=header if i == 0 else False, **kwargs).encode(encoding)
+            yield parte
+
+    def _escribir_por_bloques(self, ruta: str, partes: Iterable[bytes]) -> None:
+        """Sube `partes` al blob a medida que se generan.
+
+        La escritura al archivo se hace en un hilo, así la generación de la siguiente parte se solapa con
+        la subida de la anterior. adlfs sube cada bloque con `stage_block` y el blob solo se confirma
+        (`commit_block_list`) al cerrar el archivo.
+        """
+        archivo = self._abrir(ruta, "wb")
+        cola: Queue = Queue(maxsize=2)
+        errores: List[BaseException] = []
+
+        def subir() -> None:
+            while True:
+                parte = cola.get()
+                if parte is None:
+                    return
+                if not errores:
+                    try:
+                        archivo.write(parte)
+                    except BaseException as e:
+                        errores.append(e)
+
+        hilo = threading.Thread(target=contextvars.copy_context().run, args=(subir,), daemon=True)
+        hilo.start()
+        try:
+            for parte in partes:
+                if errores:
+                    break
+                cola.put(parte)
+        except BaseException:
+            # fsspec no confirma los bloques al cerrar si el archivo ya fue marcado como `forced`.
+            archivo.forced = True
+            raise
+        finally:
+            cola.put(None)
+            hilo.join()
+            if errores:
+                archivo.forced = True
+            archivo.close()
+
+        if errores:
+            raise errores[0]
+
+    @medir_operacion("write_excel")
     def write_excel(self, df: pd.DataFrame, ruta, **kwargs: Optional[Any]) -> None:
         """Escribir al archivo al datalake."""
         if not self._verificar_extension(ruta, '.xlsx', '.xls'):
             raise ExtensionIncorrecta(ruta)
-        df.to_excel(f"az://{ruta}", storage_options=self.storage_options, **kwargs)
+        kwargs.pop('storage_options', None)
+        self._procesar(self._abrir(ruta, 'wb'), lambda f: df.to_excel(f, **kwargs), "serialize")
 
+    @medir_operacion("write_json")
     def write_json(self, df: pd.DataFrame, ruta, **kwargs: Optional[Any]) -> None:
         """Escribir al archivo al datalake."""
-        if not self._verificar_extension(ruta, '.json'):
+        if not self._verificar_extension(ruta, '.json', comprimido=True):
             raise ExtensionIncorrecta(ruta)
-        df.to_json(f"az://{ruta}", storage_options=self.storage_options, **kwargs)
+        kwargs.pop('storage_options', None)
+
+        def escribir(f) -> None:
+            texto = io.TextIOWrapper(f, encoding='utf-8')
+            df.to_json(texto, **kwargs)
+            # detach escribe el buffer pendiente sin cerrar el archivo.
+            texto.detach()
 
+        self._procesar(self._abrir(ruta, 'wb'), escribir, "serialize")
+
+    @medir_operacion("write_parquet")
     def write_parquet(self, df: pd.DataFrame, ruta, **kwargs: Optional[Any]) -> None:
         """Escribir al archivo al datalake."""
-        df.to_parquet(f"az://{ruta}", storage_options=self.storage_options, **kwargs)
+        kwargs.pop('storage_options', None)
+        self._procesar(self._abrir(ruta, 'wb'), lambda f: df.to_parquet(f, **kwargs), "serialize")
+
+    @medir_operacion("write_csv_with_partition")
+    def write_csv_with_partition(
+        self,
+        df: pd.DataFrame,
+        ruta: str,
+        partition_cols: List[str],
+        file_name: str = "part-0.csv",
+        max_workers: Optional[int] = 8,
+        **kwargs: Optional[Any],
+    ) -> List[str]:
+        """Escribir un DataFrame como una tabla CSV con particiones Hive.
+
+        Las filas se agrupan por `partition_cols` en una sola pasada y cada grupo se escribe con `write_csv`
+        en `ruta/llave_1=valor_1/.../llave_n=valor_n/file_name`, sin las columnas de la partición. La tabla
+        se puede leer con `read_csv_with_partition(ruta, last_modified_last_level=False)`.
+
+        Args:
+            df: dataframe a escribir.
+            ruta: ruta de la tabla, debe finalizar en `/`.
+            partition_cols: columnas por las que se particiona, en el orden de las carpetas. Los valores
+                nulos se escriben como `__HIVE_DEFAULT_PARTITION__` y `read_csv_with_partition` los lee como nulos.
+            file_name: nombre del archivo de cada partición, debe terminar en `.csv`, `.txt` o `.tsv`.
+                Si la partición ya tiene un archivo con este nombre, se reemplaza.
+            max_workers: número máximo de particiones que se suben de manera simultanea.
+            **kwargs: argumentos a pasar a `write_csv`.
+
+        Returns:
+            rutas de los archivos escritos, ordenadas por los valores de las particiones.
+        """
+        self._verificar_extension(file_name, '.csv', '.txt', '.tsv', comprimido=True)
+        return self._escribir_particiones(self.write_csv, df, ruta, partition_cols, file_name, max_workers, **kwargs)
+
+    @medir_operacion("write_parquet_with_partition")
+    def write_parquet_with_partition(
+        self,
+        df: pd.DataFrame,
+        ruta: str,
+        partition_cols: List[str],
+        file_name: str = "part-0.parquet",
+        max_workers: Optional[int] = 8,
+        **kwargs: Optional[Any],
+    ) -> List[str]:
+        """Escribir un DataFrame como una tabla parquet con particiones Hive.
+
+        Ver `write_csv_with_partition`, cada grupo se escribe con `write_parquet`. La tabla se puede
+        leer con `read_parquet_with_partition(ruta)`.
+
+        Args:
+            df: dataframe a escribir.
+            ruta: ruta de la tabla, debe finalizar en `/`.
+            partition_cols: columnas por las que se particiona, en el orden de las carpetas.
+            file_name: nombre del archivo de cada partición.
+            max_workers: número máximo de particiones que se suben de manera simultanea.
+            **kwargs: argumentos a pasar a `write_parquet`.
+
+        Returns:
+            rutas de los archivos escritos.
+        """
+        return self._escribir_particiones(
+            self.write_parquet, df, ruta, partition_cols, file_name, max_workers, **kwargs
+        )
+
+    def _escribir_particiones(
+        self,
+        escribir: Callable[..., None],
+        df: pd.DataFrame,
+        ruta: str,
+        partition_cols: List[str],
+        file_name: str,
+        max_workers: Optional[int],
+        **kwargs: Optional[Any],
+    ) -> List[str]:
+        """Agrupar `df` por `partition_cols` y escribir cada grupo con `escribir`."""
+        if not ruta.endswith("/"):
+            raise ValueError("ruta debe finalizar en /")
+        if len(partition_cols) == 0:
+            raise ValueError("partition_cols debe tener al menos una columna")
+
+        partition_cols = list(partition_cols)
+        grupos = df.groupby(partition_cols, observed=True, dropna=False).indices
+        datos = df.drop(columns=partition_cols)
+        particiones = []
+        for valores, filas in grupos.items():
+            valores = valores if isinstance(valores, tuple) else (valores,)
+            carpeta = "/".join(f"{k}={self._valor_particion(k, v)}" for k, v in zip(partition_cols, valores))
+            particiones.append((f"{ruta}{carpeta}/{file_name}", filas))
+
+        def escribir_particion(particion) -> str:
+            path_, filas = particion
+            escribir(datos.take(filas), path_, **kwargs)
+            return path_
+
+        return map_ordenado(escribir_particion, particiones, max_workers)
+
+    @staticmethod
+    def _valor_particion(columna: str, valor: Any) -> str:
+        """Valor de una partición en la ruta, los nulos se escriben como en Hive."""
+        if pd.isna(valor):
+            return HIVE_DEFAULT_PARTITION
+        texto = str(valor)
+        if "/" in texto:
+            raise ValueError(f"el valor {texto} de la partición {columna} no puede contener /")
+        return texto
 
     def generar_url_con_sas_token(
         self, path: str, duration: int, unit: Literal["day", "hour", "minute", 'second'] = "hour", ip: str = None
@@ -306,8 +1248,41 @@ class Datalake(object):
         """Genera un link sas."""
         return create_url_sas_token(path, self.fs, duration, unit, ip)
 
-    def _verificar_extension(self, ruta: str, *extensiones):
-        """Metodo para verificar extensiones."""
+    def generar_urls_con_sas_token(
+        self,
+        paths: Iterable[str],
+        duration: int,
+        unit: Literal["day", "hour", "minute", 'second'] = "hour",
+        ip: str = None,
+    ) -> Iterator[str]:
+        """Genera links sas para varias rutas.
+
+        La ventana de expiración y la llave para firmar se calculan una sola vez para todas las rutas.
+        En instancias creadas con credenciales se firma con una llave de delegación de usuario, por lo
+        que la duración no puede superar 7 días.
+
+        Args:
+            paths: rutas de los archivos, de la forma `{NOMBRE_CONTENEDOR}/{RUTA}`.
+            duration: duración del link.
+            unit: unidad de `duration`.
+            ip: ip o rango de ips permitidas.
+
+        Returns:
+            iterador con el link de cada ruta, en el mismo orden de `paths`.
+
+        Raises:
+            ValueError: si se firma con una llave de delegación de usuario y la duración supera 7 días.
+        """
+        return create_urls_sas_token(paths, self.fs, duration, unit, ip)
+
+    def _verificar_extension(self, ruta: str, *extensiones, comprimido: bool = False):
+        """Metodo para verificar extensiones.
+
+        Con `comprimido=True` también se aceptan las extensiones con sufijo de compresión,
+        por ejemplo `.csv.gz` o `.json.zst`.
+        """
+        if comprimido:
+            ruta = sin_compresion(ruta)
         for ext in extensiones:
             verificar = ruta.endswith(ext)
             if verificar:
@@ -320,16 +1295,32 @@ class Datalake(object):
             return True
         raise ExtensionIncorrecta(f"{ruta} No termina en /")
 
-    def _limpiar_df_cols_str(self, df: pd.DataFrame, sep: str = ",") -> pd.DataFrame:
-        """Limpia las columnas string del dataframe."""
+    def _limpiar_df_cols_str(self, df: pd.DataFrame, sep: str = ",", inplace: bool = False) -> pd.DataFrame:
+        r"""Limpia las columnas string del dataframe.
+
+        Reemplaza por espacio el separador, `\r` y `\n` con una sola expresión regular. Solo se
+        modifican las celdas de las columnas string que contienen alguno de estos caracteres, el resto
+        de columnas se comparten con `df` sin copiarse.
+
+        Args:
+            df: dataframe a limpiar.
+            sep: separador del archivo.
+            inplace: si es `True` se modifica `df` directamente y no se crea una copia.
+
+        Returns:
+            Dataframe limpio.
+        """
         types = df.dtypes
         string_columns = list(types[types == np.array([object()]).dtype].index)
-        esc_sep = re.escape(sep)
-        df_res = df.copy()
-        df_res[string_columns] = (
-            df[string_columns]
-            .replace(esc_sep, " ", regex=True)
-            .replace("\r", " ", regex=True)
-            .replace("\n", " ", regex=True)
-        )
+        pattern = re.compile("|".join(re.escape(c) for c in dict.fromkeys([sep, "\r", "\n"])))
+        df_res = df if inplace else df.copy(deep=False)
+        for column in string_columns:
+            values = df_res[column]
+            try:
+                to_clean = values.str.contains(pattern, na=False)
+            except AttributeError:
+                # la columna no tiene valores string.
+                continue
+            if to_clean.any():
+                df_res[column] = values.mask(to_clean, values[to_clean].str.replace(pattern, " ", regex=True))
         return df_res
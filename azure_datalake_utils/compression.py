@@ -0,0 +1,206 @@
+"""Lectura y escritura de archivos comprimidos por bloques."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import bz2
+import gzip
+import io
+import lzma
+from typing import IO, Any, Dict, Optional
+
+from azure_datalake_utils._lazy import lazy_import
+
+pa = lazy_import("pyarrow")
+
+# sufijo de la ruta -> codec. zstd usa el codec de pyarrow, así no se requiere `zstandard`.
+COMPRESIONES: Dict[str, str] = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+
+# nivel de gzip en escritura, el 9 por defecto de la libreria estandar es mucho más lento y reduce poco el tamaño.
+GZIP_LEVEL = 6
+
+
+def inferir_compresion(ruta: str) -> Optional[str]:
+    """Codec de `ruta` según su sufijo, `None` si no es un archivo comprimido."""
+    for sufijo, codec in COMPRESIONES.items():
+        if ruta.endswith(sufijo):
+            return codec
+    return None
+
+
+def sin_compresion(ruta: str) -> str:
+    """Ruta sin el sufijo de compresión, por ejemplo `datos.csv.gz` -> `datos.csv`."""
+    for sufijo in COMPRESIONES:
+        if ruta.endswith(sufijo):
+            return ruta[: -len(sufijo)]
+    return ruta
+
+
+def abrir_comprimido(archivo: IO, ruta: str, mode: str = "rb") -> IO:
+    """Envolver `archivo` para descomprimir al leer o comprimir al escribir según el sufijo de `ruta`.
+
+    La compresión se hace por bloques a medida que se lee o escribe, el contenido completo sin comprimir
+    nunca se tiene en memoria. Si `ruta` no tiene sufijo de compresión retorna `archivo` sin cambios.
+
+    Args:
+        archivo: archivo abierto en modo binario, por ejemplo el retornado por `fs.open`.
+        ruta: ruta del archivo, define el codec.
+        mode: `rb` o `wb`.
+
+    Returns:
+        archivo que lee o escribe el contenido sin comprimir.
+    """
+    codec = inferir_compresion(ruta)
+    if codec is None:
+        return archivo
+    return ArchivoComprimido(archivo, codec, mode)
+
+
+def comprimir(data: bytes, ruta: str) -> bytes:
+    """Comprimir `data` en memoria según el sufijo de `ruta`, sin cambios si no tiene sufijo de compresión."""
+    codec = inferir_compresion(ruta)
+    if codec is None:
+        return data
+    buffer = io.BytesIO()
+    with ArchivoComprimido(_SinCerrar(buffer), codec, "wb") as f:
+        f.write(data)
+    return buffer.getvalue()
+
+
+def descomprimir_inicio(data: bytes, ruta: str, bloque: int = 2**16) -> bytes:
+    """Descomprimir el inicio de un archivo, `data` puede ser solo los primeros bytes del archivo comprimido.
+
+    Retorna el contenido que se alcanza a descomprimir antes de que terminen los datos.
+    """
+    partes = []
+    with ArchivoComprimido(io.BytesIO(data), inferir_compresion(ruta)) as f:
+        try:
+            for parte in iter(lambda: f.read1(bloque), b""):
+                partes.append(parte)
+        except (EOFError, OSError):
+            # el archivo comprimido esta truncado.
+            pass
+    return b"".join(partes)
+
+
+class ArchivoComprimido(io.BufferedIOBase):
+    """Archivo binario que comprime o descomprime por bloques el archivo original.
+
+    Al cerrar se cierra el codec y luego el archivo original. Si el archivo original fue marcado como
+    `forced` (escritura fallida), no se confirma su contenido.
+
+    Args:
+        archivo: archivo original abierto en modo binario.
+        codec: `gzip`, `bz2`, `xz` o `zstd`.
+        mode: `rb` o `wb`.
+    """
+
+    def __init__(self, archivo: IO, codec: str, mode: str = "rb") -> None:
+        """Constructor."""
+        super().__init__()
+        self._archivo = archivo
+        self._escritura = "r" not in mode
+        modo = "wb" if self._escritura else "rb"
+        if codec == "gzip":
+            kwargs = {"compresslevel": GZIP_LEVEL} if self._escritura else {}
+            self._codec = gzip.GzipFile(fileobj=archivo, mode=modo, **kwargs)
+        elif codec == "bz2":
+            self._codec = bz2.BZ2File(archivo, mode=modo)
+        elif codec == "xz":
+            self._codec = lzma.LZMAFile(archivo, mode=modo)
+        elif codec == "zstd":
+            # pyarrow cierra el archivo que recibe, el cierre del archivo original se hace en `close`.
+            stream = pa.PythonFile(_SinCerrar(archivo), mode="w" if self._escritura else "r")
+            stream_cls = pa.CompressedOutputStream if self._escritura else pa.CompressedInputStream
+            self._codec = stream_cls(stream, "zstd")
+        else:
+            raise ValueError(f"compresión no soportada: {codec}")
+
+    @property
+    def segundos(self) -> float:
+        """Tiempo de transferencia del archivo original, ver `ArchivoMedido`."""
+        return getattr(self._archivo, "segundos", 0.0)
+
+    @property
+    def forced(self) -> bool:
+        """Si la escritura del archivo original fue abortada."""
+        return getattr(self._archivo, "forced", False)
+
+    @forced.setter
+    def forced(self, value: bool) -> None:
+        """Marcar la escritura del archivo original como abortada."""
+        self._archivo.forced = value
+
+    def readable(self) -> bool:
+        """Si el archivo es de lectura."""
+        return not self._escritura
+
+    def writable(self) -> bool:
+        """Si el archivo es de escritura."""
+        return self._escritura
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Leer hasta `size` bytes sin comprimir."""
+        if size is None or size < 0:
+            return self._codec.read()
+        return self._codec.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        """Leer hasta `size` bytes sin comprimir, con a lo sumo una lectura del archivo original."""
+        if not hasattr(self._codec, "read1"):
+            return self.read(size)
+        return self._codec.read1(size)
+
+    def write(self, data: Any) -> int:
+        """Comprimir y escribir `data`."""
+        self._codec.write(data)
+        return len(data)
+
+    def close(self) -> None:
+        """Cerrar el codec y el archivo original."""
+        if self.closed:
+            return
+        try:
+            if self.forced:
+                # el archivo original ya no acepta escrituras, se descarta el final del codec.
+                try:
+                    self._codec.close()
+                except Exception:
+                    pass
+            else:
+                self._codec.close()
+        finally:
+            self._archivo.close()
+            super().close()
+
+
+class _SinCerrar:
+    """Envoltura de un archivo que ignora `close`, el cierre lo hace `ArchivoComprimido`."""
+
+    def __init__(self, archivo: IO) -> None:
+        """Constructor."""
+        self._archivo = archivo
+
+    @property
+    def closed(self) -> bool:
+        """El archivo siempre esta abierto para el codec."""
+        return False
+
+    def close(self) -> None:
+        """No cerrar el archivo original."""
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegar al archivo original."""
+        return getattr(self._archivo, name)
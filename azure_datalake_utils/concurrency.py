@@ -0,0 +1,55 @@
+"""Utilidades para ejecutar operaciones de I/O de manera concurrente."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_ordenado(func: Callable[[T], R], items: Iterable[T], max_workers: Optional[int] = None) -> List[R]:
+    """Aplica `func` a cada elemento usando un pool de hilos acotado.
+
+    Los resultados se retornan en el mismo orden de `items`, sin importar el orden
+    en que terminen las tareas. Si alguna tarea falla, se cancelan las tareas pendientes
+    y se propaga la excepción de la primera tarea (en orden) que falló. Cada tarea se ejecuta
+    con una copia del contexto (`contextvars`) del hilo que llama, por ejemplo la operación
+    en curso de las metricas.
+
+    Args:
+        func: función a aplicar a cada elemento.
+        items: elementos a procesar.
+        max_workers: número máximo de tareas en ejecución simultanea. Si es `None` o menor
+            a 2, la ejecución es secuencial en el hilo actual.
+
+    Returns:
+        Lista con los resultados en el orden de `items`.
+    """
+    items = list(items)
+    if max_workers is None or max_workers < 2 or len(items) < 2:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
@@ -0,0 +1,126 @@
+"""Cache local en disco de blobs del datalake."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from adlfs import AzureBlobFileSystem
+
+
+class BlobDiskCache:
+    """Cache de lectura en disco local para blobs del datalake.
+
+    Cada blob se guarda con una llave construida con la ruta y su `etag` (o `last_modified`),
+    si el blob cambia en el datalake la llave cambia y se vuelve a descargar. Antes de cada lectura
+    solo se consulta la información del blob (`fs.info`), el contenido no se descarga si ya existe.
+
+    Los archivos se escriben a un temporal y se mueven de manera atomica, por lo que la carpeta se
+    puede compartir entre varios procesos del mismo host. Cuando el tamaño total supera `max_bytes`
+    se eliminan los archivos usados hace más tiempo (LRU).
+
+    Args:
+        directory: carpeta local donde se guardan los archivos.
+        max_bytes: tamaño maximo de la carpeta en bytes. Por defecto 1 GiB.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2**30) -> None:
+        """Constructor."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, fs: AzureBlobFileSystem, ruta: str) -> str:
+        """Retorna la ruta local del blob, descargandolo si no existe en el cache."""
+        # sin el cache de listados del filesystem, que puede tener el etag de un blob sobrescrito.
+        info = fs.info(ruta, refresh=True)
+        version = info.get('etag') or info.get('last_modified') or info.get('mtime') or info.get('created')
+        key = hashlib.sha256(f"{ruta}|{version}|{info.get('size')}".encode()).hexdigest()
+        nombre_archivo = ruta.split("/")[-1]
+        local = os.path.join(self.directory, key[:2], f"{key}_{nombre_archivo}")
+
+        if os.path.exists(local):
+            logging.debug(f"{ruta} encontrado en el cache local.")
+            try:
+                os.utime(local)
+                return local
+            except FileNotFoundError:
+                # otro proceso lo elimino mientras se verificaba.
+                pass
+
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(local), suffix=".tmp")
+        os.close(fd)
+        try:
+            fs.get_file(ruta, tmp_path)
+            os.replace(tmp_path, local)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict(keep=local)
+        return local
+
+    def open(self, fs: AzureBlobFileSystem, ruta: str) -> IO[bytes]:
+        """Abre el blob desde el cache local.
+
+        El archivo queda abierto aunque otro proceso lo elimine del cache, si se elimina entre la
+        descarga y la apertura se vuelve a descargar.
+        """
+        try:
+            return open(self.get(fs, ruta), "rb")
+        except FileNotFoundError:
+            return open(self.get(fs, ruta), "rb")
+
+    def size(self) -> int:
+        """Tamaño total de los archivos en el cache."""
+        return sum(size for _, _, size in self._files())
+
+    def _files(self):
+        """Lista de (ultimo uso, ruta, tamaño) de los archivos del cache."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, path, stat.st_size))
+        return files
+
+    def _evict(self, keep: str) -> None:
+        """Elimina los archivos usados hace más tiempo hasta cumplir `max_bytes`."""
+        files = sorted(self._files())
+        total = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                logging.debug(f"{path} eliminado del cache local.")
+            except FileNotFoundError:
+                pass
+            total -= size
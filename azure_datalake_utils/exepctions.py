@@ -17,6 +17,8 @@
 # under the License.
 from azure.core.exceptions import ResourceNotFoundError
 
+ERRORES_NO_ENCONTRADO = (IndexError, FileNotFoundError, ResourceNotFoundError)
+
 
 class ArchivoNoEncontrado(Exception):
     """Exepction cuando un archivo no es encontrado en el Datalake."""
@@ -46,13 +48,27 @@ class ExtensionIncorrecta(Exception):
         return f'{self.ruta} -> {self.message}'
 
 
+class TiempoAgotado(TimeoutError):
+    """Exepction cuando un intento de lectura supera el tiempo maximo (`deadline`) de `RetryPolicy`."""
+
+    def __init__(self, deadline, message="La lectura supero el tiempo maximo."):
+        """Constructor de la expecion."""
+        self.deadline = deadline
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        """Imprimir el mensaje de la exepecion."""
+        return f'{self.message} ({self.deadline}s)'
+
+
 def raiseArchivoNoEncontrado(func):
     """Decorador para hacer triger la exepción `ArchivoNoEncontrado`."""
 
     def inner_function(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except (IndexError, FileNotFoundError, ResourceNotFoundError):
+        except ERRORES_NO_ENCONTRADO:
             raise ArchivoNoEncontrado("archivo no encontrado")
 
     return inner_function
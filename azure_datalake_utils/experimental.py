@@ -20,26 +20,41 @@ removerla del todo.
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+from __future__ import annotations
+
 import asyncio
+import os
 import tempfile
+import threading
+import time
 import uuid
-from typing import Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from azure.core.credentials import AccessToken
+
+from azure_datalake_utils._lazy import lazy_import
 
-import pandas as pd
-from adlfs import AzureBlobFileSystem
-from azure.identity import InteractiveBrowserCredential
+if TYPE_CHECKING:
+    from azure.identity import InteractiveBrowserCredential
+
+adlfs = lazy_import("adlfs")
+pd = lazy_import("pandas")
 
 
 def read_excel_with_client(ruta: str, account_name: str, account_key: str, **kwargs: Optional[Any]):
     """Metodo para leer Excel descargado el archivo a un temporal."""
-    fs = AzureBlobFileSystem(account_name=account_name, account_key=account_key)
+    fs = adlfs.AzureBlobFileSystem(account_name=account_name, account_key=account_key)
     # TODO: en el futuro si de verdad se necesita el nombre del archivo, hay usa otro metodo
     # que se mas agnostico que asumir que se puede hacer sin un split.
     nombre_archivo = ruta.split("/")[-1]
     tempfilename = f"{tempfile.gettempdir()}/{str(uuid.uuid4())}_{nombre_archivo}"
     fs.download(ruta, tempfilename)
 
-    return pd.read_excel(tempfilename, **kwargs)
+    try:
+        return pd.read_excel(tempfilename, **kwargs)
+    finally:
+        os.remove(tempfilename)
 
 
 class AioCredentialWrapper:
@@ -47,17 +62,67 @@ class AioCredentialWrapper:
 
     Esto se hace mientras en el futuro esta funcionalidad se integra al SDK.
 
+    Los tokens se guardan en memoria hasta `refresh_margin` segundos antes de su expiración
+    (`expires_on`), de esta manera solo se solicita un token por cada periodo de vida y no uno por
+    cada operación contra la cuenta. Si varias corutinas solicitan el mismo token mientras se
+    renueva, todas esperan la misma solicitud. Las solicitudes a la credencial sincrona se ejecutan
+    en un pool de hilos pequeño y dedicado, compartido por todas las instancias.
+
     TODO: verificar como evoluciona este issue: https://github.com/Azure/azure-sdk-for-python/issues/19943.
     """
 
-    def __init__(self, credential: InteractiveBrowserCredential):
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, credential: InteractiveBrowserCredential, refresh_margin: int = 300):
         """Constructor de la clase."""
         self._credential = credential
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[Tuple, AccessToken] = {}
+        self._pending: Dict[Tuple, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
 
     async def get_token(self, *scopes: str, **kwargs):
         """Metodo para obtener el token."""
-        loop = asyncio.get_event_loop()
+        if kwargs.get('claims'):
+            # un challenge de claims siempre requiere un token nuevo.
+            return await self._request_token(scopes, kwargs)
+
+        key = (scopes, tuple(sorted(kwargs.items())))
+        token = self._tokens.get(key)
+        if token is not None and token.expires_on - self.refresh_margin > time.time():
+            return token
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(key)
+        if pending is None or pending[0] is not loop:
+            pending = (loop, asyncio.ensure_future(self._refresh(key, scopes, kwargs)))
+            self._pending[key] = pending
+        return await asyncio.shield(pending[1])
+
+    async def close(self) -> None:
+        """Cerrar la credencial, la credencial envuelta no se cierra porque puede estar compartida."""
+
+    async def _refresh(self, key: Tuple, scopes: Tuple[str, ...], kwargs: Dict[str, Any]) -> AccessToken:
+        """Solicitar un token nuevo y guardarlo en memoria."""
+        try:
+            token = await self._request_token(scopes, kwargs)
+            self._tokens[key] = token
+            return token
+        finally:
+            self._pending.pop(key, None)
+
+    async def _request_token(self, scopes: Tuple[str, ...], kwargs: Dict[str, Any]) -> AccessToken:
+        """Solicitar el token a la credencial sincrona en el pool de hilos dedicado."""
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            None,
+            self._get_executor(),
             lambda: self._credential.get_token(*scopes, **kwargs),
         )
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Pool de hilos compartido para las solicitudes de tokens."""
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="azure_datalake_utils_token")
+            return cls._executor
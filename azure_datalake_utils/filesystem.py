@@ -0,0 +1,107 @@
+"""Pool compartido de filesystems del datalake."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from fsspec.asyn import sync
+
+from azure_datalake_utils._lazy import lazy_import
+
+if TYPE_CHECKING:
+    from adlfs import AzureBlobFileSystem
+
+adlfs = lazy_import("adlfs")
+adlfs_utils = lazy_import("adlfs.utils")
+
+# Opciones por defecto del cliente: número de bloques que se suben o descargan de manera simultanea
+# por archivo y tiempos maximos (segundos) para abrir conexiones y leer respuestas. El filesystem se comparte
+# durante todo el proceso y el cache de listados de adlfs no expira, sin cache cada listado consulta Azure y
+# ve los archivos nuevos; el cache de listados de las particiones es `PartitionManifestCache`.
+DEFAULT_FILESYSTEM_OPTIONS: Dict[str, Any] = {
+    'max_concurrency': 8,
+    'connection_timeout': 30,
+    'read_timeout': 120,
+    'use_listings_cache': False,
+}
+
+# Estrategias de lectura por formato, argumentos de `fs.open`. Los formatos de texto se leen de principio a fin,
+# bloques grandes con lectura anticipada reducen el número de solicitudes. Las lecturas parciales (`head`, por
+# ejemplo `read_csv` con `nrows`) solo descargan los bytes que pide el parser. En parquet `footer_sample_size` son
+# los bytes del final del archivo que se leen para obtener el footer, ver `fsspec.parquet.open_parquet_file`.
+DEFAULT_READ_STRATEGIES: Dict[str, Dict[str, Any]] = {
+    'csv': {'block_size': 8 * 2**20, 'cache_type': 'readahead'},
+    'json': {'block_size': 8 * 2**20, 'cache_type': 'readahead'},
+    'head': {'block_size': 2**18, 'cache_type': 'none'},
+    'parquet': {'footer_sample_size': 2**20},
+}
+
+_pool: Dict[Tuple, List[Any]] = {}
+_lock = threading.Lock()
+
+
+def acquire_filesystem(options: Dict[str, Any]) -> AzureBlobFileSystem:
+    """Obtener el filesystem compartido para `options`, se crea si no existe.
+
+    Todas las instancias de `Datalake` con la misma cuenta, credencial y opciones de cache usan
+    el mismo `AzureBlobFileSystem`, y por lo tanto el mismo pool de conexiones HTTP. Cada llamado
+    debe tener su respectivo `release_filesystem`.
+
+    Args:
+        options: argumentos de `AzureBlobFileSystem`. La credencial se compara por identidad.
+
+    Returns:
+        filesystem compartido.
+    """
+    key = _key(options)
+    with _lock:
+        entry = _pool.get(key)
+        if entry is None:
+            kwargs = {k: v for k, v in options.items() if k != 'skip_instance_cache'}
+            # el pool reemplaza el cache de instancias de fsspec, así `close` no afecta otras instancias.
+            entry = _pool[key] = [adlfs.AzureBlobFileSystem(skip_instance_cache=True, **kwargs), 0]
+            logging.debug(f"nuevo filesystem para la cuenta {options.get('account_name')}")
+        entry[1] += 1
+        return entry[0]
+
+
+def release_filesystem(fs: AzureBlobFileSystem) -> None:
+    """Liberar una referencia al filesystem, si no quedan referencias se cierran sus conexiones."""
+    with _lock:
+        for key, entry in _pool.items():
+            if entry[0] is fs:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    return
+                del _pool[key]
+                break
+        else:
+            return
+    try:
+        sync(fs.loop, adlfs_utils.close_service_client, fs)
+    except Exception as e:
+        logging.debug(f"error cerrando el filesystem: {e}")
+
+
+def _key(options: Dict[str, Any]) -> Tuple:
+    """Llave del pool, los objetos que no son valores (credenciales) se comparan por identidad."""
+    return tuple(
+        sorted((k, v if isinstance(v, (str, int, float, bool, type(None))) else id(v)) for k, v in options.items())
+    )
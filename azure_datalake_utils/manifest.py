@@ -0,0 +1,129 @@
+"""Cache de manifiestos de particiones."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+DETAIL_KEYS = ('name', 'type', 'last_modified', 'etag', 'size')
+
+
+class PartitionManifestCache:
+    """Cache de los listados de carpetas usados para descubrir particiones.
+
+    Un manifiesto guarda, para cada carpeta listada de una tabla, los archivos y carpetas que contiene
+    con su `last_modified` y `etag`. El manifiesto vive en memoria y de manera opcional en disco local,
+    de esta manera se puede compartir entre ejecuciones.
+
+    Reglas para reusar el listado de una carpeta:
+
+    - Si la carpeta fue validada hace menos de `ttl` segundos, se usa el listado en cache.
+    - Si el `ttl` expiró, las carpetas se vuelven a listar, excepto las carpetas del ultimo nivel
+      (solo contienen archivos) cuyo `last_modified` no es más reciente que la marca de agua
+      (`watermark`) del manifiesto, es decir, el `last_modified` más reciente visto al construirlo.
+    - Una carpeta del ultimo nivel se vuelve a listar si su listado tiene más de `leaf_ttl` segundos,
+      aunque su `last_modified` no haya cambiado.
+
+    **NOTA**: la actualización incremental depende de que la cuenta reporte `last_modified` de las
+    carpetas (cuentas con espacio de nombres jerárquico). Si no se reporta, la carpeta siempre se lista.
+    Sobrescribir un archivo existente no cambia el `last_modified` de su carpeta, por lo tanto el nuevo
+    `last_modified` y `etag` del archivo solo se ven al volver a listar la carpeta, a más tardar despues
+    de `leaf_ttl` segundos.
+
+    Args:
+        ttl: segundos que un listado es valido sin volver a consultar Azure.
+        leaf_ttl: segundos maximos que se reusa el listado de una carpeta del ultimo nivel validada por su
+            `last_modified`. Si es `None` se reusa mientras el `last_modified` de la carpeta no cambie.
+        directory: carpeta local donde se persisten los manifiestos. Si es `None` solo se usa memoria.
+    """
+
+    def __init__(self, ttl: float = 300, directory: Optional[str] = None, leaf_ttl: Optional[float] = 3600) -> None:
+        """Constructor."""
+        self.ttl = ttl
+        self.leaf_ttl = leaf_ttl
+        self.directory = directory
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Obtener el manifiesto de `key`, primero en memoria y luego en disco."""
+        with self._lock:
+            manifest = self._manifests.get(key)
+        if manifest is None and self.directory is not None:
+            manifest = self._read(key)
+            if manifest is not None:
+                with self._lock:
+                    self._manifests[key] = manifest
+        return manifest
+
+    def put(self, key: str, manifest: Dict[str, Any]) -> None:
+        """Guardar el manifiesto de `key` en memoria y en disco."""
+        with self._lock:
+            self._manifests[key] = manifest
+        if self.directory is not None:
+            self._write(key, manifest)
+
+    def clear(self) -> None:
+        """Eliminar todos los manifiestos en memoria."""
+        with self._lock:
+            self._manifests.clear()
+
+    def _path(self, key: str) -> str:
+        """Ruta local del manifiesto."""
+        return os.path.join(self.directory, f"{hashlib.sha1(key.encode()).hexdigest()}.json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        """Leer el manifiesto desde disco."""
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f, object_hook=_decode_datetime)
+        except (OSError, ValueError):
+            logging.debug(f"no hay manifiesto valido en disco para {key}")
+            return None
+
+    def _write(self, key: str, manifest: Dict[str, Any]) -> None:
+        """Escribir el manifiesto a disco de manera atomica."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, default=_encode_datetime)
+        os.replace(tmp_path, self._path(key))
+
+
+def compact_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
+    """Conservar solo la información del listado que se guarda en el manifiesto."""
+    return {k: detail[k] for k in DETAIL_KEYS if k in detail}
+
+
+def _encode_datetime(value: Any) -> Any:
+    """Serializar fechas a json."""
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"{type(value)} no es serializable")
+
+
+def _decode_datetime(value: Dict[str, Any]) -> Any:
+    """Deserializar fechas desde json."""
+    if "__datetime__" in value:
+        return datetime.datetime.fromisoformat(value["__datetime__"])
+    return value
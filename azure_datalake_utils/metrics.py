@@ -0,0 +1,351 @@
+"""Metricas de I/O por operación."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import contextlib
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import IO, Any, Callable, ContextManager, Deque, Dict, List, Optional, Tuple
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+# operación en curso en el contexto actual: (metricas, registro de la operación).
+_operacion_actual: "contextvars.ContextVar[Optional[Tuple[IOMetrics, Dict[str, Any]]]]" = contextvars.ContextVar(
+    "operacion_actual", default=None
+)
+
+
+class NullMetrics:
+    """Metricas deshabilitadas, todas las operaciones son no-op.
+
+    Es el valor por defecto de `Datalake.metrics` y `HivePartitiion.metrics`.
+    """
+
+    enabled = False
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Incrementar el contador `name`."""
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Registrar `seconds` en la etapa `stage`."""
+
+    def timer(self, stage: str) -> ContextManager:
+        """Medir el tiempo del bloque en la etapa `stage`."""
+        return _NULL_CONTEXT
+
+    def operation(self, name: str) -> ContextManager:
+        """Agrupar las metricas del bloque en la operación `name`."""
+        return _NULL_CONTEXT
+
+    def wrap(self, archivo: IO, mode: str = "rb") -> IO:
+        """Envolver `archivo` para medir los bytes transferidos."""
+        return archivo
+
+
+NULL_METRICS = NullMetrics()
+
+
+class IOMetrics(NullMetrics):
+    """Registra contadores y latencias por etapa de las operaciones de `Datalake`.
+
+    Contadores registrados:
+
+    - `list_calls`: llamados de listado al datalake (`ls`, `find`, `listdir`).
+    - `list_cache_hits`: carpetas tomadas del manifiesto en cache sin listar.
+    - `blobs_read`, `bytes_read`: archivos abiertos para lectura y bytes leidos.
+    - `blobs_written`, `bytes_written`: archivos escritos y bytes escritos.
+    - `retries`, `hedged_requests`, `hedge_wins`, `deadline_exceeded`: reintentos, solicitudes duplicadas,
+      solicitudes duplicadas que terminaron primero e intentos que superaron el tiempo maximo, ver `RetryPolicy`.
+
+    Etapas (segundos): `list`, `download`, `parse`, `concat`, `upload` y `serialize`. Cuando las lecturas
+    son concurrentes (`max_workers`), las etapas suman el tiempo de todos los hilos.
+
+    Cada llamado a un metodo publico de `Datalake` es una operación, al terminar su registro
+    (`{"operation", "seconds", "error", "counters", "stages"}`) se guarda en `operations` y se pasa
+    a cada función de `callbacks`, por ejemplo `log_operation`. Los totales acumulados, utiles para
+    exportar como contadores tipo Prometheus, se obtienen con `snapshot()`.
+
+    Args:
+        callbacks: funciones que reciben el registro de cada operación terminada.
+        history: número de operaciones que se conservan en `operations`.
+    """
+
+    enabled = True
+
+    def __init__(self, callbacks: Optional[List[Callable[[Dict[str, Any]], None]]] = None, history: int = 100):
+        """Constructor."""
+        self.callbacks = list(callbacks or [])
+        self.operations: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._stages: Dict[str, float] = defaultdict(float)
+        self._operation_counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Incrementar el contador `name`."""
+        registro = self._registro_actual()
+        with self._lock:
+            self._counters[name] += value
+            if registro is not None:
+                registro["counters"][name] = registro["counters"].get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Registrar `seconds` en la etapa `stage`."""
+        registro = self._registro_actual()
+        with self._lock:
+            self._stages[stage] += seconds
+            if registro is not None:
+                registro["stages"][stage] = registro["stages"].get(stage, 0) + seconds
+
+    def timer(self, stage: str) -> ContextManager:
+        """Medir el tiempo del bloque en la etapa `stage`."""
+        return _Timer(self, stage)
+
+    def operation(self, name: str) -> ContextManager:
+        """Agrupar las metricas del bloque en la operación `name`.
+
+        Las operaciones anidadas (por ejemplo `read_csv` dentro de `read_csv_with_partition`)
+        se registran en la operación externa.
+        """
+        return _Operacion(self, name)
+
+    def wrap(self, archivo: IO, mode: str = "rb") -> IO:
+        """Envolver `archivo` para medir los bytes transferidos."""
+        self.increment("blobs_read" if "r" in mode else "blobs_written")
+        return ArchivoMedido(archivo, self, mode)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Totales acumulados de contadores, etapas y operaciones."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "stages": dict(self._stages),
+                "operations": dict(self._operation_counts),
+            }
+
+    def reset(self) -> None:
+        """Reiniciar los totales y el historial de operaciones."""
+        with self._lock:
+            self._counters.clear()
+            self._stages.clear()
+            self._operation_counts.clear()
+            self.operations.clear()
+
+    def _registro_actual(self) -> Optional[Dict[str, Any]]:
+        """Registro de la operación en curso de estas metricas."""
+        actual = _operacion_actual.get()
+        if actual is None or actual[0] is not self:
+            return None
+        return actual[1]
+
+    def _terminar(self, registro: Dict[str, Any]) -> None:
+        """Guardar el registro de la operación y llamar los callbacks."""
+        with self._lock:
+            self._operation_counts[registro["operation"]] += 1
+            self.operations.append(registro)
+        for callback in self.callbacks:
+            try:
+                callback(registro)
+            except Exception:
+                logging.exception("error en callback de metricas")
+
+
+class _Timer:
+    """Contexto que registra su duración en una etapa."""
+
+    __slots__ = ("metrics", "stage", "inicio")
+
+    def __init__(self, metrics: IOMetrics, stage: str) -> None:
+        """Constructor."""
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> "_Timer":
+        """Iniciar la medición."""
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Registrar la duración."""
+        self.metrics.observe(self.stage, time.perf_counter() - self.inicio)
+
+
+class _Operacion:
+    """Contexto que agrupa las metricas de una operación."""
+
+    def __init__(self, metrics: IOMetrics, name: str) -> None:
+        """Constructor."""
+        self.metrics = metrics
+        self.name = name
+        self.token = None
+
+    def __enter__(self) -> "_Operacion":
+        """Iniciar la operación si no hay otra en curso."""
+        if self.metrics._registro_actual() is None:
+            self.registro = {"operation": self.name, "counters": {}, "stages": {}}
+            self.token = _operacion_actual.set((self.metrics, self.registro))
+            self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        """Terminar la operación."""
+        if self.token is None:
+            return
+        _operacion_actual.reset(self.token)
+        self.registro["seconds"] = time.perf_counter() - self.inicio
+        self.registro["error"] = exc_type is not None
+        self.metrics._terminar(self.registro)
+
+
+class ArchivoMedido:
+    """Envoltura de un archivo que registra los bytes y el tiempo de lectura (`download`) y escritura (`upload`).
+
+    El resto de atributos se delegan al archivo original. `mode`, `readable`, `writable` y `seekable` se
+    definen aunque el archivo original no los tenga (por ejemplo `MemoryFile`), pandas usa `mode` para
+    decidir si escribe bytes o texto.
+
+    Args:
+        archivo: archivo original.
+        metrics: metricas donde se registran los bytes y tiempos.
+        mode: modo con el que se abrió el archivo, se usa si el archivo original no tiene `mode`.
+    """
+
+    def __init__(self, archivo: IO, metrics: IOMetrics, mode: str = "rb") -> None:
+        """Constructor."""
+        self._archivo = archivo
+        self._metrics = metrics
+        self._mode = mode
+        self._segundos = 0.0
+
+    @property
+    def mode(self) -> str:
+        """Modo del archivo."""
+        return getattr(self._archivo, "mode", self._mode)
+
+    def readable(self) -> bool:
+        """Si el archivo es de lectura."""
+        if hasattr(self._archivo, "readable"):
+            return self._archivo.readable()
+        return "r" in self.mode
+
+    def writable(self) -> bool:
+        """Si el archivo es de escritura."""
+        if hasattr(self._archivo, "writable"):
+            return self._archivo.writable()
+        return "r" not in self.mode
+
+    def seekable(self) -> bool:
+        """Si el archivo soporta `seek`."""
+        return self._archivo.seekable() if hasattr(self._archivo, "seekable") else False
+
+    @property
+    def segundos(self) -> float:
+        """Tiempo total en lecturas y escrituras del archivo."""
+        return self._segundos
+
+    def read(self, *args) -> bytes:
+        """Leer del archivo."""
+        inicio = time.perf_counter()
+        data = self._archivo.read(*args)
+        self._registrar("download", inicio)
+        self._metrics.increment("bytes_read", len(data))
+        return data
+
+    def read1(self, *args) -> bytes:
+        """Leer del archivo con a lo sumo un llamado al archivo original."""
+        inicio = time.perf_counter()
+        data = self._archivo.read1(*args) if hasattr(self._archivo, "read1") else self._archivo.read(*args)
+        self._registrar("download", inicio)
+        self._metrics.increment("bytes_read", len(data))
+        return data
+
+    def readinto(self, buffer) -> int:
+        """Leer del archivo al buffer."""
+        inicio = time.perf_counter()
+        n = self._archivo.readinto(buffer)
+        self._registrar("download", inicio)
+        self._metrics.increment("bytes_read", n or 0)
+        return n
+
+    def write(self, data) -> int:
+        """Escribir al archivo."""
+        inicio = time.perf_counter()
+        n = self._archivo.write(data)
+        self._registrar("upload", inicio)
+        self._metrics.increment("bytes_written", len(data))
+        return n
+
+    def _registrar(self, stage: str, inicio: float) -> None:
+        """Registrar el tiempo desde `inicio` en la etapa."""
+        segundos = time.perf_counter() - inicio
+        self._segundos += segundos
+        self._metrics.observe(stage, segundos)
+
+    def close(self) -> None:
+        """Cerrar el archivo, en escritura incluye la subida de los bloques pendientes."""
+        escritura = self.writable()
+        inicio = time.perf_counter()
+        self._archivo.close()
+        if escritura:
+            self._metrics.observe("upload", time.perf_counter() - inicio)
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegar al archivo original."""
+        return getattr(self._archivo, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Asignar los atributos publicos en el archivo original, por ejemplo `forced`."""
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._archivo, name, value)
+
+    def __iter__(self):
+        """Iterar las lineas del archivo original."""
+        return iter(self._archivo)
+
+    def __enter__(self) -> "ArchivoMedido":
+        """Soporte para `with`."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Cerrar el archivo al salir de `with`."""
+        self.close()
+
+
+def medir_operacion(name: str) -> Callable:
+    """Decorador para registrar un metodo de `Datalake` como la operación `name` en `self.metrics`."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def inner_function(self, *args, **kwargs):
+            with self.metrics.operation(name):
+                return func(self, *args, **kwargs)
+
+        return inner_function
+
+    return decorator
+
+
+def log_operation(registro: Dict[str, Any], level: int = logging.INFO) -> None:
+    """Callback para `IOMetrics` que escribe cada operación en el log."""
+    etapas = " ".join(f"{k}={v:.3f}s" for k, v in registro["stages"].items())
+    contadores = " ".join(f"{k}={v:g}" for k, v in registro["counters"].items())
+    logging.log(level, f"{registro['operation']} {registro['seconds']:.3f}s {etapas} {contadores}".strip())
@@ -15,11 +15,34 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+from __future__ import annotations
+
+import datetime
 import itertools
 import logging
-from typing import Dict, List, Tuple
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from azure_datalake_utils._lazy import lazy_import
+from azure_datalake_utils.manifest import PartitionManifestCache, compact_detail
+from azure_datalake_utils.metrics import NULL_METRICS, NullMetrics
+
+if TYPE_CHECKING:
+    import numpy
+    import pandas
+    import pyarrow
+    from adlfs import AzureBlobFileSystem
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
 
-from adlfs import AzureBlobFileSystem
+# columnas del indice que no son particiones.
+INDEX_COLUMNS = ("file_name", "path", "last_modified")
+
+# valor de la carpeta de una partición nula, se lee como un valor nulo.
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
 
 
 class HivePartitiion:
@@ -36,8 +59,13 @@ class HivePartitiion:
     Otra opción tambien puede ser usada para leer el archivo mas reciente en el ultimo nivel de
     la partición.
 
-    **NOTA**: solo descubre un arhivo por carperta, es decir, si hay multiples archivos
-    en el nivel más bajo, solo garantiza leer uno solo.
+    **NOTA**: con `last_modified_last_level` solo se toma el archivo más reciente de cada carpeta, en otro
+    caso se incluyen todos los archivos de cada partición. Con `partition_cols` se ignoran los archivos cuyo
+    nombre empieza por `_` o `.`, por ejemplo `_SUCCESS`.
+
+    Los archivos descubiertos se guardan en un indice columnar (`pyarrow.Table`, ver
+    `get_partition_index`) con una columna por llave de partición, de esta manera los filtros,
+    el ordenamiento y la generación de rutas no recorren las particiones una por una.
 
     Args:
         ruta: ruta donde se encuentran los archivos almancenados.
@@ -50,6 +78,17 @@ class HivePartitiion:
         partition_inclusion: diccionarios con valores a incluir en la particiónes.
         last_modidfied_deeper_level: si se debe filtrar para obtener el mas reciente
             en el nivel más profundo.
+        manifest_cache: cache opcional de los listados usados en el descubrimiento de particiones,
+            ver `PartitionManifestCache`.
+        metrics: metricas donde se registran los llamados de listado (`list_calls`, `list_cache_hits`)
+            y el tiempo del descubrimiento (etapa `list`), ver `IOMetrics`.
+        modified_after: si se define, solo se incluyen los archivos con `last_modified` posterior a esta
+            fecha, si no tiene zona horaria se asume UTC. Los archivos sin `last_modified` siempre se
+            incluyen. Con `last_modified_last_level` se selecciona primero el archivo más reciente de cada
+            carpeta y luego se aplica este filtro.
+        partition_keys: llaves de partición, en el orden en que aparecen en la ruta.
+        watermark: `last_modified` más reciente de los archivos seleccionados, o `modified_after` si no hay
+            archivos más recientes. Es la marca de agua para la siguiente lectura incremental.
     """
 
     def __init__(
@@ -60,29 +99,90 @@ class HivePartitiion:
         partition_inclusion: Dict[str, List[str]] = None,
         last_modified_last_level: bool = False,
         fs: AzureBlobFileSystem = None,
+        manifest_cache: Optional[PartitionManifestCache] = None,
+        metrics: Optional[NullMetrics] = None,
+        modified_after: Optional[datetime.datetime] = None,
     ) -> None:
         """Constructor."""
         self.ruta = ruta
         self.container = ruta.split("/")[0]
         self.path_blob = ruta.replace(f"{self.container}/", "")
-        self.partition_files: List[Tuple[str, Dict[str, str]]] = [{}]
+        self.partition_keys: List[str] = []
+        self._index = _build_index({}, [], [], [])
         self.partition_cols = partition_cols
         self.partition_exclusion = partition_exclusion
         self.partition_inclusion = partition_inclusion
         self.last_modified_last_level = last_modified_last_level
+        if modified_after is not None and modified_after.tzinfo is None:
+            modified_after = modified_after.replace(tzinfo=datetime.timezone.utc)
+        self.modified_after = modified_after
+        self.watermark = modified_after
 
         self.fs = fs
-        self._make_partitions()
+        self.manifest_cache = manifest_cache
+        self.metrics = metrics or NULL_METRICS
+        self._manifest_folders: Dict[str, Dict[str, Any]] = {}
+        self._manifest_watermark = None
+        with self.metrics.timer("list"):
+            self._make_partitions()
+
+    @property
+    def partition_files(self) -> List[Tuple[str, Dict[str, str]]]:
+        """Lista de `(nombre del archivo, dict con las particiones)`, construida a partir del indice.
+
+        Las llaves que el archivo no tiene o con valor `HIVE_DEFAULT_PARTITION` no se incluyen en el dict.
+        """
+        nombres = self._index.column("file_name").to_pylist()
+        valores = [self._index.column(k).to_pylist() for k in self.partition_keys]
+        return [
+            (nombre, {k: v for k, v in zip(self.partition_keys, fila) if v not in (None, HIVE_DEFAULT_PARTITION)})
+            for nombre, *fila in zip(nombres, *valores)
+        ]
 
     def get_partition_files(self):
         """Getter para partition_files."""
         return self.partition_files
 
+    def get_partition_index(self) -> pyarrow.Table:
+        """Indice columnar de los archivos descubiertos.
+
+        Returns:
+            tabla de pyarrow con una columna de tipo string por cada llave de partición (`partition_keys`),
+            `file_name` (ruta relativa a la carpeta de la partición), `path` (ruta completa del archivo)
+            y `last_modified`. Las filas estan en el mismo orden de `get_partition_list`.
+        """
+        return self._index
+
+    def get_partition_categories(
+        self, partition_types: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Tuple[numpy.ndarray, pandas.Index]]:
+        """Codificar cada llave de partición como categorias, una sola vez sobre el indice.
+
+        Con los códigos se construyen columnas `pd.Categorical` de cualquier número de filas sin
+        repetir los valores como strings, por ejemplo `pd.Categorical.from_codes(codes[filas], categories)`.
+
+        Args:
+            partition_types: tipo de pandas de las llaves que se deben convertir, por ejemplo
+                `{'year': 'int64', 'load_date': 'datetime64[ns]'}`. Las demás llaves quedan como string.
+
+        Returns:
+            dict con el código de cada archivo, en el orden de `get_partition_list` (-1 si el archivo
+            no tiene la llave o es `HIVE_DEFAULT_PARTITION`), y las categorias de cada llave de partición.
+        """
+        partition_types = partition_types or {}
+        categories = {}
+        for key in self.partition_keys:
+            column = self._index.column(key).combine_chunks()
+            column = pc.if_else(pc.equal(column, HIVE_DEFAULT_PARTITION), pa.scalar(None, pa.string()), column)
+            encoded = column.dictionary_encode()
+            codes = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False).astype(np.int64)
+            values = pd.Index(encoded.dictionary.to_pandas())
+            categories[key] = typed_categories(codes, values, partition_types.get(key))
+        return categories
+
     def get_partition_list(self) -> List[str]:
         """Convierte a una lista de archivos a leer."""
-        path_and_file = [(file_path_[0], self.dict_to_path(file_path_[1])) for file_path_ in self.partition_files]
-
-        return [f'{self.ruta}{file_path_[1]}/{file_path_[0]}' for file_path_ in path_and_file]
+        return self._index.column("path").to_pylist()
 
     def dict_to_path(self, dict_) -> str:
         """Convierte diccionario a path."""
@@ -97,57 +197,86 @@ class HivePartitiion:
 
         if self.partition_exclusion is not None:
             logging.debug("filtrando particiones por exclusion.")
-            for name, value_to_exclude in self.partition_exclusion.items():
-                try:
-                    self.partition_files = [
-                        partition for partition in self.partition_files if partition[1][name] not in value_to_exclude
-                    ]
-                except KeyError:
-                    raise KeyError(f'{name} NO existe en las particiones!.')
+            self._filter_index(self.partition_exclusion, include=False)
 
         if self.partition_inclusion is not None:
             logging.debug("filtrando particiones por inclusion.")
-            for name, value_to_exclude in self.partition_inclusion.items():
-                try:
-                    self.partition_files = [
-                        partition for partition in self.partition_files if partition[1][name] in value_to_exclude
-                    ]
-                except KeyError:
-                    raise KeyError(f'{name} NO existe en las particiones!.')
+            self._filter_index(self.partition_inclusion, include=True)
+
+        if self.modified_after is not None and self._index.num_rows > 0:
+            logging.debug(f"filtrando archivos modificados despues de {self.modified_after}.")
+            last_modified = self._index.column("last_modified")
+            mask = pc.greater(last_modified, pa.scalar(self.modified_after, type=last_modified.type))
+            self._index = self._index.filter(pc.fill_null(mask, True))
+
+        newest = pc.max(self._index.column("last_modified")).as_py()
+        if newest is not None and (self.watermark is None or newest > self.watermark):
+            self.watermark = newest
+
+    def _filter_index(self, filters: Dict[str, List[str]], include: bool) -> None:
+        """Filtrar el indice con `pyarrow.compute.is_in` sobre cada columna de `filters`."""
+        for name, values in filters.items():
+            if self._index.num_rows == 0:
+                return
+            if name not in self.partition_keys or self._index.column(name).null_count > 0:
+                raise KeyError(f'{name} NO existe en las particiones!.')
+            value_set = pa.array([str(v) for v in values], type=pa.string())
+            mask = pc.is_in(self._index.column(name), value_set=value_set)
+            self._index = self._index.filter(mask if include else pc.invert(mask))
 
     def _make_partitions_using_partition_cols(self) -> None:
         """Metodo para constuir particiones con la partition_cols y asi evitar descubrirlas."""
         combinations = itertools.product(*(self.partition_cols[name] for name in self.partition_cols))
 
         partitions = []
+        last_modified = []
         for combination in combinations:
             part = {k: v for k, v in zip(self.partition_cols.keys(), combination)}
             # TODO: Si es la mejor manera de hacer paths? a priori si por que se
             # esta trabajando con el fs de Datalake y no hay lios de diferentes
             # delimitadores.
-            partition_path = "/".join([f"{k}={v}" for k, v in part.items()])
+            partition_path = self.dict_to_path(part)
 
+            self.metrics.increment("list_calls")
             if self.last_modified_last_level:
                 files = self.fs.find(f"{self.ruta}{partition_path}/", detail=True)
                 files = {k: v['last_modified'] for k, v in files.items()}
                 logging.debug(f"archivos encontrados {files}")
-                selected = sorted(files.items(), key=lambda x: x[1], reverse=True)[0][0]
+                selected, selected_last_modified = sorted(files.items(), key=lambda x: x[1], reverse=True)[0]
                 logging.debug(f"archivo seleccionado {selected}")
                 file_name = "/".join(selected.split("/")[-2:])
                 partitions.append((file_name, part))
+                last_modified.append(selected_last_modified)
             else:
                 try:
                     details = self.fs.listdir(f"{self.ruta}{partition_path}/")
                 except FileNotFoundError:
                     logging.debug(f"{part} No tiene archivos")
                     continue
+                # todos los archivos de datos, sin marcadores como `_SUCCESS` o `_committed_*`.
+                details = [
+                    detail
+                    for detail in details
+                    if detail.get('type') != 'directory' and not detail['name'].split("/")[-1].startswith(("_", "."))
+                ]
                 if len(details) < 1:
                     logging.debug(f"{part} No tiene archivos")
                     continue
-                file_name = details[0]['name'].split("/")[-1]
-                partitions.append((file_name, part))
-
-        self.partition_files = partitions
+                for detail in details:
+                    partitions.append((detail['name'].split("/")[-1], part))
+                    last_modified.append(detail.get('last_modified'))
+
+        self.partition_keys = list(self.partition_cols)
+        columns = {key: [part[key] for _, part in partitions] for key in self.partition_keys}
+        file_names = [file_name for file_name, _ in partitions]
+        index = _build_index(columns, file_names, [None] * len(partitions), last_modified)
+        # ruta/llave_1=valor_1/.../llave_n=valor_n/file_name
+        partes = [pa.scalar(self.ruta)]
+        for i, key in enumerate(self.partition_keys):
+            partes += [pa.scalar(f"{'/' if i else ''}{key}="), index.column(key)]
+        partes += [pa.scalar("/" if self.partition_keys else ""), index.column("file_name")]
+        paths = pc.binary_join_element_wise(*partes, "")
+        self._index = index.set_column(index.schema.get_field_index("path"), "path", paths)
 
     def _discover(self) -> None:
         """Inferir particiones a partir del esquema.
@@ -155,41 +284,209 @@ class HivePartitiion:
         NOTA: El metodo al descubrir particiones, todas las dejas en string.
         #TODO: verificar si vale la pena tratar de inferir formatos.
         """
-        partition_files_ = []
-        partition_files_as_dict = {}
-        list_of_files = self.fs.find(self.ruta, detail=True)
-        list_of_files = {k: v['last_modified'] for k, v in list_of_files.items()}
-        list_of_files = dict(sorted(list_of_files.items(), key=lambda x: x[1], reverse=True))
+        list_of_files = self._list_files_pruned()
+        # con last_modified_last_level el ultimo nivel hace parte del nombre del archivo.
+        levels = 2 if self.last_modified_last_level else 1
+
+        paths = pa.array(list(list_of_files), type=pa.string())
+        columns, file_names = _parse_paths(paths, len(self.ruta), levels)
+        index = _build_index(columns, file_names, paths, list(list_of_files.values()))
+        if index.num_rows == 0:
+            self._index = index
+            self.partition_keys = [name for name in index.column_names if name not in INDEX_COLUMNS]
+            return
+
+        # los más recientes primero, en caso de empate por ruta.
+        index = index.sort_by([("last_modified", "descending"), ("path", "ascending")])
+        if self.last_modified_last_level:
+            # el archivo más reciente de cada carpeta, sin tener en cuenta el ultimo nivel.
+            folders = pc.replace_substring_regex(index.column("path"), pattern="/[^/]*/[^/]*$", replacement="")
+            _, first = np.unique(folders.to_numpy(zero_copy_only=False), return_index=True)
+            index = index.take(pa.array(np.sort(first)))
 
-        for completepath, last_modified_loop in list_of_files.items():
-            path_to_discover = completepath.split(self.ruta)[-1]
-            split_path = path_to_discover.split("/")
-            file_name = split_path[-1]
+        self._index = index
+        self.partition_keys = [name for name in index.column_names if name not in INDEX_COLUMNS]
 
-            if self.last_modified_last_level:
-                partitions = tuple(split_path[0 : len(split_path) - 2])
-                last_level = split_path[-2]
+    def _list_files_pruned(self) -> Dict[str, Any]:
+        """Listar los archivos recorriendo el arbol nivel por nivel.
 
-                if partitions in partition_files_as_dict:
-                    last_modified_current = list_of_files[completepath]
-                    # si la fecha es mayor, la particion es mas reciente, entonces se reemplaza.
-                    if last_modified_loop > last_modified_current:
-                        partition_files_as_dict[partitions] = f"{last_level}/{file_name}"
+        Cada carpeta `llave=valor` que no cumple `partition_inclusion` o `partition_exclusion`
+        es descartada antes de listarla, de esta manera el número de llamados a `fs.ls` depende
+        de las particiones seleccionadas y no del tamaño total de la tabla.
 
+        Returns:
+            dict con la ruta completa de cada archivo y su `last_modified`, ordenado por ruta.
+        """
+        self._load_manifest()
+        list_of_files = {}
+        pending = [(self.ruta, None)]
+        while pending:
+            folder, folder_last_modified = pending.pop()
+            for detail in self._ls(folder, folder_last_modified):
+                name = detail['name'].rstrip("/")
+                if name == folder.rstrip("/"):
+                    continue
+                if detail.get('type') == 'directory':
+                    if self._is_selected_folder(name.split("/")[-1]):
+                        pending.append((f"{name}/", detail.get('last_modified')))
+                    else:
+                        logging.debug(f"{name} descartada por los filtros de particiones.")
                 else:
-                    partition_files_as_dict[partitions] = f"{last_level}/{file_name}"
+                    list_of_files[name] = detail['last_modified']
+        self._save_manifest()
+
+        return dict(sorted(list_of_files.items()))
+
+    def _ls(self, folder: str, folder_last_modified: Any) -> List[Dict[str, Any]]:
+        """Listar una carpeta, usando el manifiesto en cache cuando el listado sigue vigente."""
+        if self.manifest_cache is None:
+            self.metrics.increment("list_calls")
+            return self.fs.ls(folder, detail=True)
+
+        now = time.time()
+        cached = self._manifest_folders.get(folder)
+        if cached is not None:
+            if now - cached['validated_at'] < self.manifest_cache.ttl:
+                self.metrics.increment("list_cache_hits")
+                return cached['entries']
+            is_leaf = all(entry.get('type') != 'directory' for entry in cached['entries'])
+            # sobrescribir un archivo no cambia el last_modified de la carpeta, el listado se reusa hasta leaf_ttl.
+            leaf_ttl = self.manifest_cache.leaf_ttl
+            if (
+                is_leaf
+                and folder_last_modified is not None
+                and self._manifest_watermark is not None
+                and folder_last_modified <= self._manifest_watermark
+                and (leaf_ttl is None or now - cached.get('listed_at', 0) < leaf_ttl)
+            ):
+                logging.debug(f"{folder} sin cambios desde el ultimo listado.")
+                cached['validated_at'] = now
+                self.metrics.increment("list_cache_hits")
+                return cached['entries']
+
+        self.metrics.increment("list_calls")
+        entries = [compact_detail(detail) for detail in self.fs.ls(folder, detail=True)]
+        self._manifest_folders[folder] = {
+            'last_modified': folder_last_modified,
+            'validated_at': now,
+            'listed_at': now,
+            'entries': entries,
+        }
+        return entries
+
+    def _manifest_key(self) -> str:
+        """Llave del manifiesto de la tabla."""
+        return f"{getattr(self.fs, 'account_name', None)}/{self.ruta}"
+
+    def _load_manifest(self) -> None:
+        """Cargar el manifiesto en cache, si existe."""
+        if self.manifest_cache is None:
+            return
+        manifest = self.manifest_cache.get(self._manifest_key()) or {}
+        self._manifest_folders = {folder: dict(info) for folder, info in manifest.get('folders', {}).items()}
+        self._manifest_watermark = manifest.get('watermark')
+
+    def _save_manifest(self) -> None:
+        """Guardar el manifiesto con la nueva marca de agua."""
+        if self.manifest_cache is None:
+            return
+        last_modified = [
+            entry['last_modified']
+            for info in self._manifest_folders.values()
+            for entry in info['entries']
+            if entry.get('last_modified') is not None
+        ]
+        self._manifest_watermark = max(last_modified) if last_modified else None
+        self.manifest_cache.put(
+            self._manifest_key(), {'watermark': self._manifest_watermark, 'folders': self._manifest_folders}
+        )
+
+    def _is_selected_folder(self, folder: str) -> bool:
+        """Verifica si una carpeta `llave=valor` cumple los filtros de inclusion y exclusion."""
+        if "=" not in folder:
+            return True
+        name, value = folder.split("=")[0], folder.split("=")[1]
+        if self.partition_exclusion is not None and value in self.partition_exclusion.get(name, []):
+            return False
+        if self.partition_inclusion is not None and name in self.partition_inclusion:
+            return value in self.partition_inclusion[name]
+        return True
+
+
+def typed_categories(
+    codes: numpy.ndarray, categories: pandas.Index, dtype: Optional[Any] = None
+) -> Tuple[numpy.ndarray, pandas.Index]:
+    """Convertir las categorias de una partición al tipo `dtype`.
+
+    Las categorias que quedan repetidas despues de la conversión, por ejemplo `01` y `1` como enteros,
+    se unen en una sola.
+
+    Returns:
+        códigos y categorias convertidas, sin cambios si `dtype` es `None`.
+    """
+    if dtype is None:
+        return codes, categories
+    typed_codes, typed = pd.factorize(categories.astype(dtype))
+    return np.where(codes >= 0, typed_codes[codes], -1), typed
 
-            else:
 
-                partitions = split_path[0 : len(split_path) - 1]
-                parts = {part.split("=")[0]: part.split("=")[1] for part in partitions if "=" in part}
-                partition_files_.append((file_name, parts))
+def _parse_paths(paths: pyarrow.Array, prefix_length: int, levels: int) -> Tuple[Dict[str, Any], pyarrow.Array]:
+    """Extraer las particiones `llave=valor` de las rutas de los archivos.
 
-        if self.last_modified_last_level:
-            # Ajustar el formato.
-            partition_files_ = [
-                (name, {part.split("=")[0]: part.split("=")[1] for part in parts if "=" in part})
-                for parts, name in partition_files_as_dict.items()
-            ]
+    Args:
+        paths: rutas completas de los archivos.
+        prefix_length: longitud de la ruta de la tabla, que se omite de cada ruta.
+        levels: número de niveles al final de la ruta que hacen parte del nombre del archivo.
 
-        self.partition_files = partition_files_
+    Returns:
+        dict con la columna de cada llave, en el orden en que aparecen, y el nombre de cada archivo.
+    """
+    relative = pc.utf8_slice_codeunits(paths, start=prefix_length)
+    segments = pc.split_pattern(relative, pattern="/")
+    lengths = pc.list_value_length(segments).to_numpy()
+    flat = pc.list_flatten(segments)
+    rows = pc.list_parent_indices(segments).to_numpy()
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    position = np.arange(len(flat)) - offsets[rows]
+    is_partition = (position < lengths[rows] - levels) & pc.match_substring(flat, "=").to_numpy(zero_copy_only=False)
+
+    key_values = pc.split_pattern(flat.filter(pa.array(is_partition)), pattern="=")
+    keys, values = pc.list_element(key_values, 0), pc.list_element(key_values, 1)
+    rows = rows[is_partition]
+    columns = {}
+    for key in pc.unique(keys).to_pylist():
+        mask = pc.equal(keys, key).to_numpy(zero_copy_only=False)
+        # posición del valor de cada fila, -1 si la fila no tiene la llave.
+        take = np.full(len(paths), -1, dtype=np.int64)
+        take[rows[mask]] = np.arange(mask.sum())
+        columns[key] = values.filter(pa.array(mask)).take(pa.array(take, mask=take < 0))
+
+    pattern = "(?P<file_name>[^/]*)$" if levels == 1 else "(?P<file_name>(?:[^/]*/)?[^/]*)$"
+    file_names = pc.struct_field(pc.extract_regex(relative, pattern=pattern), [0])
+    return columns, file_names
+
+
+def _build_index(columns: Dict[str, Any], file_name: Any, path: Any, last_modified: Any) -> pyarrow.Table:
+    """Construir el indice columnar de las particiones.
+
+    Args:
+        columns: valores de cada llave de partición, arreglos de pyarrow de tipo string o listas cuyos
+            valores se convierten a string, por ejemplo `{'year': [2022]}`.
+        file_name: nombre de cada archivo.
+        path: ruta completa de cada archivo.
+        last_modified: fecha de modificación de cada archivo.
+
+    Returns:
+        tabla con las columnas de las particiones seguidas de `INDEX_COLUMNS`.
+    """
+    index = {
+        key: values if isinstance(values, pa.Array) else pa.array([str(v) for v in values], type=pa.string())
+        for key, values in columns.items()
+    }
+    index["file_name"] = pa.array(file_name, type=pa.string())
+    index["path"] = pa.array(path, type=pa.string())
+    last_modified = pa.array(last_modified)
+    if pa.types.is_null(last_modified.type):
+        last_modified = last_modified.cast(pa.timestamp("us", tz="UTC"))
+    index["last_modified"] = last_modified
+    return pa.table(index)
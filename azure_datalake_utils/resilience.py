@@ -0,0 +1,267 @@
+"""Reintentos, tiempos maximos y solicitudes duplicadas para las lecturas de blobs."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from azure.core.exceptions import HttpResponseError, IncompleteReadError, ServiceRequestError, ServiceResponseError
+
+from azure_datalake_utils.exepctions import ArchivoNoEncontrado, TiempoAgotado
+from azure_datalake_utils.metrics import NULL_METRICS, NullMetrics
+
+T = TypeVar("T")
+
+# codigos HTTP transitorios: timeout, throttling (429 y 503 ServerBusy) y errores del servidor.
+RETRY_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# totales de la politica que también se registran en las metricas de cada operación.
+CONTADORES_METRICAS = frozenset({"retries", "hedged_requests", "hedge_wins", "deadline_exceeded"})
+
+
+def es_transitorio(error: BaseException) -> bool:
+    """Indica si `error` es transitorio y la lectura se puede reintentar.
+
+    Son transitorios los errores de conexión y de tiempo maximo, las respuestas HTTP con un código
+    de `RETRY_STATUS_CODES` y `TiempoAgotado`. Los archivos que no existen nunca se reintentan.
+    """
+    if isinstance(error, (ArchivoNoEncontrado, FileNotFoundError)):
+        return False
+    if isinstance(error, (ServiceRequestError, ServiceResponseError, IncompleteReadError)):
+        return True
+    if isinstance(error, HttpResponseError):
+        return getattr(error, "status_code", None) in RETRY_STATUS_CODES
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError))
+
+
+class RetryPolicy:
+    """Politica de reintentos para las lecturas de blobs de `Datalake` y `AsyncDatalake`.
+
+    Cada lectura se ejecuta hasta `max_attempts` veces mientras falle con un error transitorio
+    (`retry_on`), esperando entre intentos un tiempo exponencial `backoff * 2**intento` acotado por
+    `max_backoff`. Con `jitter` la espera es aleatoria entre cero y ese valor, así las lecturas
+    concurrentes que fallan al mismo tiempo (por ejemplo por throttling) no se reintentan juntas.
+
+    Opcionalmente cada intento tiene un tiempo maximo (`deadline`), al superarlo se abandona y cuenta
+    como un error transitorio. Con `hedge_after`, si un intento no ha terminado en ese tiempo se lanza
+    una solicitud duplicada (hasta `max_hedges`) y se usa la primera que termine, de esta manera un
+    blob lento no define la duración de toda la lectura. Los intentos con `deadline` o `hedge_after`
+    se ejecutan en un pool de hilos propio de la politica; un intento abandonado sigue ocupando su
+    hilo hasta que el cliente de Azure lo termine (`read_timeout`).
+
+    Los totales de la politica se obtienen con `snapshot()` y, si las metricas de `Datalake` estan
+    habilitadas, se registran en los contadores `retries`, `hedged_requests`, `hedge_wins` y
+    `deadline_exceeded` de cada operación.
+
+    Args:
+        max_attempts: número máximo de intentos de cada lectura, incluyendo el primero.
+        backoff: espera base en segundos entre intentos.
+        max_backoff: espera máxima en segundos entre intentos.
+        jitter: si la espera es aleatoria entre cero y la espera exponencial.
+        deadline: tiempo maximo en segundos de cada intento. Por defecto no hay tiempo maximo.
+        hedge_after: segundos sin respuesta después de los cuales se lanza una solicitud duplicada.
+        max_hedges: número máximo de solicitudes duplicadas por intento.
+        retry_on: función que indica si un error es transitorio, por defecto `es_transitorio`.
+        max_workers: hilos del pool para los intentos con `deadline` o `hedge_after`.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        deadline: Optional[float] = None,
+        hedge_after: Optional[float] = None,
+        max_hedges: int = 1,
+        retry_on: Callable[[BaseException], bool] = es_transitorio,
+        max_workers: int = 32,
+    ) -> None:
+        """Constructor."""
+        if max_attempts < 1:
+            raise ValueError("max_attempts debe ser mayor o igual a 1")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.max_hedges = max_hedges if hedge_after is not None else 0
+        self.retry_on = retry_on
+        self.max_workers = max_workers
+        self._stats: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def call(self, func: Callable[[], T], metrics: NullMetrics = NULL_METRICS) -> T:
+        """Ejecutar la lectura `func` con reintentos.
+
+        Args:
+            func: función sin argumentos que hace la lectura completa, se llama una vez por intento.
+            metrics: metricas donde se registran los reintentos y solicitudes duplicadas.
+
+        Returns:
+            resultado del primer intento exitoso.
+        """
+        self._registrar("calls", metrics)
+        for intento in range(self.max_attempts):
+            try:
+                return self._intento(func, metrics)
+            except Exception as e:
+                if not self._reintentar(e, intento, metrics):
+                    raise
+            time.sleep(self._espera(intento))
+        raise AssertionError("inalcanzable")
+
+    async def call_async(self, corutina: Callable[[], Awaitable[T]], metrics: NullMetrics = NULL_METRICS) -> T:
+        """Version asincrona de `call`, `corutina` crea la corutina de lectura de cada intento."""
+        self._registrar("calls", metrics)
+        for intento in range(self.max_attempts):
+            try:
+                return await self._intento_async(corutina, metrics)
+            except Exception as e:
+                if not self._reintentar(e, intento, metrics):
+                    raise
+            await asyncio.sleep(self._espera(intento))
+        raise AssertionError("inalcanzable")
+
+    def snapshot(self) -> Dict[str, int]:
+        """Totales de lecturas (`calls`), reintentos, solicitudes duplicadas y tiempos agotados."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _intento(self, func: Callable[[], T], metrics: NullMetrics) -> T:
+        """Ejecutar un intento, con `deadline` y solicitudes duplicadas si estan configurados."""
+        if self.deadline is None and self.hedge_after is None:
+            return func()
+
+        executor = self._get_executor()
+        inicio = time.monotonic()
+        futures: List[Future] = [executor.submit(contextvars.copy_context().run, func)]
+        pendientes = set(futures)
+        errores: List[BaseException] = []
+        try:
+            while True:
+                hechos, pendientes = wait(
+                    pendientes, timeout=self._timeout(inicio, len(futures)), return_when=FIRST_COMPLETED
+                )
+                for future in hechos:
+                    error = future.exception()
+                    if error is None:
+                        if future is not futures[0]:
+                            self._registrar("hedge_wins", metrics)
+                        return future.result()
+                    if not self.retry_on(error):
+                        raise error
+                    errores.append(error)
+                if not pendientes:
+                    raise errores[0]
+                if self._duplicar(inicio, len(futures), metrics):
+                    futures.append(executor.submit(contextvars.copy_context().run, func))
+                    pendientes.add(futures[-1])
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def _intento_async(self, corutina: Callable[[], Awaitable[T]], metrics: NullMetrics) -> T:
+        """Version asincrona de `_intento`."""
+        if self.deadline is None and self.hedge_after is None:
+            return await corutina()
+
+        inicio = time.monotonic()
+        tareas: List[asyncio.Future] = [asyncio.ensure_future(corutina())]
+        pendientes = set(tareas)
+        errores: List[BaseException] = []
+        try:
+            while True:
+                hechos, pendientes = await asyncio.wait(
+                    pendientes, timeout=self._timeout(inicio, len(tareas)), return_when=asyncio.FIRST_COMPLETED
+                )
+                for tarea in hechos:
+                    error = tarea.exception()
+                    if error is None:
+                        if tarea is not tareas[0]:
+                            self._registrar("hedge_wins", metrics)
+                        return tarea.result()
+                    if not self.retry_on(error):
+                        raise error
+                    errores.append(error)
+                if not pendientes:
+                    raise errores[0]
+                if self._duplicar(inicio, len(tareas), metrics):
+                    tareas.append(asyncio.ensure_future(corutina()))
+                    pendientes.add(tareas[-1])
+        finally:
+            for tarea in tareas:
+                tarea.cancel()
+
+    def _timeout(self, inicio: float, solicitudes: int) -> Optional[float]:
+        """Segundos hasta el tiempo maximo del intento o la siguiente solicitud duplicada."""
+        transcurrido = time.monotonic() - inicio
+        limites = []
+        if self.deadline is not None:
+            limites.append(self.deadline - transcurrido)
+        if solicitudes <= self.max_hedges:
+            limites.append(self.hedge_after * solicitudes - transcurrido)
+        return max(0.0, min(limites)) if limites else None
+
+    def _duplicar(self, inicio: float, solicitudes: int, metrics: NullMetrics) -> bool:
+        """Al vencer la espera, levantar `TiempoAgotado` o indicar si se lanza una solicitud duplicada."""
+        transcurrido = time.monotonic() - inicio
+        if self.deadline is not None and transcurrido >= self.deadline:
+            self._registrar("deadline_exceeded", metrics)
+            raise TiempoAgotado(self.deadline)
+        if solicitudes <= self.max_hedges and transcurrido >= self.hedge_after * solicitudes:
+            self._registrar("hedged_requests", metrics)
+            return True
+        return False
+
+    def _reintentar(self, error: BaseException, intento: int, metrics: NullMetrics) -> bool:
+        """Indica si se reintenta después de `error` en el intento `intento` (desde cero)."""
+        if intento + 1 >= self.max_attempts or not self.retry_on(error):
+            self._registrar("failures", metrics)
+            return False
+        logging.debug(f"error transitorio en el intento {intento + 1}, reintentando: {error!r}")
+        self._registrar("retries", metrics)
+        return True
+
+    def _espera(self, intento: int) -> float:
+        """Segundos de espera antes del intento `intento + 1`."""
+        espera = min(self.max_backoff, self.backoff * 2**intento)
+        return random.uniform(0, espera) if self.jitter else espera
+
+    def _registrar(self, nombre: str, metrics: NullMetrics) -> None:
+        """Incrementar el total `nombre` de la politica y el contador de las metricas."""
+        with self._lock:
+            self._stats[nombre] += 1
+        if nombre in CONTADORES_METRICAS:
+            metrics.increment(nombre)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Pool de hilos para los intentos con `deadline` o solicitudes duplicadas."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="azure_datalake_utils_retry"
+                )
+            return self._executor
@@ -1,10 +1,23 @@
 """Utilidades relacionadas con la cuenta de almacenamiento."""
+from __future__ import annotations
+
 import datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+from urllib.parse import quote
+
+from fsspec.asyn import sync
+
+from azure_datalake_utils._lazy import lazy_import
+
+if TYPE_CHECKING:
+    from adlfs import AzureBlobFileSystem
+    from azure.storage.blob import UserDelegationKey
+    from typing_extensions import Literal
+
+blob = lazy_import("azure.storage.blob")
 
-import pandas as pd
-from adlfs import AzureBlobFileSystem
-from azure.storage.blob import BlobSasPermissions, generate_blob_sas
-from typing_extensions import Literal
+# duración maxima de una llave de delegación de usuario.
+MAX_USER_DELEGATION_KEY_DURATION = datetime.timedelta(days=7)
 
 
 def create_url_sas_token(
@@ -15,21 +28,75 @@ def create_url_sas_token(
     ip: str = None,
 ) -> str:
     """Crea un url con sas token."""
+    return next(create_urls_sas_token([ruta], fs, expiration_duration, unit, ip))
+
+
+def create_urls_sas_token(
+    rutas: Iterable[str],
+    fs: AzureBlobFileSystem,
+    expiration_duration: int,
+    unit: Literal["day", "hour", "minute", 'second'] = "hour",
+    ip: str = None,
+    user_delegation_key: Optional[UserDelegationKey] = None,
+) -> Iterator[str]:
+    """Crea urls con sas token para varias rutas.
+
+    La ventana de expiración, la url de la cuenta y la llave para firmar se calculan una sola vez
+    al llamar la función y se usan para firmar todas las rutas. Los urls se generan a medida que se consumen.
+
+    Si el filesystem no tiene `account_key` (instancias creadas con credenciales), se firma con
+    una llave de delegación de usuario, que se solicita una sola vez a la cuenta. Azure limita estas
+    llaves a 7 días, por lo que la duración no puede superarlos.
+
+    Args:
+        rutas: rutas de los blobs, de la forma `{NOMBRE_CONTENEDOR}/{RUTA}`.
+        fs: filesystem de la cuenta.
+        expiration_duration: duración del token.
+        unit: unidad de `expiration_duration`.
+        ip: ip o rango de ips permitidas.
+        user_delegation_key: llave de delegación a usar. Si es `None` y el filesystem no tiene
+            `account_key`, se solicita una nueva.
+
+    Returns:
+        iterador con el url con sas token de cada ruta, en el mismo orden de `rutas`.
+
+    Raises:
+        ValueError: si se firma con una llave de delegación de usuario y la duración supera 7 días.
+    """
     start_time = datetime.datetime.now(datetime.timezone.utc)
-    expiry_time = start_time + pd.Timedelta(value=expiration_duration, unit=unit)
-    contenedor = ruta.split("/")[0]
-    path_file = "/".join(ruta.split("/")[1:])
-    blob_client = fs.service_client.get_blob_client(contenedor, path_file)
-
-    sas_token = generate_blob_sas(
-        account_name=blob_client.account_name,
-        container_name=blob_client.container_name,
-        blob_name=blob_client.blob_name,
-        account_key=fs.account_key,
-        permission=BlobSasPermissions(read=True),
-        expiry=expiry_time,
-        start=start_time,
-        ip=ip,
-    )
-
-    return f"{blob_client.url}?{sas_token}"
+    expiry_time = start_time + datetime.timedelta(**{f"{unit}s": expiration_duration})
+    account_url = fs.service_client.url.rstrip("/")
+    account_name = fs.service_client.account_name
+    permission = blob.BlobSasPermissions(read=True)
+
+    account_key = fs.account_key
+    if account_key is None and user_delegation_key is None:
+        if expiry_time - start_time > MAX_USER_DELEGATION_KEY_DURATION:
+            raise ValueError(
+                f"La duración {expiration_duration} {unit} supera los 7 días permitidos para firmar con una llave "
+                "de delegación de usuario, use una duración menor o un filesystem con account_key."
+            )
+        user_delegation_key = sync(
+            fs.loop,
+            fs.service_client.get_user_delegation_key,
+            key_start_time=start_time,
+            key_expiry_time=expiry_time,
+        )
+
+    def firmar() -> Iterator[str]:
+        for ruta in rutas:
+            contenedor, _, path_file = ruta.partition("/")
+            sas_token = blob.generate_blob_sas(
+                account_name=account_name,
+                container_name=contenedor,
+                blob_name=path_file,
+                account_key=account_key,
+                user_delegation_key=user_delegation_key,
+                permission=permission,
+                expiry=expiry_time,
+                start=start_time,
+                ip=ip,
+            )
+            yield f"{account_url}/{quote(contenedor)}/{quote(path_file, safe='~/')}?{sas_token}"
+
+    return firmar()
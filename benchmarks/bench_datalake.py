@@ -0,0 +1,210 @@
+"""Benchmark de lectura y escritura de `Datalake` sin conexión a Azure.
+
+Reemplaza el filesystem del datalake (`Datalake.fs`) por un filesystem de fsspec en memoria o
+en una carpeta local, que además cuenta los llamados de listado y reporta `last_modified` como
+lo hace `adlfs`. Sobre ese filesystem se genera una tabla sintetica con particiones tipo Hive
+(`p0=v0/p1=v1/.../archivo`) de profundidad y ancho configurables, escribiendola con cada
+`write_*`, y luego se mide la lectura con `read_csv`, el descubrimiento de `HivePartitiion`
+y `read_csv_with_partition` con los lectores de pandas y pyarrow.
+
+Por cada etapa se reporta archivos/s, MB/s, llamados a `ls` y el pico de RSS del proceso.
+Los tiempos no incluyen la latencia de red, sirven para comparar el costo de la libreria
+entre versiones.
+
+Uso (desde la raíz del repositorio, con el paquete instalado con `poetry install`):
+
+```
+python benchmarks/bench_datalake.py --profundidad 3 --ancho 4 --archivos-por-hoja 2 --filas 5000
+python benchmarks/bench_datalake.py --almacenamiento local --formatos csv,parquet --max-workers 8
+```
+"""
+import argparse
+import datetime
+import itertools
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+from fsspec.implementations.memory import MemoryFileSystem
+
+from azure_datalake_utils import Datalake
+from azure_datalake_utils.partitions import HivePartitiion
+
+FORMATOS = {
+    "csv": ("write_csv", ".csv", {"index": False}),
+    "parquet": ("write_parquet", ".parquet", {"index": False}),
+    "json": ("write_json", ".json", {"orient": "records"}),
+    "excel": ("write_excel", ".xlsx", {"index": False}),
+}
+
+
+class ConteoMixin:
+    """Cuenta los llamados al filesystem y agrega `last_modified` a los listados, como `adlfs`."""
+
+    cachable = False
+
+    def __init__(self, *args, **kwargs):
+        """Constructor."""
+        super().__init__(*args, **kwargs)
+        self.llamados: Counter = Counter()
+
+    def ls(self, path, detail=True, **kwargs):
+        """Listar una carpeta."""
+        self.llamados["ls"] += 1
+        entries = super().ls(path, detail=True, **kwargs)
+        for entry in entries:
+            fecha = entry.get("mtime", entry.get("created"))
+            if fecha is not None and entry.get("type") == "file":
+                entry["last_modified"] = datetime.datetime.fromtimestamp(fecha, tz=datetime.timezone.utc)
+        return entries if detail else [entry["name"] for entry in entries]
+
+    def open(self, path, mode="rb", **kwargs):
+        """Abrir un archivo."""
+        self.llamados["open"] += 1
+        return super().open(path, mode, **kwargs)
+
+
+class MemoriaFileSystem(ConteoMixin, MemoryFileSystem):
+    """Filesystem en memoria, cada instancia tiene su propio almacenamiento."""
+
+    def __init__(self, *args, **kwargs):
+        """Constructor."""
+        super().__init__(*args, **kwargs)
+        self.store = {}
+        self.pseudo_dirs = [""]
+
+
+class LocalConteoFileSystem(ConteoMixin, LocalFileSystem):
+    """Filesystem de una carpeta local."""
+
+
+def pico_rss_mb() -> float:
+    """Pico de memoria residente del proceso en MiB."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reporta KiB y macOS bytes.
+    return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+
+
+def crear_df(filas: int, seed: int) -> pd.DataFrame:
+    """Crea un DataFrame con columnas numericas y de texto."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "id": np.arange(filas),
+            "valor": rng.random(filas),
+            "categoria": rng.choice(["alfa", "beta", "gamma", "delta"], filas),
+            "texto": [f"registro_{i}" for i in rng.integers(0, 10_000, filas)],
+        }
+    )
+
+
+def hojas(profundidad: int, ancho: int) -> List[str]:
+    """Carpetas del ultimo nivel de la tabla, por ejemplo `p0=0/p1=3`."""
+    valores = itertools.product(range(ancho), repeat=profundidad)
+    return ["/".join(f"p{nivel}={valor}" for nivel, valor in enumerate(combinacion)) for combinacion in valores]
+
+
+def medir(nombre: str, fs: ConteoMixin, func: Callable[[], Any], archivos: int, bytes_: int) -> Dict[str, Any]:
+    """Ejecuta `func` y retorna las metricas de la etapa."""
+    fs.llamados.clear()
+    inicio = time.perf_counter()
+    func()
+    tiempo = time.perf_counter() - inicio
+    return {
+        "etapa": nombre,
+        "tiempo_s": tiempo,
+        "archivos/s": archivos / tiempo,
+        "MB/s": bytes_ / 2**20 / tiempo,
+        "llamados_ls": fs.llamados["ls"],
+        "pico_rss_MiB": pico_rss_mb(),
+    }
+
+
+def main():
+    """Ejecuta el benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--almacenamiento", choices=["memoria", "local"], default="memoria")
+    parser.add_argument("--profundidad", type=int, default=2)
+    parser.add_argument("--ancho", type=int, default=4)
+    parser.add_argument("--archivos-por-hoja", type=int, default=1)
+    parser.add_argument("--filas", type=int, default=10_000, help="filas de cada archivo")
+    parser.add_argument("--formatos", default="csv,parquet,json,excel")
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.almacenamiento == "memoria":
+        fs = MemoriaFileSystem()
+        base = "benchmark"
+    else:
+        fs = LocalConteoFileSystem()
+        base = f"{tempfile.mkdtemp(prefix='bench_datalake_')}/benchmark"
+
+    dl = Datalake.from_account_key("benchmark", "a2V5")
+    dl.fs = fs
+    df = crear_df(args.filas, seed=42)
+    carpetas = hojas(args.profundidad, args.ancho)
+    resultados = []
+
+    for formato in args.formatos.split(","):
+        metodo, extension, kwargs = FORMATOS[formato]
+        ruta = f"{base}/{formato}/"
+        rutas = [f"{ruta}{carpeta}/parte_{i}{extension}" for carpeta in carpetas for i in range(args.archivos_por_hoja)]
+        for carpeta in carpetas:
+            fs.makedirs(f"{ruta}{carpeta}", exist_ok=True)
+
+        resultado = medir(metodo, fs, lambda: [getattr(dl, metodo)(df, r, **kwargs) for r in rutas], len(rutas), 0)
+        bytes_ = sum(fs.size(r) for r in rutas)
+        resultado["MB/s"] = bytes_ / 2**20 / resultado["tiempo_s"]
+        resultados.append(resultado)
+
+        if formato != "csv":
+            continue
+
+        resultados.append(
+            medir("read_csv", fs, lambda: dl.read_csv(rutas, max_workers=args.max_workers), len(rutas), bytes_)
+        )
+        resultados.append(
+            medir(
+                "HivePartitiion",
+                fs,
+                lambda: HivePartitiion(ruta=ruta, fs=fs, last_modified_last_level=False),
+                len(rutas),
+                0,
+            )
+        )
+        resultados.append(
+            medir(
+                "read_csv_with_partition",
+                fs,
+                lambda: dl.read_csv_with_partition(ruta, last_modified_last_level=False, max_workers=args.max_workers),
+                len(rutas),
+                bytes_,
+            )
+        )
+        resultados.append(
+            medir(
+                "read_csv_with_partition[pyarrow]",
+                fs,
+                lambda: dl.read_csv_with_partition(
+                    ruta, last_modified_last_level=False, max_workers=args.max_workers, csv_engine="pyarrow"
+                ),
+                len(rutas),
+                bytes_,
+            )
+        )
+
+    print(
+        f"tabla: {len(carpetas)} particiones x {args.archivos_por_hoja} archivos, {args.filas} filas por archivo, "
+        f"almacenamiento {args.almacenamiento}"
+    )
+    print(pd.DataFrame(resultados).to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark del tiempo de importación del paquete.
+
+Ejecuta cada sentencia en un proceso nuevo con `python -X importtime`, suma el tiempo acumulado
+de los modulos de primer nivel y falla (código de salida 1) si la mediana supera el umbral,
+de esta manera se puede usar para detectar regresiones en el arranque en frío.
+
+Uso (desde la raíz del repositorio, con el paquete instalado con `poetry install`):
+
+```
+python benchmarks/bench_import_time.py --repeticiones 5 --max-paquete-ms 100 --max-datalake-ms 1000
+```
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import List, Set, Tuple
+
+SENTENCIAS = {
+    "paquete": "import azure_datalake_utils",
+    "datalake": "from azure_datalake_utils import Datalake",
+}
+PESADOS = ["pandas", "numpy", "pyarrow", "azure.identity", "adlfs", "azure.storage.blob"]
+
+_LINEA = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def medir(sentencia: str) -> Tuple[int, Set[str]]:
+    """Retorna el tiempo total en microsegundos y los modulos importados por `sentencia`."""
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", sentencia], check=True, capture_output=True, text=True
+    ).stderr
+    total, modulos = 0, set()
+    for linea in salida.splitlines():
+        match = _LINEA.match(linea)
+        if match:
+            modulos.add(match.group(3))
+            # solo los modulos de primer nivel, el acumulado ya incluye sus dependencias.
+            if len(match.group(2)) == 1:
+                total += int(match.group(1))
+    return total, modulos
+
+
+def main() -> int:
+    """Ejecuta el benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--max-paquete-ms", type=float, default=100)
+    parser.add_argument("--max-datalake-ms", type=float, default=1000)
+    args = parser.parse_args()
+    umbrales = {"paquete": args.max_paquete_ms, "datalake": args.max_datalake_ms}
+
+    fallas: List[str] = []
+    for nombre, sentencia in SENTENCIAS.items():
+        mediciones = [medir(sentencia) for _ in range(args.repeticiones)]
+        mediana = statistics.median(total for total, _ in mediciones) / 1000
+        pesados = sorted({p for _, modulos in mediciones for p in PESADOS if p in modulos})
+        print(f"{nombre:>10}: {mediana:8.1f} ms (umbral {umbrales[nombre]:.0f} ms)  pesados: {pesados or '-'}")
+        if mediana > umbrales[nombre]:
+            fallas.append(f"{nombre} tarda {mediana:.1f} ms")
+        if pesados:
+            fallas.append(f"{nombre} importa {pesados}")
+
+    for falla in fallas:
+        print(f"REGRESION: {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
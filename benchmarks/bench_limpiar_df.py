@@ -0,0 +1,93 @@
+"""Benchmark de `Datalake._limpiar_df_cols_str`.
+
+Compara la implementación actual contra la implementación anterior (copia completa y tres
+`DataFrame.replace` encadenados) sobre un DataFrame sintético.
+
+Uso (desde la raíz del repositorio, con el paquete instalado con `poetry install`):
+
+```
+python benchmarks/bench_limpiar_df.py --filas 1000000 --proporcion-sucios 0.01
+```
+"""
+import argparse
+import re
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from azure_datalake_utils import Datalake
+
+
+def limpiar_anterior(df: pd.DataFrame, sep: str = ",") -> pd.DataFrame:
+    """Implementación anterior a la limpieza en una sola pasada."""
+    types = df.dtypes
+    string_columns = list(types[types == np.array([object()]).dtype].index)
+    esc_sep = re.escape(sep)
+    df_res = df.copy()
+    df_res[string_columns] = (
+        df[string_columns]
+        .replace(esc_sep, " ", regex=True)
+        .replace("\r", " ", regex=True)
+        .replace("\n", " ", regex=True)
+    )
+    return df_res
+
+
+def crear_df(filas: int, proporcion_sucios: float, seed: int = 42) -> pd.DataFrame:
+    """Crea un DataFrame con columnas string limpias, columnas con caracteres a reemplazar y numericas."""
+    rng = np.random.default_rng(seed)
+    base = np.array([f"valor_{i}" for i in range(1000)], dtype=object)
+    sucios = rng.random(filas) < proporcion_sucios
+    columna_sucia = base[rng.integers(0, 1000, filas)].copy()
+    columna_sucia[sucios] = "con,coma\ny salto"
+    return pd.DataFrame(
+        {
+            "limpia_1": base[rng.integers(0, 1000, filas)],
+            "limpia_2": base[rng.integers(0, 1000, filas)],
+            "sucia": columna_sucia,
+            "numero": rng.random(filas),
+        }
+    )
+
+
+def medir(func, df: pd.DataFrame, repeticiones: int):
+    """Retorna el mejor tiempo y el pico de memoria asignada por `func`."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        func(df)
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    func(df)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos), pico
+
+
+def main():
+    """Ejecuta el benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--proporcion-sucios", type=float, default=0.01)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    df = crear_df(args.filas, args.proporcion_sucios)
+    dl = Datalake.from_account_key("benchmark", "a2V5")
+
+    pd.testing.assert_frame_equal(limpiar_anterior(df), dl._limpiar_df_cols_str(df))
+
+    resultados = {
+        "anterior": medir(limpiar_anterior, df, args.repeticiones),
+        "actual": medir(dl._limpiar_df_cols_str, df, args.repeticiones),
+        "actual inplace": medir(lambda d: dl._limpiar_df_cols_str(d.copy(deep=False), inplace=True), df, 1),
+    }
+    for nombre, (tiempo, pico) in resultados.items():
+        print(f"{nombre:>15}: {tiempo:8.3f} s  pico memoria {pico / 2**20:8.1f} MiB")
+    print(f"aceleración: {resultados['anterior'][0] / resultados['actual'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Fixtures compartidas por la suite de tests."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from typing import Callable, Dict, List
+from unittest.mock import Mock
+
+import pytest
+from adlfs import AzureBlobFileSystem
+
+
+@pytest.fixture
+def fs_mock() -> Mock:
+    """Filesystem simulado con la interfaz de `AzureBlobFileSystem`."""
+    return Mock(spec=AzureBlobFileSystem)
+
+
+def _ls_from_files(files: Dict[str, Dict]) -> Callable[..., List[Dict]]:
+    """Construye un side effect de `fs.ls(detail=True)` a partir de un dict `{ruta: info}` de archivos.
+
+    Simula el comportamiento de adlfs en una cuenta con espacio jerárquico: retorna los archivos y carpetas
+    del primer nivel de la ruta, las carpetas con `type='directory'`, sin `/` al final y con el `last_modified`
+    del archivo más reciente que contienen directamente. Los cambios a `files` se ven en los siguientes listados.
+    """
+
+    def ls(path, detail=True):
+        prefix = path.rstrip("/") + "/"
+        entries = {}
+        for name, info in files.items():
+            if not name.startswith(prefix):
+                continue
+            rest = name[len(prefix) :].split("/")
+            if len(rest) == 1:
+                entries[name] = {'name': name, 'type': 'file', **info}
+            else:
+                folder = prefix + rest[0]
+                folder_files = [
+                    v['last_modified']
+                    for k, v in files.items()
+                    if k.rsplit("/", 1)[0] == folder and 'last_modified' in v
+                ]
+                entries[folder] = {
+                    'name': folder,
+                    'type': 'directory',
+                    'last_modified': max(folder_files) if folder_files else None,
+                }
+        if not entries:
+            raise FileNotFoundError(path)
+        return list(entries.values())
+
+    return ls
+
+
+@pytest.fixture
+def ls_from_files() -> Callable[[Dict[str, Dict]], Callable[..., List[Dict]]]:
+    """Fabrica de side effects de `fs.ls`, ver `_ls_from_files`."""
+    return _ls_from_files
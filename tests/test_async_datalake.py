@@ -0,0 +1,149 @@
+"""Tests for `azure_datalake_utils.async_datalake` package."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import asyncio
+import gzip
+import io
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from azure.core.exceptions import ServiceResponseError
+from fsspec.asyn import get_loop
+
+from azure_datalake_utils import AsyncDatalake
+from azure_datalake_utils.exepctions import ArchivoNoEncontrado, ExtensionIncorrecta
+from azure_datalake_utils.resilience import RetryPolicy
+
+
+@pytest.fixture
+def adl_account() -> AsyncDatalake:
+    """Instancia con un filesystem asincrono simulado."""
+    adl = AsyncDatalake.from_account_key('name', 'key', max_concurrency=2)
+    adl.fs = Mock()
+    adl.fs.loop = get_loop()
+    adl.fs._cat_file = AsyncMock()
+    adl.fs._pipe_file = AsyncMock()
+    return adl
+
+
+def test_async_datalake_should_init_from_account_key():
+    """Test para inicializacion con key account."""
+    adl = AsyncDatalake.from_account_key('name', 'key')
+    assert adl.storage_options == {'account_name': 'name', 'account_key': 'key'}
+
+
+def test_async_read_csv_should_return_dataframe(adl_account: AsyncDatalake):
+    """Test read_csv asincrono."""
+    adl_account.fs._cat_file.return_value = b"foo_id\n1\n2\n"
+    df = asyncio.run(adl_account.read_csv("contenedor/file.csv"))
+    adl_account.fs._cat_file.assert_awaited_once_with("contenedor/file.csv")
+    assert df['foo_id'].to_list() == [1, 2]
+
+
+def test_async_read_csv_with_list_should_keep_order(adl_account: AsyncDatalake):
+    """Test read_csv asincrono con lista de archivos."""
+
+    async def cat_file(ruta):
+        await asyncio.sleep(0.01 if ruta.endswith("0.csv") else 0)
+        return f"ruta\n{ruta}\n".encode()
+
+    adl_account.fs._cat_file.side_effect = cat_file
+    files = [f"contenedor/file_{i}.csv" for i in range(5)]
+    df = asyncio.run(adl_account.read_csv(files))
+    assert df['ruta'].to_list() == files
+
+
+def test_async_read_csv_should_reuse_client_across_event_loops(adl_account: AsyncDatalake):
+    """Test read_csv asincrono con el mismo cliente en varios `asyncio.run` con operaciones en espera."""
+
+    async def cat_file(ruta):
+        await asyncio.sleep(0.01)
+        return f"ruta\n{ruta}\n".encode()
+
+    adl_account.fs._cat_file.side_effect = cat_file
+    files = [f"contenedor/file_{i}.csv" for i in range(5)]
+    for _ in range(2):
+        df = asyncio.run(adl_account.read_csv(files))
+        assert df['ruta'].to_list() == files
+
+
+def test_async_read_csv_with_retry_policy_should_retry_download(adl_account: AsyncDatalake):
+    """Test read_csv asincrono con un error transitorio en la descarga."""
+    adl_account.datalake.retry_policy = RetryPolicy(backoff=0)
+    adl_account.fs._cat_file.side_effect = [ServiceResponseError("conexión cerrada"), b"foo_id\n1\n"]
+    df = asyncio.run(adl_account.read_csv("contenedor/file.csv"))
+    assert df['foo_id'].to_list() == [1]
+    assert adl_account.datalake.retry_policy.snapshot()["retries"] == 1
+
+
+def test_async_read_csv_should_raise_ArchivoNoEncontrado(adl_account: AsyncDatalake):
+    """Test read_csv asincrono con archivo inexistente."""
+    adl_account.fs._cat_file.side_effect = FileNotFoundError
+    with pytest.raises(ArchivoNoEncontrado) as error:
+        asyncio.run(adl_account.read_csv("contenedor/file.csv"))
+    assert error.value.ruta == "contenedor/file.csv"
+
+    with pytest.raises(ExtensionIncorrecta):
+        asyncio.run(adl_account.read_csv("contenedor/file.text"))
+
+
+def test_async_read_parquet_should_return_dataframe(adl_account: AsyncDatalake):
+    """Test read_parquet asincrono."""
+    buffer = io.BytesIO()
+    pd.DataFrame({"foo_id": [1, 2, 3]}).to_parquet(buffer)
+    adl_account.fs._cat_file.return_value = buffer.getvalue()
+    df = asyncio.run(adl_account.read_parquet("contenedor/file.parquet"))
+    assert df['foo_id'].to_list() == [1, 2, 3]
+
+
+def test_async_write_csv_should_clean_and_upload(adl_account: AsyncDatalake):
+    """Test write_csv asincrono."""
+    df = pd.DataFrame({"foo_str": ['bar\n', 'foo,']})
+    asyncio.run(adl_account.write_csv(df, "contenedor/file.csv", index=False))
+    adl_account.fs._pipe_file.assert_awaited_once_with("contenedor/file.csv", b"foo_str\nbar \nfoo \n")
+
+
+def test_async_write_and_read_compressed_csv(adl_account: AsyncDatalake):
+    """Test write_csv y read_csv asincronos con un archivo comprimido."""
+    df = pd.DataFrame({"foo_str": ['bar', 'foo']})
+    asyncio.run(adl_account.write_csv(df, "contenedor/file.csv.gz", index=False))
+    ruta, data = adl_account.fs._pipe_file.await_args.args
+    assert ruta == "contenedor/file.csv.gz"
+    assert gzip.decompress(data) == b"foo_str\nbar\nfoo\n"
+
+    adl_account.fs._cat_file.return_value = data
+    pd.testing.assert_frame_equal(asyncio.run(adl_account.read_csv("contenedor/file.csv.gz")), df)
+
+
+@patch("azure_datalake_utils.async_datalake.HivePartitiion")
+def test_async_read_csv_with_partition_should_assign_partitions(hive_mock: Mock, adl_account: AsyncDatalake):
+    """Test read_csv_with_partition asincrono."""
+    hive_mock.return_value.get_partition_list.return_value = [
+        'contenedor/file/path/part=1/file.csv',
+        'contenedor/file/path/part=2/file.csv',
+    ]
+    hive_mock.return_value.get_partition_files.return_value = [('file.csv', {'part': '1'}), ('file.csv', {'part': '2'})]
+    hive_mock.return_value.get_partition_categories.return_value = {'part': (np.array([0, 1]), pd.Index(['1', '2']))}
+    adl_account.fs._cat_file.return_value = b"foo_id\n1\n2\n"
+
+    df = asyncio.run(adl_account.read_csv_with_partition("contenedor/file/path/"))
+
+    assert adl_account.fs._cat_file.await_count == 2
+    assert df['part'].dtype == 'category'
+    assert df['part'].to_list() == ['1', '1', '2', '2']
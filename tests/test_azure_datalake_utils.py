@@ -16,26 +16,78 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+import contextlib
+import datetime
+import gzip
+import io
 import platform
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pandas as pd
+import pyarrow as pa
 import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 from azure.identity import AuthenticationRecord
-from azure.core.exceptions import ResourceNotFoundError
-from adlfs import AzureBlobFileSystem
+from fsspec.implementations.local import LocalFileSystem
+from fsspec.implementations.memory import MemoryFileSystem
 
 from azure_datalake_utils import Datalake
-from azure_datalake_utils.exepctions import ExtensionIncorrecta
+from azure_datalake_utils.disk_cache import BlobDiskCache
+from azure_datalake_utils.exepctions import ArchivoNoEncontrado, ExtensionIncorrecta
 from azure_datalake_utils.experimental import AioCredentialWrapper
+from azure_datalake_utils.filesystem import DEFAULT_FILESYSTEM_OPTIONS
+from azure_datalake_utils.resilience import RetryPolicy
 
 fake_record = AuthenticationRecord("tenant-id", "client-id", "localhost", "object.tenant", "username")
 
 
+class FsFalso:
+    """Filesystem que al abrir un archivo entrega la ruta, para usar con los lectores de pandas simulados."""
+
+    def open(self, ruta: str, mode: str = 'rb', **kwargs):
+        """Abrir la ruta."""
+        return contextlib.nullcontext(ruta)
+
+
+class FsMemoria(MemoryFileSystem):
+    """Filesystem en memoria que reporta `last_modified` en los listados, como `adlfs`."""
+
+    cachable = False
+
+    def __init__(self, *args, **kwargs):
+        """Constructor."""
+        super().__init__(*args, **kwargs)
+        self.store = {}
+        self.pseudo_dirs = [""]
+
+    def ls(self, path, detail=True, **kwargs):
+        """Listar una carpeta."""
+        entries = super().ls(path, detail=True, **kwargs)
+        for entry in entries:
+            if entry["type"] == "file":
+                entry["last_modified"] = datetime.datetime.fromtimestamp(entry["created"], tz=datetime.timezone.utc)
+        return entries if detail else [entry["name"] for entry in entries]
+
+
+class FsMemoriaConListados(FsMemoria):
+    """Como `adlfs`, responde los listados desde `dircache` cuando `use_listings_cache` esta habilitado."""
+
+    def ls(self, path, detail=True, **kwargs):
+        """Listar una carpeta, usando el cache de listados."""
+        llave = path.rstrip("/")
+        if llave in self.dircache:
+            entries = self.dircache[llave]
+        else:
+            entries = self.dircache[llave] = super().ls(path, detail=True, **kwargs)
+        return entries if detail else [entry["name"] for entry in entries]
+
+
 @pytest.fixture
 def dl_account() -> Datalake:
     """DL instancia incilizada."""
-    return Datalake.from_account_key('name', 'key')
+    dl = Datalake.from_account_key('name', 'key')
+    dl.fs = FsFalso()
+    return dl
 
 
 @pytest.fixture
@@ -187,12 +239,11 @@ def test_read_excel_should_raise_ArchivNoEncontrado_with_azure_error(read_mock:
 
 
 @patch("azure_datalake_utils.azure_datalake_utils.pd.read_csv")
-@patch("azure_datalake_utils.azure_datalake_utils.AzureBlobFileSystem", autospec=True)
 @patch("azure_datalake_utils.partitions.HivePartitiion.get_partition_list")
 def test_read_csv_with_partition_should_return_df_read_from_partitions(
     get_partition_list_mock: Mock,
-    fs_mock: AzureBlobFileSystem,
     read_mock,
+    fs_mock: Mock,
     dl_account: Datalake,
     test_df: pd.DataFrame,
 ):
@@ -202,6 +253,8 @@ def test_read_csv_with_partition_should_return_df_read_from_partitions(
         'contenedor/file/path/part=2/file.csv',
     ]
     read_mock.return_value = test_df
+    fs_mock.ls.return_value = []
+    fs_mock.open.side_effect = FsFalso().open
     dl_account.fs = fs_mock
     with patch(
         "azure_datalake_utils.azure_datalake_utils.HivePartitiion.get_partition_files",
@@ -221,3 +274,592 @@ def test_read_parquet_should_return_dataframe(read_mock: Mock, dl_account: Datal
     df = dl_account.read_parquet("path/to/file/")
     read_mock.assert_called_once()
     pd.testing.assert_frame_equal(df, test_df)
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.pd.read_csv")
+def test_read_csv_with_list_of_path_and_max_workers_should_keep_order(read_mock: Mock, dl_account: Datalake):
+    """Test read_csv concurrente conserva el orden de la lista."""
+    read_mock.side_effect = lambda ruta, **kwargs: pd.DataFrame({"ruta": [ruta]})
+    files = [f"path/to/file_{i}.csv" for i in range(10)]
+    df = dl_account.read_csv(files, max_workers=4)
+    assert read_mock.call_count == len(files)
+    assert df['ruta'].to_list() == files
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.pd.read_csv")
+def test_read_csv_with_list_of_path_should_raise_ArchivoNoEncontrado_with_path(read_mock: Mock, dl_account: Datalake):
+    """Test read_csv indica la ruta que no fue encontrada."""
+
+    def side_effect(ruta, **kwargs):
+        if ruta.endswith("faltante.csv"):
+            raise FileNotFoundError
+        return pd.DataFrame({"foo_id": [1]})
+
+    read_mock.side_effect = side_effect
+    with pytest.raises(ArchivoNoEncontrado) as error:
+        dl_account.read_csv(["path/to/file.csv", "path/to/faltante.csv"], max_workers=2)
+
+    assert error.value.ruta == "path/to/faltante.csv"
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.pd.read_csv")
+def test_read_csv_with_retry_policy_should_retry_transient_errors(read_mock: Mock, dl_account: Datalake):
+    """Test read_csv reintenta solo el archivo con un error transitorio."""
+    fallas = []
+
+    def side_effect(ruta, **kwargs):
+        if ruta.endswith("lento.csv") and not fallas:
+            fallas.append(ruta)
+            error = HttpResponseError(message="ServerBusy")
+            error.status_code = 503
+            raise error
+        return pd.DataFrame({"ruta": [ruta]})
+
+    read_mock.side_effect = side_effect
+    dl_account.retry_policy = RetryPolicy(backoff=0)
+    files = ["path/to/file_0.csv", "path/to/lento.csv", "path/to/file_2.csv"]
+
+    df = dl_account.read_csv(files, max_workers=2)
+
+    assert df['ruta'].to_list() == files
+    assert read_mock.call_count == 4
+    assert dl_account.retry_policy.snapshot() == {"calls": 3, "retries": 1}
+
+
+def test_read_parquet_with_partition_with_retry_policy_should_retry_transient_errors(dl_account: Datalake):
+    """Test read_parquet_with_partition reintenta la lectura del dataset con un error transitorio."""
+    dl_account.fs = FsMemoria()
+    for year in ["2022", "2023"]:
+        with dl_account.fs.open(f"contenedor/tabla/year={year}/part-0.parquet", "wb") as f:
+            pd.DataFrame({"foo_id": [int(year)]}).to_parquet(f, index=False)
+    dl_account.retry_policy = RetryPolicy(backoff=0)
+    open_ = dl_account.fs.open
+    fallas = []
+
+    def open_con_falla(path, *args, **kwargs):
+        if not fallas:
+            fallas.append(path)
+            raise ConnectionError("conexión reiniciada")
+        return open_(path, *args, **kwargs)
+
+    with patch.object(dl_account.fs, "open", open_con_falla):
+        df = dl_account.read_parquet_with_partition("contenedor/tabla/")
+
+    assert sorted(df["foo_id"]) == [2022, 2023]
+    assert dl_account.retry_policy.snapshot() == {"calls": 1, "retries": 1}
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.pd.read_csv")
+@patch("azure_datalake_utils.partitions.HivePartitiion.get_partition_list")
+def test_read_csv_with_partition_and_max_workers_should_keep_partition_order(
+    get_partition_list_mock: Mock,
+    read_mock,
+    fs_mock: Mock,
+    dl_account: Datalake,
+):
+    """Test para read_csv_with_partition concurrente."""
+    partes = [str(i) for i in range(8)]
+    get_partition_list_mock.return_value = [f'contenedor/file/path/part={p}/file.csv' for p in partes]
+    read_mock.side_effect = lambda ruta, **kwargs: pd.DataFrame({"ruta": [ruta, ruta]})
+    fs_mock.ls.return_value = []
+    fs_mock.open.side_effect = FsFalso().open
+    dl_account.fs = fs_mock
+    with patch(
+        "azure_datalake_utils.azure_datalake_utils.HivePartitiion.get_partition_files",
+        return_value=[('file.csv', {'part': p}) for p in partes],
+        create=True,
+    ):
+        df = dl_account.read_csv_with_partition("contenedor/file/path/", max_workers=3)
+
+    assert read_mock.call_count == len(partes)
+    assert df['part'].to_list() == [p for p in partes for _ in range(2)]
+    assert df['ruta'].to_list() == [f'contenedor/file/path/part={p}/file.csv' for p in partes for _ in range(2)]
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.HivePartitiion")
+def test_read_parquet_with_partition_should_push_down_filters_and_columns(
+    hive_mock: Mock, dl_account: Datalake, tmp_path
+):
+    """Test para read_parquet_with_partition con un filesystem local."""
+    ruta = f"{tmp_path.as_posix()}/tabla/"
+    particiones = [('2022', '1'), ('2023', '1'), ('2023', '2')]
+    for i, (year, month) in enumerate(particiones):
+        (tmp_path / "tabla" / f"year={year}" / f"month={month}").mkdir(parents=True)
+        pd.DataFrame({"valor": [i * 10, i * 10 + 1], "nombre": ["a", "b"]}).to_parquet(
+            f"{ruta}year={year}/month={month}/part-0.parquet"
+        )
+    hive_mock.return_value.get_partition_list.return_value = [
+        f"{ruta}year={year}/month={month}/part-0.parquet" for year, month in particiones
+    ] + [f"{ruta}_SUCCESS"]
+    hive_mock.return_value.get_partition_files.return_value = [
+        ('part-0.parquet', {'year': year, 'month': month}) for year, month in particiones
+    ]
+    dl_account.fs = LocalFileSystem()
+
+    df = dl_account.read_parquet_with_partition(ruta, columns=["valor", "year"], filters=[("valor", ">", 10)])
+
+    assert df.columns.to_list() == ["valor", "year"]
+    assert df["valor"].to_list() == [11, 20, 21]
+    assert df["year"].dtype == 'category'
+    assert df["year"].to_list() == ['2023', '2023', '2023']
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.HivePartitiion")
+def test_read_parquet_with_partition_should_raise_ArchivoNoEncontrado(hive_mock: Mock, dl_account: Datalake):
+    """Test para read_parquet_with_partition sin archivos."""
+    hive_mock.return_value.get_partition_list.return_value = []
+    dl_account.fs = Mock()
+    with pytest.raises(ArchivoNoEncontrado):
+        dl_account.read_parquet_with_partition("contenedor/tabla/")
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.pd.read_csv")
+def test_iter_csv_should_yield_chunks(read_mock: Mock, dl_account: Datalake, test_df: pd.DataFrame):
+    """Test iter_csv."""
+    reader = MagicMock()
+    reader.__enter__.return_value.__iter__.return_value = iter([test_df, test_df])
+    read_mock.return_value = reader
+
+    chunks = list(dl_account.iter_csv("path/to/file.csv", chunksize=3))
+
+    assert len(chunks) == 2
+    assert read_mock.call_args.kwargs['chunksize'] == 3
+
+
+@patch("azure_datalake_utils.azure_datalake_utils.pd.read_csv")
+def test_iter_csv_should_raise_ArchivoNoEncontrado(read_mock: Mock, dl_account: Datalake):
+    """Test iter_csv con archivo inexistente."""
+    read_mock.side_effect = FileNotFoundError
+    with pytest.raises(ArchivoNoEncontrado) as error:
+        list(dl_account.iter_csv("path/to/file.csv"))
+    assert error.value.ruta == "path/to/file.csv"
+
+
+def test_iter_csv_with_partition_should_assign_partition_cols(dl_account: Datalake, tmp_path):
+    """Test iter_csv_with_partition con archivos locales."""
+    for part in ['1', '2']:
+        (tmp_path / "tabla" / f"part={part}").mkdir(parents=True)
+        pd.DataFrame({"foo_id": range(5)}).to_csv(tmp_path / "tabla" / f"part={part}" / "file.csv", index=False)
+    dl_account.fs = LocalFileSystem()
+
+    chunks = list(
+        dl_account.iter_csv_with_partition(
+            f"{tmp_path.as_posix()}/tabla/",
+            partition_cols={'part': ['1', '2']},
+            last_modified_last_level=False,
+            chunksize=2,
+        )
+    )
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1, 2, 2, 1]
+    df = pd.concat(chunks)
+    assert df['part'].dtype == 'category'
+    assert df['part'].to_list() == ['1'] * 5 + ['2'] * 5
+
+
+def test_read_csv_with_partition_with_categorical_partitions_should_assign_categories(dl_account: Datalake, tmp_path):
+    """Test read_csv_with_partition con columnas categoricas y tipadas."""
+    for year, filas in [('2022', 3), ('2023', 2)]:
+        (tmp_path / "tabla" / f"year={year}").mkdir(parents=True)
+        pd.DataFrame({"foo_id": range(filas)}).to_csv(tmp_path / "tabla" / f"year={year}" / "file.csv", index=False)
+    dl_account.fs = LocalFileSystem()
+
+    df = dl_account.read_csv_with_partition(
+        f"{tmp_path.as_posix()}/tabla/",
+        partition_cols={'year': ['2022', '2023']},
+        last_modified_last_level=False,
+        categorical_partitions=True,
+        partition_types={'year': 'int64'},
+        max_workers=2,
+    )
+
+    assert df['foo_id'].to_list() == [0, 1, 2, 0, 1]
+    assert df['year'].dtype == 'category'
+    assert df['year'].cat.categories.to_list() == [2022, 2023]
+    assert df['year'].to_list() == [2022, 2022, 2022, 2023, 2023]
+
+
+def test_read_csv_with_partition_with_pyarrow_engine_should_concat_arrow_tables(dl_account: Datalake, tmp_path):
+    """Test read_csv_with_partition con el lector de pyarrow."""
+    for year, filas in [('2022', 3), ('2023', 2)]:
+        (tmp_path / "tabla" / f"year={year}").mkdir(parents=True)
+        pd.DataFrame({"foo_id": range(filas), "foo_str": "a"}).to_csv(
+            tmp_path / "tabla" / f"year={year}" / "file.csv", index=False, sep=";"
+        )
+    dl_account.fs = LocalFileSystem()
+    kwargs = dict(
+        partition_cols={'year': ['2022', '2023']}, last_modified_last_level=False, sep=";", usecols=["foo_id"]
+    )
+
+    table = dl_account.read_csv_with_partition(
+        f"{tmp_path.as_posix()}/tabla/", csv_engine="pyarrow", as_arrow=True, max_workers=2, **kwargs
+    )
+    df = dl_account.read_csv_with_partition(
+        f"{tmp_path.as_posix()}/tabla/", csv_engine="pyarrow", partition_types={'year': 'int64'}, **kwargs
+    )
+
+    assert table.column_names == ["foo_id", "year"]
+    assert table.schema.field("year").type == pa.dictionary(pa.int32(), pa.string())
+    assert table.column("year").to_pylist() == ['2022', '2022', '2022', '2023', '2023']
+    assert df['foo_id'].to_list() == [0, 1, 2, 0, 1]
+    assert df['year'].to_list() == [2022, 2022, 2022, 2023, 2023]
+
+
+def test_read_csv_with_partition_with_pyarrow_engine_should_raise_unsupported_kwargs(dl_account: Datalake):
+    """Test read_csv_with_partition con argumentos de pandas no soportados por pyarrow."""
+    with pytest.raises(ValueError):
+        dl_account.read_csv_with_partition("contenedor/tabla/", csv_engine="pyarrow", dtype={"foo_id": int})
+    with pytest.raises(ValueError):
+        dl_account.read_csv_with_partition("contenedor/tabla/", as_arrow=True)
+
+
+def test_read_csv_with_partition_with_checkpoint_should_read_only_new_files(dl_account: Datalake):
+    """Test read_csv_with_partition incremental con checkpoint."""
+    dl_account.fs = FsMemoria()
+    for day in ['1', '2']:
+        dl_account.fs.pipe(f"contenedor/tabla/day={day}/file.csv", b"foo_id\n1\n")
+    kwargs = dict(last_modified_last_level=False, checkpoint="contenedor/checkpoints/tabla.json")
+
+    df = dl_account.read_csv_with_partition("contenedor/tabla/", **kwargs)
+    assert sorted(df['day'].to_list()) == ['1', '2']
+    assert not dl_account.fs.exists("contenedor/checkpoints/tabla.json")
+    watermark = dl_account.commit_checkpoint("contenedor/checkpoints/tabla.json", df)
+    assert watermark == df.attrs["watermark"]
+    checkpoint = dl_account.fs.cat("contenedor/checkpoints/tabla.json")
+    assert checkpoint == f'{{"watermark": "{watermark.isoformat()}"}}'.encode()
+
+    df = dl_account.read_csv_with_partition("contenedor/tabla/", **kwargs)
+    assert df.empty
+    assert df.attrs["watermark"] == watermark
+
+    dl_account.fs.pipe("contenedor/tabla/day=3/file.csv", b"foo_id\n1\n")
+    df = dl_account.read_csv_with_partition("contenedor/tabla/", **kwargs)
+    assert df['day'].to_list() == ['3']
+    assert df.attrs["watermark"] > watermark
+
+
+def test_read_csv_with_partition_with_checkpoint_should_read_again_if_processing_fails(dl_account: Datalake):
+    """Test read_csv_with_partition con checkpoint cuando el procesamiento falla antes de commit_checkpoint."""
+    dl_account.fs = FsMemoria()
+    checkpoint = "contenedor/checkpoints/tabla.json"
+    dl_account.fs.pipe("contenedor/tabla/day=1/file.csv", b"foo_id\n1\n")
+    dl_account.commit_checkpoint(checkpoint, datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc))
+    dl_account.fs.pipe("contenedor/tabla/day=2/file.csv", b"foo_id\n1\n")
+
+    def procesar(df):
+        raise RuntimeError("fallo en el procesamiento")
+
+    kwargs = dict(last_modified_last_level=False, checkpoint=checkpoint)
+    with pytest.raises(RuntimeError):
+        df = dl_account.read_csv_with_partition("contenedor/tabla/", **kwargs)
+        procesar(df)
+        dl_account.commit_checkpoint(checkpoint, df)
+
+    df = dl_account.read_csv_with_partition("contenedor/tabla/", **kwargs)
+    assert sorted(df['day'].to_list()) == ['1', '2']
+
+
+def test_commit_checkpoint_should_accept_arrow_table(dl_account: Datalake):
+    """Test commit_checkpoint con el resultado de una lectura como tabla de Arrow."""
+    dl_account.fs = FsMemoria()
+    dl_account.fs.pipe("contenedor/tabla/day=1/file.csv", b"foo_id\n1\n")
+    tabla = dl_account.read_csv_with_partition(
+        "contenedor/tabla/", last_modified_last_level=False, as_arrow=True, csv_engine="pyarrow"
+    )
+    watermark = dl_account.commit_checkpoint("contenedor/checkpoints/tabla.json", tabla)
+    assert watermark.isoformat().encode() == tabla.schema.metadata[b"watermark"]
+    assert dl_account.commit_checkpoint("contenedor/checkpoints/vacio.json", pd.DataFrame()) is None
+    assert not dl_account.fs.exists("contenedor/checkpoints/vacio.json")
+
+
+def test_write_csv_with_partition_should_write_hive_layout(dl_account: Datalake):
+    """Test write_csv_with_partition y lectura con read_csv_with_partition."""
+    dl_account.fs = FsMemoria()
+    df = pd.DataFrame({"year": [2022, 2023, 2022, 2023], "month": ["1", "1", "2", "1"], "foo_id": [1, 2, 3, 4]})
+
+    rutas = dl_account.write_csv_with_partition(df, "contenedor/tabla/", ["year", "month"], index=False, max_workers=2)
+
+    assert rutas == [
+        "contenedor/tabla/year=2022/month=1/part-0.csv",
+        "contenedor/tabla/year=2022/month=2/part-0.csv",
+        "contenedor/tabla/year=2023/month=1/part-0.csv",
+    ]
+    assert dl_account.fs.cat(rutas[2]) == b"foo_id\n2\n4\n"
+    leido = dl_account.read_csv_with_partition("contenedor/tabla/", last_modified_last_level=False)
+    leido = leido.astype({"year": "int64"}).sort_values("foo_id", ignore_index=True)
+    pd.testing.assert_frame_equal(leido[df.columns], df)
+
+
+@pytest.mark.parametrize("csv_engine", ["pandas", "pyarrow"])
+@pytest.mark.parametrize("categorical_partitions", [True, False])
+def test_write_csv_with_partition_should_read_null_partitions(
+    dl_account: Datalake, csv_engine: str, categorical_partitions: bool
+):
+    """Test que las particiones nulas escritas por write_csv_with_partition se leen como nulos."""
+    dl_account.fs = FsMemoria()
+    df = pd.DataFrame({"year": ["2022", None, "2023"], "foo_id": [1, 2, 3]})
+    dl_account.write_csv_with_partition(df, "contenedor/tabla/", ["year"], index=False)
+
+    leido = dl_account.read_csv_with_partition(
+        "contenedor/tabla/",
+        last_modified_last_level=False,
+        csv_engine=csv_engine,
+        categorical_partitions=categorical_partitions,
+    )
+
+    years = leido.set_index("foo_id")["year"]
+    assert years[1] == "2022" and years[3] == "2023"
+    assert pd.isna(years[2])
+
+
+@pytest.mark.parametrize("cache", [False, True])
+def test_read_csv_with_pattern_should_read_first_match(dl_account: Datalake, tmp_path, cache: bool):
+    """Test read_csv con un patrón lee el primer archivo que lo cumple, como `fsspec.open`."""
+    dl_account.fs = FsMemoria()
+    dl_account.fs.pipe("c/a/x_2.csv", b"foo_id\n2\n")
+    dl_account.fs.pipe("c/a/x_1.csv", b"foo_id\n1\n")
+    if cache:
+        dl_account.disk_cache = BlobDiskCache(str(tmp_path))
+
+    assert dl_account.read_csv("c/a/x_*.csv")["foo_id"].to_list() == [1]
+    with pytest.raises(ArchivoNoEncontrado):
+        dl_account.read_csv("c/a/y_*.csv")
+
+
+def test_read_csv_with_partition_should_see_new_files_between_reads(dl_account: Datalake):
+    """Test una segunda lectura con el filesystem compartido ve los archivos nuevos."""
+    listados = {k: v for k, v in DEFAULT_FILESYSTEM_OPTIONS.items() if k == "use_listings_cache"}
+    dl_account.fs = FsMemoriaConListados(**listados)
+    dl_account.fs.pipe("contenedor/tabla/year=2022/part-0.csv", b"foo_id\n1\n")
+    primero = dl_account.read_csv_with_partition("contenedor/tabla/", last_modified_last_level=False)
+
+    dl_account.fs.pipe("contenedor/tabla/year=2023/part-0.csv", b"foo_id\n2\n")
+    segundo = dl_account.read_csv_with_partition("contenedor/tabla/", last_modified_last_level=False)
+
+    assert primero["foo_id"].to_list() == [1]
+    assert sorted(segundo["foo_id"]) == [1, 2]
+
+
+def test_write_parquet_with_partition_should_write_hive_layout(dl_account: Datalake):
+    """Test write_parquet_with_partition y lectura con read_parquet_with_partition."""
+    dl_account.fs = FsMemoria()
+    df = pd.DataFrame({"year": ["2022", None, "2022"], "foo_id": [1, 2, 3]})
+
+    rutas = dl_account.write_parquet_with_partition(df, "contenedor/tabla/", ["year"], index=False)
+
+    assert rutas == [
+        "contenedor/tabla/year=2022/part-0.parquet",
+        "contenedor/tabla/year=__HIVE_DEFAULT_PARTITION__/part-0.parquet",
+    ]
+    leido = dl_account.read_parquet_with_partition("contenedor/tabla/").sort_values("foo_id", ignore_index=True)
+    assert leido["year"].dtype == 'category'
+    assert leido["year"].astype(object).where(leido["year"].notna(), None).tolist() == ["2022", None, "2022"]
+    with pytest.raises(ValueError):
+        dl_account.write_parquet_with_partition(pd.DataFrame({"year": ["a/b"]}), "contenedor/tabla/", ["year"])
+
+
+def test_read_parquet_with_partition_with_partition_cols_should_read_every_part(dl_account: Datalake):
+    """Test read_parquet_with_partition con partition_cols lee todos los archivos de cada partición."""
+    dl_account.fs = FsMemoria()
+    dl_account.fs.pipe("contenedor/tabla/year=2022/_committed_123", b"{}")
+    for i in range(2):
+        with dl_account.fs.open(f"contenedor/tabla/year=2022/part-{i}.parquet", "wb") as f:
+            pd.DataFrame({"foo_id": [i]}).to_parquet(f, index=False)
+
+    df = dl_account.read_parquet_with_partition("contenedor/tabla/", partition_cols={"year": ["2022"]})
+
+    assert sorted(df["foo_id"]) == [0, 1]
+    assert set(df["year"]) == {"2022"}
+
+
+def test_read_parquet_with_partition_with_null_partition_should_read_categorical(dl_account: Datalake):
+    """Test read_parquet_with_partition con una partición nula y los argumentos por defecto."""
+    dl_account.fs = FsMemoria()
+    for year, foo_id in [("2022", 1), ("__HIVE_DEFAULT_PARTITION__", 2), ("2023", 3)]:
+        with dl_account.fs.open(f"contenedor/tabla/year={year}/part-0.parquet", "wb") as f:
+            pd.DataFrame({"foo_id": [foo_id]}).to_parquet(f, index=False)
+
+    df = dl_account.read_parquet_with_partition("contenedor/tabla/")
+
+    assert df["year"].dtype == 'category'
+    years = df.set_index("foo_id")["year"]
+    assert years[1] == "2022" and years[3] == "2023"
+    assert pd.isna(years[2])
+
+
+def test_limpiar_df_cols_str_should_not_modify_original(dl_account: Datalake, test_str_df: pd.DataFrame):
+    """Test para limpiar el DF sin modificar el original."""
+    original = test_str_df.copy()
+    dl_account._limpiar_df_cols_str(test_str_df, ',')
+    pd.testing.assert_frame_equal(test_str_df, original)
+
+
+def test_limpiar_df_cols_str_should_clean_inplace(dl_account: Datalake, test_str_df: pd.DataFrame):
+    """Test para limpiar el DF inplace."""
+    df_clean = dl_account._limpiar_df_cols_str(test_str_df, ',', inplace=True)
+    assert df_clean is test_str_df
+    assert test_str_df['foo_str'].values.tolist() == ['bar ', 'foo ', 'bar|']
+
+
+def test_limpiar_df_cols_str_should_keep_non_string_values(dl_account: Datalake):
+    """Test para limpiar columnas object con valores que no son string."""
+    df = pd.DataFrame({"mixta": ['a\nb', 1, None], "enteros": pd.Series([1, 2, 3], dtype=object)})
+    df_clean = dl_account._limpiar_df_cols_str(df, ',')
+    assert df_clean['mixta'].values.tolist() == ['a b', 1, None]
+    assert df_clean['enteros'].values.tolist() == [1, 2, 3]
+
+
+class ArchivoFalso:
+    """Archivo en memoria que registra si el blob fue confirmado al cerrar."""
+
+    def __init__(self):
+        """Constructor."""
+        self.data = b""
+        self.forced = False
+        self.committed = None
+
+    def write(self, data: bytes):
+        """Escribir al buffer."""
+        self.data += data
+
+    def close(self):
+        """Confirmar si no fue marcado como `forced`."""
+        self.committed = not self.forced
+
+
+def test_write_csv_with_chunksize_should_write_blocks(dl_account: Datalake, test_str_df):
+    """Test write_csv por bloques."""
+    archivo = ArchivoFalso()
+    dl_account.fs = Mock()
+    dl_account.fs.open.return_value = archivo
+
+    dl_account.write_csv(test_str_df, "contenedor/file.csv", chunksize=2, index=False)
+
+    assert archivo.committed
+    esperado = dl_account._limpiar_df_cols_str(test_str_df).to_csv(index=False).encode()
+    assert archivo.data == esperado
+    dl_account.fs.open.assert_called_once_with("contenedor/file.csv", "wb")
+
+
+def test_write_csv_with_iterator_should_not_commit_on_error(dl_account: Datalake, test_df):
+    """Test write_csv con un iterador que falla."""
+    archivo = ArchivoFalso()
+    dl_account.fs = Mock()
+    dl_account.fs.open.return_value = archivo
+
+    def chunks():
+        yield test_df
+        raise ValueError("error en el productor")
+
+    with pytest.raises(ValueError):
+        dl_account.write_csv(chunks(), "contenedor/file.csv", index=False)
+
+    assert archivo.committed is False
+
+
+def test_read_excel_sheets_should_download_once(dl_account: Datalake):
+    """Test read_excel_sheets con una sola descarga."""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for i in range(3):
+            pd.DataFrame({"hoja": [i, i]}).to_excel(writer, sheet_name=f"hoja_{i}", index=False)
+    dl_account.fs = Mock()
+    dl_account.fs.cat_file.return_value = buffer.getvalue()
+
+    dfs = dl_account.read_excel_sheets("contenedor/libro.xlsx", ["hoja_2", "hoja_0"])
+    todas = dl_account.read_excel_sheets("contenedor/libro.xlsx")
+
+    assert list(dfs) == ["hoja_2", "hoja_0"]
+    assert dfs["hoja_2"]["hoja"].to_list() == [2, 2]
+    assert list(todas) == ["hoja_0", "hoja_1", "hoja_2"]
+    assert dl_account.fs.cat_file.call_count == 2
+
+
+def test_write_and_read_should_use_datalake_filesystem(dl_account: Datalake, test_df: pd.DataFrame, tmp_path):
+    """Test escritura y lectura a traves del filesystem del datalake."""
+    dl_account.fs = LocalFileSystem()
+    ruta = tmp_path.as_posix()
+
+    dl_account.write_csv(test_df, f"{ruta}/file.csv", index=False)
+    dl_account.write_json(test_df, f"{ruta}/file.json")
+    dl_account.write_parquet(test_df, f"{ruta}/file.parquet")
+
+    pd.testing.assert_frame_equal(dl_account.read_csv(f"{ruta}/file.csv"), test_df)
+    pd.testing.assert_frame_equal(dl_account.read_json(f"{ruta}/file.json"), test_df)
+    pd.testing.assert_frame_equal(dl_account.read_parquet(f"{ruta}/file.parquet"), test_df)
+
+
+@pytest.mark.parametrize("sufijo", [".gz", ".bz2", ".xz", ".zst"])
+def test_write_and_read_compressed_should_roundtrip(dl_account: Datalake, test_df: pd.DataFrame, tmp_path, sufijo):
+    """Test escritura y lectura de archivos comprimidos."""
+    dl_account.fs = LocalFileSystem()
+    ruta = tmp_path.as_posix()
+
+    dl_account.write_csv(test_df, f"{ruta}/file.csv{sufijo}", index=False)
+    dl_account.write_csv(test_df, f"{ruta}/bloques.csv{sufijo}", index=False, chunksize=2)
+    dl_account.write_json(test_df, f"{ruta}/file.json{sufijo}")
+
+    pd.testing.assert_frame_equal(dl_account.read_csv(f"{ruta}/file.csv{sufijo}"), test_df)
+    pd.testing.assert_frame_equal(dl_account.read_csv(f"{ruta}/bloques.csv{sufijo}"), test_df)
+    pd.testing.assert_frame_equal(dl_account.read_json(f"{ruta}/file.json{sufijo}"), test_df)
+    pd.testing.assert_frame_equal(pd.concat(dl_account.iter_csv(f"{ruta}/file.csv{sufijo}", chunksize=2)), test_df)
+    with pytest.raises(ExtensionIncorrecta):
+        dl_account.write_excel(test_df, f"{ruta}/file.xlsx{sufijo}")
+
+
+def test_write_csv_compressed_with_iterator_should_not_commit_on_error(dl_account: Datalake, test_df):
+    """Test write_csv comprimido con un iterador que falla."""
+    archivo = ArchivoFalso()
+    dl_account.fs = Mock()
+    dl_account.fs.open.return_value = archivo
+
+    def chunks():
+        yield test_df
+        raise ValueError("error en el productor")
+
+    with pytest.raises(ValueError):
+        dl_account.write_csv(chunks(), "contenedor/file.csv.gz", index=False)
+
+    assert archivo.committed is False
+
+
+def test_peek_csv_should_read_single_range(dl_account: Datalake):
+    """Test peek_csv con una sola solicitud por rango."""
+    dl_account.fs = Mock()
+    dl_account.fs.cat_file.return_value = b"foo,bar\n1,a\n2,b\n3,"
+
+    df = dl_account.peek_csv("contenedor/file.csv", nbytes=18)
+
+    dl_account.fs.cat_file.assert_called_once_with("contenedor/file.csv", start=0, end=18)
+    assert df.to_dict("list") == {"foo": [1, 2], "bar": ["a", "b"]}
+
+
+def test_peek_csv_should_decompress_truncated_file(dl_account: Datalake):
+    """Test peek_csv con el inicio de un archivo comprimido."""
+    data = gzip.compress(b"foo\n" + b"".join(f"{i}\n".encode() for i in range(100_000)))
+    dl_account.fs = Mock()
+    dl_account.fs.cat_file.return_value = data[:1000]
+
+    df = dl_account.peek_csv("contenedor/file.csv.gz", nbytes=1000)
+
+    assert len(df) > 0
+    assert df["foo"].to_list() == list(range(len(df)))
+
+
+def test_read_strategies_should_set_open_arguments_per_format(test_df: pd.DataFrame, tmp_path):
+    """Test estrategias de lectura por formato."""
+    dl = Datalake.from_account_key("name", "key", read_strategies={"csv": {"block_size": 1024}})
+    dl.fs = Mock(wraps=LocalFileSystem())
+    ruta = tmp_path.as_posix()
+    test_df.to_csv(f"{ruta}/file.csv", index=False)
+    test_df.to_parquet(f"{ruta}/file.parquet")
+
+    dl.read_csv(f"{ruta}/file.csv")
+    assert dl.fs.open.call_args.kwargs == {"block_size": 1024}
+    dl.read_csv(f"{ruta}/file.csv", nrows=1)
+    assert dl.fs.open.call_args.kwargs == {"block_size": 2**18, "cache_type": "none"}
+    df = dl.read_parquet(f"{ruta}/file.parquet", columns=["foo_id"])
+    pd.testing.assert_frame_equal(df, test_df[["foo_id"]])
+
+    with pytest.raises(ValueError):
+        Datalake.from_account_key("name", "key", read_strategies={"xml": {}})
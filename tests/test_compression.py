@@ -0,0 +1,70 @@
+"""Suite de test para la lectura y escritura de archivos comprimidos."""
+
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import gzip
+import io
+
+import pytest
+
+from azure_datalake_utils.compression import (
+    ArchivoComprimido,
+    abrir_comprimido,
+    comprimir,
+    inferir_compresion,
+    sin_compresion,
+)
+
+DATA = b"foo,bar\n" + b"".join(f"{i},valor_{i}\n".encode() for i in range(10_000))
+
+
+def test_inferir_compresion_should_use_suffix():
+    """Test codec según el sufijo de la ruta."""
+    assert inferir_compresion("contenedor/file.csv.gz") == "gzip"
+    assert inferir_compresion("contenedor/file.json.zst") == "zstd"
+    assert inferir_compresion("contenedor/file.csv") is None
+    assert sin_compresion("contenedor/file.csv.bz2") == "contenedor/file.csv"
+    assert sin_compresion("contenedor/file.csv") == "contenedor/file.csv"
+
+
+@pytest.mark.parametrize("sufijo", [".gz", ".bz2", ".xz", ".zst"])
+def test_abrir_comprimido_should_roundtrip(sufijo):
+    """Test escritura y lectura por bloques con cada codec."""
+    buffer = io.BytesIO()
+    with abrir_comprimido(buffer, f"file.csv{sufijo}", "wb") as f:
+        for i in range(0, len(DATA), 4096):
+            f.write(DATA[i : i + 4096])
+    assert buffer.closed
+
+    data = comprimir(DATA, f"file.csv{sufijo}")
+    assert len(data) < len(DATA)
+    with abrir_comprimido(io.BytesIO(data), f"file.csv{sufijo}") as f:
+        partes = iter(lambda: f.read(1000), b"")
+        assert b"".join(partes) == DATA
+
+
+def test_abrir_comprimido_without_suffix_should_return_same_file():
+    """Test archivos sin sufijo de compresión."""
+    buffer = io.BytesIO()
+    assert abrir_comprimido(buffer, "file.csv") is buffer
+    assert comprimir(DATA, "file.csv") is DATA
+
+
+def test_archivo_comprimido_should_read_gzip_from_other_tools():
+    """Test lectura de un gzip generado con la libreria estandar."""
+    with ArchivoComprimido(io.BytesIO(gzip.compress(DATA)), "gzip") as f:
+        assert f.read() == DATA
@@ -0,0 +1,44 @@
+"""Tests for `azure_datalake_utils.concurrency` package."""
+import threading
+import time
+
+import pytest
+
+from azure_datalake_utils.concurrency import map_ordenado
+
+
+def test_map_ordenado_should_keep_order():
+    """Test para verificar que el orden se conserva."""
+    resultado = map_ordenado(lambda x: (time.sleep(0.01 * (5 - x)), x)[1], range(5), max_workers=5)
+    assert resultado == [0, 1, 2, 3, 4]
+
+
+def test_map_ordenado_should_limit_workers():
+    """Test para verificar que no se superan max_workers tareas simultaneas."""
+    lock = threading.Lock()
+    en_vuelo = []
+    maximo = []
+
+    def tarea(x):
+        with lock:
+            en_vuelo.append(x)
+            maximo.append(len(en_vuelo))
+        time.sleep(0.01)
+        with lock:
+            en_vuelo.remove(x)
+        return x
+
+    map_ordenado(tarea, range(20), max_workers=3)
+    assert max(maximo) <= 3
+
+
+def test_map_ordenado_should_raise_first_error():
+    """Test para verificar que la excepción se propaga."""
+
+    def tarea(x):
+        if x == 2:
+            raise ValueError(x)
+        return x
+
+    with pytest.raises(ValueError):
+        map_ordenado(tarea, range(5), max_workers=2)
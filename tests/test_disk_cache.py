@@ -0,0 +1,110 @@
+"""Tests for `azure_datalake_utils.disk_cache` package."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import os
+from typing import Dict
+from unittest.mock import Mock
+
+import pandas as pd
+
+from azure_datalake_utils import BlobDiskCache, Datalake
+
+
+def fs_falso(blobs: Dict[str, bytes], etags: Dict[str, str]) -> Mock:
+    """Filesystem simulado con `info` y `get_file`.
+
+    Como `adlfs`, `info` responde desde el cache de listados excepto con `refresh=True`.
+    """
+    fs = Mock()
+    listados = {}
+
+    def info(ruta, refresh=False):
+        if refresh or ruta not in listados:
+            listados[ruta] = {'name': ruta, 'etag': etags[ruta], 'size': len(blobs[ruta])}
+        return listados[ruta]
+
+    fs.info.side_effect = info
+
+    def get_file(ruta, local):
+        with open(local, "wb") as f:
+            f.write(blobs[ruta])
+
+    fs.get_file.side_effect = get_file
+    return fs
+
+
+def test_blob_disk_cache_should_download_once_per_etag(tmp_path):
+    """Solo se descarga de nuevo cuando cambia el etag."""
+    blobs = {"contenedor/a.csv": b"foo\n1\n"}
+    etags = {"contenedor/a.csv": "v1"}
+    fs = fs_falso(blobs, etags)
+    cache = BlobDiskCache(str(tmp_path))
+
+    primero = cache.get(fs, "contenedor/a.csv")
+    segundo = cache.get(fs, "contenedor/a.csv")
+    assert primero == segundo
+    assert fs.get_file.call_count == 1
+
+    blobs["contenedor/a.csv"] = b"foo\n2\n"
+    etags["contenedor/a.csv"] = "v2"
+    with cache.open(fs, "contenedor/a.csv") as f:
+        assert f.read() == b"foo\n2\n"
+    assert fs.get_file.call_count == 2
+
+
+def test_blob_disk_cache_should_return_overwritten_blob(tmp_path):
+    """Un blob sobrescrito se descarga de nuevo aunque el cache de listados tenga el etag anterior."""
+    blobs = {"contenedor/a.csv": b"foo\n1\n"}
+    etags = {"contenedor/a.csv": "v1"}
+    fs = fs_falso(blobs, etags)
+    cache = BlobDiskCache(str(tmp_path))
+    fs.info("contenedor/a.csv")
+    with cache.open(fs, "contenedor/a.csv") as f:
+        assert f.read() == b"foo\n1\n"
+
+    blobs["contenedor/a.csv"] = b"foo\n22\n"
+    etags["contenedor/a.csv"] = "v2"
+
+    with cache.open(fs, "contenedor/a.csv") as f:
+        assert f.read() == b"foo\n22\n"
+
+
+def test_blob_disk_cache_should_evict_least_recently_used(tmp_path):
+    """Se eliminan los archivos usados hace más tiempo al superar max_bytes."""
+    blobs = {f"contenedor/{i}.csv": b"x" * 10 for i in range(3)}
+    fs = fs_falso(blobs, {k: "v1" for k in blobs})
+    cache = BlobDiskCache(str(tmp_path), max_bytes=25)
+
+    primero = cache.get(fs, "contenedor/0.csv")
+    os.utime(primero, (1, 1))
+    segundo = cache.get(fs, "contenedor/1.csv")
+    cache.get(fs, "contenedor/2.csv")
+
+    assert not os.path.exists(primero)
+    assert os.path.exists(segundo)
+    assert cache.size() == 20
+
+
+def test_read_csv_with_disk_cache_should_skip_download(tmp_path):
+    """read_csv con cache local no descarga archivos sin cambios."""
+    fs = fs_falso({"contenedor/a.csv": b"foo\n1\n2\n"}, {"contenedor/a.csv": "v1"})
+    dl = Datalake.from_account_key('name', 'key', disk_cache=BlobDiskCache(str(tmp_path)))
+    dl.fs = fs
+
+    pd.testing.assert_frame_equal(dl.read_csv("contenedor/a.csv"), pd.DataFrame({"foo": [1, 2]}))
+    pd.testing.assert_frame_equal(dl.read_csv("contenedor/a.csv"), pd.DataFrame({"foo": [1, 2]}))
+    assert fs.get_file.call_count == 1
@@ -0,0 +1,78 @@
+"""Tests for `azure_datalake_utils.experimental` package."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import asyncio
+import time
+from unittest.mock import Mock
+
+from azure.core.credentials import AccessToken
+
+from azure_datalake_utils.experimental import AioCredentialWrapper
+
+SCOPE = "https://storage.azure.com/.default"
+
+
+def credencial_falsa(duracion: int) -> Mock:
+    """Credencial sincrona lenta que retorna tokens con `duracion` segundos de vida."""
+    credential = Mock()
+
+    def get_token(*scopes, **kwargs):
+        time.sleep(0.05)
+        return AccessToken(f"token_{credential.get_token.call_count}", int(time.time()) + duracion)
+
+    credential.get_token.side_effect = get_token
+    return credential
+
+
+def test_aio_credential_wrapper_should_cache_token():
+    """El token se reutiliza mientras no este cerca de expirar."""
+    credential = credencial_falsa(3600)
+    wrapper = AioCredentialWrapper(credential)
+
+    async def main():
+        return [await wrapper.get_token(SCOPE) for _ in range(5)]
+
+    tokens = asyncio.run(main())
+    assert credential.get_token.call_count == 1
+    assert {t.token for t in tokens} == {"token_1"}
+
+
+def test_aio_credential_wrapper_should_collapse_concurrent_requests():
+    """Las solicitudes concurrentes esperan la misma renovación."""
+    credential = credencial_falsa(3600)
+    wrapper = AioCredentialWrapper(credential)
+
+    async def main():
+        return await asyncio.gather(*(wrapper.get_token(SCOPE) for _ in range(20)))
+
+    tokens = asyncio.run(main())
+    assert credential.get_token.call_count == 1
+    assert len(tokens) == 20
+
+
+def test_aio_credential_wrapper_should_refresh_before_expiration():
+    """Un token dentro del margen de renovación se vuelve a solicitar."""
+    credential = credencial_falsa(60)
+    wrapper = AioCredentialWrapper(credential, refresh_margin=300)
+
+    async def main():
+        await wrapper.get_token(SCOPE)
+        await wrapper.get_token(SCOPE)
+        await wrapper.get_token(SCOPE, claims="challenge")
+
+    asyncio.run(main())
+    assert credential.get_token.call_count == 3
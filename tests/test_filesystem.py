@@ -0,0 +1,101 @@
+"""Suite de test para el pool de filesystems."""
+
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from azure_datalake_utils import Datalake
+from azure_datalake_utils.filesystem import _pool, acquire_filesystem, release_filesystem
+
+
+@pytest.fixture
+def fs_class_mock():
+    """Reemplaza AzureBlobFileSystem y el cierre del cliente."""
+    fs_class = "azure_datalake_utils.filesystem.adlfs.AzureBlobFileSystem"
+    with patch(fs_class, side_effect=lambda **kwargs: Mock()) as mock, patch(
+        "azure_datalake_utils.filesystem.sync"
+    ) as sync_mock:
+        mock.sync_mock = sync_mock
+        yield mock
+    _pool.clear()
+
+
+def test_acquire_filesystem_should_share_instances(fs_class_mock: Mock):
+    """Test mismas opciones comparten filesystem."""
+    fs_1 = acquire_filesystem({'account_name': 'name', 'account_key': 'key'})
+    fs_2 = acquire_filesystem({'account_key': 'key', 'account_name': 'name'})
+    fs_3 = acquire_filesystem({'account_name': 'otra', 'account_key': 'key'})
+
+    assert fs_1 is fs_2
+    assert fs_1 is not fs_3
+    assert fs_class_mock.call_count == 2
+    assert fs_class_mock.call_args.kwargs['skip_instance_cache']
+
+
+def test_release_filesystem_should_close_last_reference(fs_class_mock: Mock):
+    """Test el cliente se cierra cuando no quedan referencias."""
+    opciones = {'account_name': 'name', 'account_key': 'key'}
+    fs = acquire_filesystem(opciones)
+    acquire_filesystem(opciones)
+
+    release_filesystem(fs)
+    fs_class_mock.sync_mock.assert_not_called()
+    release_filesystem(fs)
+    fs_class_mock.sync_mock.assert_called_once()
+    assert acquire_filesystem(opciones) is not fs
+
+
+def test_datalake_should_share_filesystem_and_release_on_close(fs_class_mock: Mock):
+    """Test instancias de Datalake comparten el filesystem de forma perezosa."""
+    dl_1 = Datalake.from_account_key('name', 'key')
+    with Datalake.from_account_key('name', 'key') as dl_2:
+        fs_class_mock.assert_not_called()
+        assert dl_1.fs is dl_2.fs
+    assert dl_2._fs is None
+    fs_class_mock.sync_mock.assert_not_called()
+
+    dl_1.close()
+    fs_class_mock.sync_mock.assert_called_once()
+    assert fs_class_mock.call_args.kwargs['max_concurrency'] == 8
+
+
+def test_datalake_without_fsspec_cache_should_disable_listings_cache(fs_class_mock: Mock):
+    """Test fsspec_cache=False no usa el cache de listados."""
+    dl = Datalake.from_account_key('name', 'key', fsspec_cache=False, filesystem_options={'max_concurrency': 2})
+    dl.fs
+    kwargs = fs_class_mock.call_args.kwargs
+    assert not kwargs['use_listings_cache']
+    assert kwargs['default_cache_type'] is None
+    assert kwargs['max_concurrency'] == 2
+
+
+def test_datalake_fs_should_acquire_once_with_concurrent_access(fs_class_mock: Mock):
+    """Test el primer acceso simultaneo a `fs` solo toma una referencia del pool."""
+    fs_class_mock.side_effect = lambda **kwargs: time.sleep(0.05) or Mock()
+    dl = Datalake.from_account_key('name', 'key')
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        filesystems = list(executor.map(lambda _: dl.fs, range(4)))
+
+    assert all(fs is filesystems[0] for fs in filesystems)
+    fs_class_mock.assert_called_once()
+    dl.close()
+    fs_class_mock.sync_mock.assert_called_once()
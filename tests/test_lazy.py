@@ -0,0 +1,68 @@
+"""Suite de test para la importación diferida."""
+
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import json
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import azure_datalake_utils
+from azure_datalake_utils._lazy import lazy_import
+
+PESADOS = ['pandas', 'numpy', 'pyarrow', 'azure.identity', 'adlfs', 'azure.storage.blob']
+
+
+def modulos_cargados(codigo: str):
+    """Ejecuta `codigo` en un proceso nuevo y retorna cuales modulos pesados quedaron cargados."""
+    script = f"import json, sys\n{codigo}\nprint(json.dumps([m for m in {PESADOS!r} if m in sys.modules]))"
+    salida = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    return json.loads(salida)
+
+
+def test_import_package_should_not_load_dependencies():
+    """Test `import azure_datalake_utils` no carga dependencias."""
+    assert modulos_cargados("import azure_datalake_utils") == []
+
+
+def test_import_datalake_should_not_load_pandas():
+    """Test importar y crear `Datalake` no carga pandas, numpy, pyarrow, azure.identity, adlfs ni azure.storage.blob."""
+    assert modulos_cargados("from azure_datalake_utils import Datalake\nDatalake.from_account_key('a', 'b')") == []
+
+
+def test_package_getattr_should_export_classes():
+    """Test las clases exportadas se resuelven en el primer acceso."""
+    from azure_datalake_utils.azure_datalake_utils import Datalake
+
+    assert azure_datalake_utils.Datalake is Datalake
+    assert 'AsyncDatalake' in dir(azure_datalake_utils)
+    with pytest.raises(AttributeError):
+        azure_datalake_utils.NoExiste
+
+
+def test_lazy_module_should_forward_patch_to_module():
+    """Test patch sobre un modulo diferido modifica el modulo real."""
+    import json as json_real
+
+    modulo = lazy_import("json")
+    original = json_real.dumps
+    with patch.object(modulo, "dumps", return_value="parcheado"):
+        assert json_real.dumps({}) == "parcheado"
+        assert modulo.dumps({}) == "parcheado"
+    assert json_real.dumps is original
@@ -0,0 +1,112 @@
+"""Tests for `azure_datalake_utils.manifest` package."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import datetime
+from typing import Dict
+
+import pytest
+
+from azure_datalake_utils.manifest import PartitionManifestCache
+from azure_datalake_utils.partitions import HivePartitiion
+
+RUTA = "contenedor/tabla/"
+
+
+def fecha(dia: int) -> datetime.datetime:
+    """Fecha para los tests."""
+    return datetime.datetime(2022, 1, dia, tzinfo=datetime.timezone.utc)
+
+
+def archivo(dia: int) -> Dict:
+    """Info de un archivo modificado en `dia`."""
+    return {'last_modified': fecha(dia), 'etag': 'x'}
+
+
+def tabla() -> Dict[str, Dict]:
+    """Tabla con particiones year/month."""
+    return {f"{RUTA}year=2022/month={m}/archivo.csv": archivo(m) for m in range(1, 4)}
+
+
+def test_manifest_cache_should_avoid_listing_within_ttl(fs_mock, ls_from_files):
+    """Dentro del TTL no se vuelve a listar la tabla."""
+    fs_mock.ls.side_effect = ls_from_files(tabla())
+    cache = PartitionManifestCache(ttl=300)
+
+    primero = HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=cache)
+    llamados = fs_mock.ls.call_count
+    segundo = HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=cache)
+
+    assert llamados == 5
+    assert fs_mock.ls.call_count == llamados
+    assert primero.partition_files == segundo.partition_files
+
+
+def test_manifest_cache_should_only_relist_changed_leaf_folders(fs_mock, ls_from_files):
+    """Con el TTL expirado solo se listan las carpetas intermedias y las hojas modificadas."""
+    files = tabla()
+    fs_mock.ls.side_effect = ls_from_files(files)
+    cache = PartitionManifestCache(ttl=0)
+    HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=cache)
+
+    fs_mock.ls.reset_mock()
+    files[f"{RUTA}year=2022/month=2/archivo.csv"] = archivo(10)
+    hive = HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=cache)
+
+    listed = sorted(call.args[0] for call in fs_mock.ls.call_args_list)
+    assert listed == [RUTA, f"{RUTA}year=2022/", f"{RUTA}year=2022/month=2/"]
+    assert len(hive.partition_files) == 3
+    assert cache.get(f"None/{RUTA}")['watermark'] == fecha(10)
+
+
+@pytest.mark.parametrize("leaf_ttl, esperado", [(0, fecha(10)), (None, fecha(2))])
+def test_manifest_cache_should_relist_overwritten_leaf_folders_after_leaf_ttl(
+    fs_mock, ls_from_files, leaf_ttl, esperado
+):
+    """Un archivo sobrescrito no cambia el last_modified de su carpeta, se ve al vencer `leaf_ttl`."""
+    files = tabla()
+    listado = ls_from_files(files)
+    carpetas = {}
+
+    def ls(path, detail=True):
+        entries = listado(path, detail)
+        for entry in entries:
+            if entry['type'] == 'directory':
+                entry['last_modified'] = carpetas.setdefault(entry['name'], entry['last_modified'])
+        return entries
+
+    fs_mock.ls.side_effect = ls
+    cache = PartitionManifestCache(ttl=0, leaf_ttl=leaf_ttl)
+    HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=cache)
+
+    files[f"{RUTA}year=2022/month=2/archivo.csv"] = archivo(10)
+    hive = HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=cache)
+
+    index = hive.get_partition_index().to_pydict()
+    assert dict(zip(index["month"], index["last_modified"]))["2"] == esperado
+
+
+def test_manifest_cache_should_persist_to_disk(fs_mock, ls_from_files, tmp_path):
+    """El manifiesto se puede leer desde disco en otro proceso."""
+    fs_mock.ls.side_effect = ls_from_files(tabla())
+    primero = HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=PartitionManifestCache(directory=str(tmp_path)))
+
+    fs_mock.ls.reset_mock()
+    segundo = HivePartitiion(ruta=RUTA, fs=fs_mock, manifest_cache=PartitionManifestCache(directory=str(tmp_path)))
+
+    fs_mock.ls.assert_not_called()
+    assert primero.partition_files == segundo.partition_files
+    assert len(list(tmp_path.glob("*.json"))) == 1
@@ -0,0 +1,99 @@
+"""Suite de test para las metricas de I/O."""
+
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+
+import pandas as pd
+import pytest
+from fsspec.implementations.local import LocalFileSystem
+from fsspec.implementations.memory import MemoryFileSystem
+
+from azure_datalake_utils import Datalake, IOMetrics
+from azure_datalake_utils.concurrency import map_ordenado
+from azure_datalake_utils.metrics import NULL_METRICS, log_operation
+
+
+def test_null_metrics_should_not_wrap_files():
+    """Test las metricas deshabilitadas no modifican los archivos."""
+    archivo = object()
+    assert NULL_METRICS.wrap(archivo) is archivo
+    with NULL_METRICS.operation("op"), NULL_METRICS.timer("etapa"):
+        NULL_METRICS.increment("contador")
+
+
+def test_io_metrics_should_group_nested_operations_and_threads():
+    """Test las operaciones anidadas y los hilos se registran en la operación externa."""
+    registros = []
+    metrics = IOMetrics(callbacks=[registros.append])
+
+    with metrics.operation("externa"):
+        with metrics.operation("interna"), metrics.timer("list"):
+            metrics.increment("list_calls")
+        map_ordenado(lambda _: metrics.increment("blobs_read"), range(4), max_workers=2)
+    metrics.increment("list_calls")
+
+    assert [r["operation"] for r in registros] == ["externa"]
+    assert registros[0]["counters"] == {"list_calls": 1, "blobs_read": 4}
+    assert "list" in registros[0]["stages"]
+    assert not registros[0]["error"]
+    assert metrics.snapshot()["counters"] == {"list_calls": 2, "blobs_read": 4}
+    assert metrics.snapshot()["operations"] == {"externa": 1}
+
+
+def test_io_metrics_should_record_errors():
+    """Test una operación con error queda registrada."""
+    metrics = IOMetrics()
+    with pytest.raises(ValueError), metrics.operation("falla"):
+        raise ValueError
+    assert metrics.operations[-1]["error"]
+
+
+def test_datalake_with_metrics_should_record_reads_and_writes(tmp_path, caplog):
+    """Test las metricas de lectura y escritura de Datalake."""
+    metrics = IOMetrics(callbacks=[log_operation])
+    dl = Datalake.from_account_key('name', 'key', metrics=metrics)
+    dl.fs = LocalFileSystem()
+    rutas = [f"{tmp_path.as_posix()}/file_{i}.csv" for i in range(3)]
+
+    for ruta in rutas:
+        dl.write_csv(pd.DataFrame({"foo_id": [1, 2, 3]}), ruta, index=False)
+    with caplog.at_level(logging.INFO):
+        df = dl.read_csv(rutas, max_workers=2)
+
+    assert len(df) == 9
+    escritura, lectura = metrics.operations[0], metrics.operations[-1]
+    assert escritura["operation"] == "write_csv"
+    assert escritura["counters"] == {"blobs_written": 1, "bytes_written": len("foo_id\n1\n2\n3\n")}
+    assert {"serialize", "upload"} <= set(escritura["stages"])
+    assert lectura["operation"] == "read_csv"
+    assert lectura["counters"] == {"blobs_read": 3, "bytes_read": 3 * len("foo_id\n1\n2\n3\n")}
+    assert {"download", "parse", "concat"} <= set(lectura["stages"])
+    assert "read_csv" in caplog.text
+
+
+def test_datalake_with_metrics_should_write_to_files_without_mode():
+    """Test write_csv con metricas en un filesystem cuyos archivos no tienen `mode`."""
+    metrics = IOMetrics()
+    dl = Datalake.from_account_key('name', 'key', metrics=metrics)
+    dl.fs = MemoryFileSystem()
+    dl.fs.store = {}
+
+    dl.write_csv(pd.DataFrame({"foo_id": [1, 2, 3]}), "contenedor/file.csv", index=False)
+
+    assert dl.fs.cat("contenedor/file.csv") == b"foo_id\n1\n2\n3\n"
+    assert metrics.operations[-1]["counters"] == {"blobs_written": 1, "bytes_written": len("foo_id\n1\n2\n3\n")}
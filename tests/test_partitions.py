@@ -16,11 +16,11 @@
 # specific language governing permissions and limitations
 # under the License.
 import datetime
+from typing import Dict, List
 
 import pytest
 
-from unittest.mock import patch
-from typing import List, Dict
+from azure_datalake_utils.metrics import IOMetrics
 from azure_datalake_utils.partitions import HivePartitiion
 
 
@@ -84,7 +84,6 @@ def list_side_effect_to_test_last_level(*args, **kwargs) -> Dict:
         return {}
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
 def test__make_partitions_using_partition_cols_no_filter_deeper_level_return_correct_list(fs_mock):
     """Test para verificar discover."""
     fs_mock.listdir.side_effect = list_side_effect_to_test
@@ -100,7 +99,19 @@ def test__make_partitions_using_partition_cols_no_filter_deeper_level_return_cor
     assert hive.path_blob == "ruta/al/archivo/"
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
+def test__make_partitions_using_partition_cols_with_int_values_should_return_string_partitions(fs_mock):
+    """Test para verificar partition_cols con valores que no son string."""
+    fs_mock.listdir.side_effect = list_side_effect_to_test
+    hive = HivePartitiion(
+        ruta="contenedor/ruta/al/archivo/",
+        partition_cols={'year': [2022, 2023], 'month': [10]},
+        partition_exclusion={'year': [2023]},
+        fs=fs_mock,
+    )
+    assert hive.partition_files == [("archivo.csv", {'year': '2022', 'month': '10'})]
+    assert hive.get_partition_list() == ["contenedor/ruta/al/archivo/year=2022/month=10/archivo.csv"]
+
+
 def test__make_partitions_using_partition_cols_and_partition_exclusion_should_return_filtered_partition(fs_mock):
     """Test para verificar discover con exlcusion de particiones."""
     fs_mock.listdir.side_effect = list_side_effect_to_test
@@ -115,13 +126,11 @@ def test__make_partitions_using_partition_cols_and_partition_exclusion_should_re
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
 def test__make_partitions_using_partition_cols_and_partition_exclusion_should_rasie_expection(fs_mock):
     """Test para verificar discover con exlcusion de particiones."""
     fs_mock.listdir.side_effect = list_side_effect_to_test
 
     with pytest.raises(KeyError):
-
         HivePartitiion(
             ruta="contenedor/ruta/al/archivo/",
             partition_cols={'year': ['2022'], 'month': ['10', '11', '1']},
@@ -130,7 +139,6 @@ def test__make_partitions_using_partition_cols_and_partition_exclusion_should_ra
         )
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
 def test__make_partitions_using_partition_cols_no_last_modified_last_level_return_valid_files(fs_mock):
     """Test para verificar discover."""
     fs_mock.listdir.side_effect = list_side_effect_to_test
@@ -141,10 +149,10 @@ def test__make_partitions_using_partition_cols_no_last_modified_last_level_retur
         ("archivo.csv", {'year': '2022', 'month': '10'}),
         ("archivo.csv", {'year': '2022', 'month': '11'}),
         ("archivo1.csv", {'year': '2022', 'month': '1'}),
+        ("archivo2.csv", {'year': '2022', 'month': '1'}),
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
 def test__make_partitions_using_partition_cols_no_last_modified_last_level_return_existing_files(fs_mock):
     """Test para verificar discover."""
     fs_mock.listdir.side_effect = list_side_effect_to_test
@@ -157,7 +165,6 @@ def test__make_partitions_using_partition_cols_no_last_modified_last_level_retur
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
 def test__make_partitions_using_partition_cols_filter_last_modified_last_level_return_valid_files(fs_mock):
     """Test para verificar discover."""
     fs_mock.find.side_effect = list_side_effect_to_test_last_level
@@ -175,10 +182,9 @@ def test__make_partitions_using_partition_cols_filter_last_modified_last_level_r
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
-def test___discover_should_discover_partitions(fs_mock):
+def test___discover_should_discover_partitions(fs_mock, ls_from_files):
     """Test para verificar discover."""
-    fs_mock.find.return_value = {
+    files = {
         'contenedor/ruta/al/archivo/year=2022/month=10/load_date=2022-01-01/archivo.csv': {
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
@@ -189,6 +195,7 @@ def test___discover_should_discover_partitions(fs_mock):
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
     }
+    fs_mock.ls.side_effect = ls_from_files(files)
 
     hive = HivePartitiion(
         ruta="contenedor/ruta/al/archivo/",
@@ -203,10 +210,9 @@ def test___discover_should_discover_partitions(fs_mock):
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
-def test___discover_with_filter_last_modified_last_level_should_discover_partitions(fs_mock):
+def test___discover_with_filter_last_modified_last_level_should_discover_partitions(fs_mock, ls_from_files):
     """Test para verificar discover."""
-    fs_mock.find.return_value = {
+    files = {
         'contenedor/ruta/al/archivo/year=2022/month=10/load_date=2022-01-01/archivo.csv': {
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
@@ -217,6 +223,7 @@ def test___discover_with_filter_last_modified_last_level_should_discover_partiti
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
     }
+    fs_mock.ls.side_effect = ls_from_files(files)
 
     hive = HivePartitiion(
         ruta="contenedor/ruta/al/archivo/",
@@ -230,10 +237,11 @@ def test___discover_with_filter_last_modified_last_level_should_discover_partiti
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
-def test___discover_with_filter_last_modified_last_level_and_partition_exclusion_should_discover_partitions(fs_mock):
+def test___discover_with_filter_last_modified_last_level_and_partition_exclusion_should_discover_partitions(
+    fs_mock, ls_from_files
+):
     """Test para verificar discover."""
-    fs_mock.find.return_value = {
+    files = {
         'contenedor/ruta/al/archivo/year=2022/month=10/load_date=2022-01-01/archivo.csv': {
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
@@ -244,6 +252,7 @@ def test___discover_with_filter_last_modified_last_level_and_partition_exclusion
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
     }
+    fs_mock.ls.side_effect = ls_from_files(files)
 
     hive = HivePartitiion(
         ruta="contenedor/ruta/al/archivo/",
@@ -257,10 +266,11 @@ def test___discover_with_filter_last_modified_last_level_and_partition_exclusion
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
-def test___discover_with_filter_last_modified_last_level_and_partition_inclusion_should_discover_partitions(fs_mock):
+def test___discover_with_filter_last_modified_last_level_and_partition_inclusion_should_discover_partitions(
+    fs_mock, ls_from_files
+):
     """Test para verificar discover."""
-    fs_mock.find.return_value = {
+    files = {
         'contenedor/ruta/al/archivo/year=2022/month=10/load_date=2022-01-01/archivo.csv': {
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
@@ -271,6 +281,7 @@ def test___discover_with_filter_last_modified_last_level_and_partition_inclusion
             'last_modified': datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
         },
     }
+    fs_mock.ls.side_effect = ls_from_files(files)
 
     hive = HivePartitiion(
         ruta="contenedor/ruta/al/archivo/",
@@ -284,7 +295,6 @@ def test___discover_with_filter_last_modified_last_level_and_partition_inclusion
     ]
 
 
-@patch("azure_datalake_utils.partitions.AzureBlobFileSystem", autospec=True)
 def test_get_partitiion_list_should_return_list_files(fs_mock):
     """Test para verificar get_partition_list."""
     fs_mock.listdir.side_effect = list_side_effect_to_test
@@ -298,3 +308,128 @@ def test_get_partitiion_list_should_return_list_files(fs_mock):
         'contenedor/ruta/al/archivo/year=2022/month=10/archivo.csv',
         'contenedor/ruta/al/archivo/year=2022/month=11/archivo.csv',
     ]
+
+
+def test___discover_should_prune_folders_before_listing(fs_mock, ls_from_files):
+    """Test para verificar que las carpetas excluidas no se listan."""
+    last_modified = datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
+    files = {
+        f'contenedor/ruta/al/archivo/year={year}/month={month}/archivo.csv': {'last_modified': last_modified}
+        for year in ['2021', '2022', '2023']
+        for month in ['1', '2', '3']
+    }
+    fs_mock.ls.side_effect = ls_from_files(files)
+
+    hive = HivePartitiion(
+        ruta="contenedor/ruta/al/archivo/",
+        fs=fs_mock,
+        partition_inclusion={'year': ['2022']},
+        partition_exclusion={'month': ['3']},
+    )
+
+    assert hive.partition_files == [
+        ("archivo.csv", {'year': '2022', 'month': '1'}),
+        ("archivo.csv", {'year': '2022', 'month': '2'}),
+    ]
+    listed = sorted(call.args[0] for call in fs_mock.ls.call_args_list)
+    assert listed == [
+        'contenedor/ruta/al/archivo/',
+        'contenedor/ruta/al/archivo/year=2022/',
+        'contenedor/ruta/al/archivo/year=2022/month=1/',
+        'contenedor/ruta/al/archivo/year=2022/month=2/',
+    ]
+    fs_mock.find.assert_not_called()
+
+
+def test___discover_should_record_list_calls_in_metrics(fs_mock, ls_from_files):
+    """Test para verificar las metricas del descubrimiento."""
+    last_modified = datetime.datetime(2022, 1, 1, 12, 30, 00, tzinfo=datetime.timezone.utc)
+    files = {
+        f'contenedor/ruta/al/archivo/year={year}/archivo.csv': {'last_modified': last_modified}
+        for year in ['2021', '2022']
+    }
+    fs_mock.ls.side_effect = ls_from_files(files)
+    metrics = IOMetrics()
+
+    HivePartitiion(ruta="contenedor/ruta/al/archivo/", fs=fs_mock, metrics=metrics)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {"list_calls": 3}
+    assert snapshot["stages"]["list"] > 0
+
+
+def test_get_partition_index_should_return_columnar_index(fs_mock, ls_from_files):
+    """Test para verificar el indice columnar de las particiones."""
+    files = {
+        f'contenedor/ruta/al/archivo/year={year}/month={month}/archivo.csv': {
+            'last_modified': datetime.datetime(2022, int(month), 1, tzinfo=datetime.timezone.utc)
+        }
+        for year in ['2022', '2023']
+        for month in ['1', '2']
+    }
+    fs_mock.ls.side_effect = ls_from_files(files)
+
+    hive = HivePartitiion(ruta="contenedor/ruta/al/archivo/", fs=fs_mock, partition_exclusion={'year': ['2023']})
+
+    index = hive.get_partition_index()
+    assert hive.partition_keys == ['year', 'month']
+    assert index.column_names == ['year', 'month', 'file_name', 'path', 'last_modified']
+    assert index.column('month').to_pylist() == ['2', '1']
+    assert index.column('path').to_pylist() == hive.get_partition_list()
+    assert hive.get_partition_list() == [
+        'contenedor/ruta/al/archivo/year=2022/month=2/archivo.csv',
+        'contenedor/ruta/al/archivo/year=2022/month=1/archivo.csv',
+    ]
+
+
+def test_get_partition_index_without_files_should_return_empty_index(fs_mock):
+    """Test para verificar el indice cuando no hay archivos."""
+    fs_mock.listdir.side_effect = FileNotFoundError
+    hive = HivePartitiion(
+        ruta="contenedor/ruta/al/archivo/",
+        partition_cols={'year': ['2024']},
+        fs=fs_mock,
+        partition_exclusion={'product': ['foo']},
+    )
+
+    assert hive.get_partition_index().num_rows == 0
+    assert hive.partition_files == []
+    assert hive.get_partition_list() == []
+
+
+def test_get_partition_categories_should_encode_partitions_once(fs_mock):
+    """Test para verificar los códigos y categorias de las particiones."""
+    fs_mock.listdir.side_effect = list_side_effect_to_test
+    hive = HivePartitiion(
+        ruta="contenedor/ruta/al/archivo/", partition_cols={'year': ['2022'], 'month': ['10', '11', '1']}, fs=fs_mock
+    )
+
+    categorias = hive.get_partition_categories(partition_types={'month': 'int64'})
+
+    codes, categories = categorias['year']
+    assert codes.tolist() == [0, 0, 0, 0]
+    assert categories.to_list() == ['2022']
+    codes, categories = categorias['month']
+    assert categories.to_list() == [10, 11, 1]
+    assert categories[codes].to_list() == [10, 11, 1, 1]
+
+
+def test___discover_with_modified_after_should_return_new_files_and_watermark(fs_mock, ls_from_files):
+    """Test para verificar la lectura incremental por marca de agua."""
+    files = {
+        f'contenedor/ruta/al/archivo/day={day}/archivo.csv': {
+            'last_modified': datetime.datetime(2022, 1, day, tzinfo=datetime.timezone.utc)
+        }
+        for day in [1, 2, 3]
+    }
+    fs_mock.ls.side_effect = ls_from_files(files)
+
+    hive = HivePartitiion(
+        ruta="contenedor/ruta/al/archivo/", fs=fs_mock, modified_after=datetime.datetime(2022, 1, 1, 12)
+    )
+    assert hive.partition_files == [("archivo.csv", {'day': '3'}), ("archivo.csv", {'day': '2'})]
+    assert hive.watermark == datetime.datetime(2022, 1, 3, tzinfo=datetime.timezone.utc)
+
+    hive = HivePartitiion(ruta="contenedor/ruta/al/archivo/", fs=fs_mock, modified_after=hive.watermark)
+    assert hive.partition_files == []
+    assert hive.watermark == datetime.datetime(2022, 1, 3, tzinfo=datetime.timezone.utc)
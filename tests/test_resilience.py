@@ -0,0 +1,168 @@
+"""Suite de test para los reintentos de lecturas."""
+
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import asyncio
+import threading
+import time
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ServiceResponseError
+
+from azure_datalake_utils.exepctions import TiempoAgotado
+from azure_datalake_utils.metrics import IOMetrics
+from azure_datalake_utils.resilience import RetryPolicy, es_transitorio
+
+
+def error_http(status_code: int) -> HttpResponseError:
+    """Error HTTP con el código `status_code`."""
+    error = HttpResponseError(message="error")
+    error.status_code = status_code
+    return error
+
+
+def falla_veces(veces: int, error: BaseException, resultado="ok"):
+    """Función que falla `veces` veces con `error` y luego retorna `resultado`."""
+    llamados = []
+
+    def func():
+        llamados.append(1)
+        if len(llamados) <= veces:
+            raise error
+        return resultado
+
+    func.llamados = llamados
+    return func
+
+
+def test_es_transitorio_should_classify_errors():
+    """Test errores transitorios."""
+    assert es_transitorio(error_http(503))
+    assert es_transitorio(error_http(429))
+    assert es_transitorio(ServiceResponseError("conexión cerrada"))
+    assert es_transitorio(TiempoAgotado(1))
+    assert not es_transitorio(error_http(403))
+    assert not es_transitorio(ResourceNotFoundError("no existe"))
+    assert not es_transitorio(FileNotFoundError("no existe"))
+    assert not es_transitorio(ValueError("csv mal formado"))
+
+
+def test_retry_policy_should_retry_transient_errors():
+    """Test reintentos de errores transitorios."""
+    politica = RetryPolicy(max_attempts=3, backoff=0)
+    metricas = IOMetrics()
+    func = falla_veces(2, error_http(503))
+
+    with metricas.operation("lectura"):
+        assert politica.call(func, metricas) == "ok"
+
+    assert len(func.llamados) == 3
+    assert politica.snapshot() == {"calls": 1, "retries": 2}
+    assert metricas.operations[-1]["counters"] == {"retries": 2}
+
+
+def test_retry_policy_should_raise_after_max_attempts():
+    """Test error después del último intento."""
+    politica = RetryPolicy(max_attempts=2, backoff=0)
+    func = falla_veces(5, error_http(503))
+
+    with pytest.raises(HttpResponseError):
+        politica.call(func)
+
+    assert len(func.llamados) == 2
+    assert politica.snapshot()["failures"] == 1
+
+
+def test_retry_policy_should_not_retry_permanent_errors():
+    """Test errores que no se reintentan."""
+    politica = RetryPolicy(max_attempts=3, backoff=0)
+    func = falla_veces(1, FileNotFoundError("no existe"))
+
+    with pytest.raises(FileNotFoundError):
+        politica.call(func)
+
+    assert len(func.llamados) == 1
+
+
+def test_retry_policy_backoff_should_be_exponential_with_jitter():
+    """Test espera exponencial acotada."""
+    assert [RetryPolicy(backoff=1, max_backoff=5, jitter=False)._espera(i) for i in range(4)] == [1, 2, 4, 5]
+    politica = RetryPolicy(backoff=1, max_backoff=5)
+    assert all(0 <= politica._espera(3) <= 5 for _ in range(100))
+
+
+def test_retry_policy_should_abandon_attempt_after_deadline():
+    """Test tiempo maximo por intento."""
+    politica = RetryPolicy(max_attempts=2, backoff=0, deadline=0.05)
+    liberar = threading.Event()
+    llamados = []
+
+    def func():
+        llamados.append(1)
+        if len(llamados) == 1:
+            liberar.wait(5)
+        return len(llamados)
+
+    inicio = time.monotonic()
+    assert politica.call(func) == 2
+    liberar.set()
+    assert time.monotonic() - inicio < 1
+    assert politica.snapshot() == {"calls": 1, "deadline_exceeded": 1, "retries": 1}
+
+
+def test_retry_policy_should_use_first_hedged_response():
+    """Test solicitud duplicada cuando el primer intento es lento."""
+    politica = RetryPolicy(hedge_after=0.02)
+    liberar = threading.Event()
+    llamados = []
+
+    def func():
+        llamados.append(1)
+        if len(llamados) == 1:
+            liberar.wait(5)
+            return "lento"
+        return "duplicado"
+
+    inicio = time.monotonic()
+    assert politica.call(func) == "duplicado"
+    liberar.set()
+    assert time.monotonic() - inicio < 1
+    assert politica.snapshot() == {"calls": 1, "hedged_requests": 1, "hedge_wins": 1}
+
+
+def test_retry_policy_should_not_hedge_fast_requests():
+    """Test sin solicitudes duplicadas cuando la respuesta es rapida."""
+    politica = RetryPolicy(hedge_after=1)
+    assert politica.call(lambda: "ok") == "ok"
+    assert politica.snapshot() == {"calls": 1}
+
+
+def test_retry_policy_async_should_hedge_and_retry():
+    """Test version asincrona con solicitud duplicada y reintentos."""
+    politica = RetryPolicy(backoff=0, hedge_after=0.02)
+    llamados = []
+
+    async def lectura():
+        llamados.append(1)
+        if len(llamados) == 1:
+            raise error_http(503)
+        if len(llamados) == 2:
+            await asyncio.sleep(5)
+        return len(llamados)
+
+    assert asyncio.run(politica.call_async(lectura)) == 3
+    assert politica.snapshot() == {"calls": 1, "retries": 1, "hedged_requests": 1, "hedge_wins": 1}
@@ -0,0 +1,85 @@
+"""Tests for `azure_datalake_utils.storage_account_utils` package."""
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from unittest.mock import AsyncMock, Mock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from adlfs import AzureBlobFileSystem
+from azure.storage.blob import UserDelegationKey
+from fsspec.asyn import get_loop
+
+from azure_datalake_utils import Datalake
+from azure_datalake_utils.storage_account_utils import create_url_sas_token, create_urls_sas_token
+
+
+def test_create_urls_sas_token_should_sign_all_paths_with_same_window():
+    """Todas las rutas comparten la ventana de expiración."""
+    fs = AzureBlobFileSystem(account_name='name', account_key='a2V5a2V5', skip_instance_cache=True)
+    rutas = ['contenedor/a.csv', 'contenedor/carpeta/b c.csv']
+
+    urls = list(create_urls_sas_token(iter(rutas), fs, 2, 'hour'))
+
+    assert [url.split("?")[0] for url in urls] == [
+        'https://name.blob.core.windows.net/contenedor/a.csv',
+        'https://name.blob.core.windows.net/contenedor/carpeta/b%20c.csv',
+    ]
+    queries = [parse_qs(urlparse(url).query) for url in urls]
+    assert queries[0]['se'] == queries[1]['se']
+    assert queries[0]['sig'] != queries[1]['sig']
+    assert create_url_sas_token(rutas[0], fs, 2, 'hour').split("?")[0] == urls[0].split("?")[0]
+
+
+def test_create_urls_sas_token_should_use_user_delegation_key_without_account_key():
+    """Sin account key se firma con una sola llave de delegación."""
+    fs = Mock()
+    fs.account_key = None
+    fs.loop = get_loop()
+    fs.service_client.url = 'https://name.blob.core.windows.net/'
+    fs.service_client.account_name = 'name'
+    key = UserDelegationKey()
+    key.signed_oid, key.signed_tid, key.signed_service, key.signed_version = 'oid', 'tid', 'b', '2020-02-10'
+    key.signed_start, key.signed_expiry = '2022-01-01T00:00:00Z', '2022-01-02T00:00:00Z'
+    key.value = 'a2V5a2V5'
+    fs.service_client.get_user_delegation_key = AsyncMock(return_value=key)
+
+    urls = list(create_urls_sas_token([f'contenedor/{i}.csv' for i in range(3)], fs, 1))
+
+    assert len(urls) == 3
+    fs.service_client.get_user_delegation_key.assert_awaited_once()
+    assert parse_qs(urlparse(urls[0]).query)['skoid'] == ['oid']
+
+
+def test_create_urls_sas_token_should_raise_with_user_delegation_key_over_7_days():
+    """Sin account key la duración no puede superar la de la llave de delegación."""
+    fs = Mock()
+    fs.account_key = None
+    fs.service_client.get_user_delegation_key = AsyncMock()
+
+    with pytest.raises(ValueError, match="7 días"):
+        create_urls_sas_token(['contenedor/a.csv'], fs, 8, 'day')
+    fs.service_client.get_user_delegation_key.assert_not_awaited()
+
+
+def test_generar_urls_con_sas_token_should_return_urls():
+    """Test de Datalake.generar_urls_con_sas_token."""
+    dl = Datalake.from_account_key('name', 'a2V5a2V5')
+    urls = list(dl.generar_urls_con_sas_token(['contenedor/a.csv', 'contenedor/b.csv'], 1, 'day'))
+    assert [url.split("?")[0] for url in urls] == [
+        'https://name.blob.core.windows.net/contenedor/a.csv',
+        'https://name.blob.core.windows.net/contenedor/b.csv',
+    ]